@@ -7,6 +7,7 @@ from .models import (
     Actor,
     Genre,
     Reservation,
+    SeatHold,
 )
 
 
@@ -17,3 +18,4 @@ admin.site.register(Ticket)
 admin.site.register(Actor)
 admin.site.register(Genre)
 admin.site.register(Reservation)
+admin.site.register(SeatHold)
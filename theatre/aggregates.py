@@ -0,0 +1,59 @@
+from django.db.models import (
+    Aggregate,
+    JSONField,
+    OuterRef,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Concat
+
+from theatre.models import Play
+
+
+class NameList(Aggregate):
+    """JSON array of the aggregated values, one element per row."""
+
+    function = "JSON_GROUP_ARRAY"
+    output_field = JSONField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        # jsonb comes back undecoded, as JSONField.from_db_value expects
+        return self.as_sql(
+            compiler, connection, function="JSONB_AGG", **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, function="JSON_ARRAYAGG", **extra_context
+        )
+
+
+def _related_names(through, name):
+    return Subquery(
+        through.objects.filter(play=OuterRef("pk"))
+        .order_by()
+        .values("play")
+        .annotate(names=NameList(name))
+        .values("names")
+    )
+
+
+def with_related_names(queryset, actors=True, genres=True):
+    """Annotate ``actor_names`` and ``genre_names`` onto plays.
+
+    Each list is a correlated aggregate over the M2M table, so the plays
+    come back in one query without building Actor or Genre instances.
+    Plays without actors or genres get ``None``. Pass ``actors=False``
+    or ``genres=False`` to skip a list that is not rendered.
+    """
+    names = {}
+    if actors:
+        names["actor_names"] = _related_names(
+            Play.actors.through,
+            Concat("actor__first_name", Value(" "), "actor__last_name"),
+        )
+    if genres:
+        names["genre_names"] = _related_names(
+            Play.genres.through, "genre__name"
+        )
+    return queryset.prefetch_related(None).annotate(**names)
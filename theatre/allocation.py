@@ -0,0 +1,77 @@
+from typing import Iterator, Optional
+
+from theatre.models import SeatMap
+
+CENTRE = "centre"
+FRONT = "front"
+BACK = "back"
+PREFERENCES = (CENTRE, FRONT, BACK)
+
+
+def _row_order(rows: int, preference: str) -> Iterator[int]:
+    if preference == FRONT:
+        return iter(range(1, rows + 1))
+    if preference == BACK:
+        return iter(range(rows, 0, -1))
+    middle = (rows + 1) / 2
+    return iter(sorted(range(1, rows + 1), key=lambda row: abs(row - middle)))
+
+
+def _block_starts(free: int, count: int) -> int:
+    """Mask flagging the lowest bit of every run of ``count`` free seats.
+
+    Runs are found by and-ing the mask with shifted copies of itself,
+    doubling the covered length each step, so a row costs O(log count)
+    big-int operations instead of a scan of its seats.
+    """
+    starts = free
+    length = 1
+    while length < count and starts:
+        step = min(length, count - length)
+        starts &= starts >> step
+        length += step
+    return starts
+
+
+def _nearest_bit(mask: int, target: int) -> int:
+    below = mask & ((1 << (target + 1)) - 1)
+    above = mask >> target
+    candidates = []
+    if below:
+        candidates.append(below.bit_length() - 1)
+    if above:
+        candidates.append(target + (above & -above).bit_length() - 1)
+    return min(candidates, key=lambda bit: (abs(bit - target), -bit))
+
+
+def find_best_block(
+    seat_map: SeatMap, count: int, preference: str = CENTRE
+) -> Optional[tuple[int, list[int]]]:
+    """Find the best ``count`` adjacent free seats of a single row.
+
+    Rows are tried in ``preference`` order and the block closest to the
+    middle of the first fitting row wins. Returns ``(row, seats)`` or
+    ``None`` when no row has enough adjacent free seats.
+    """
+    seats_in_row = seat_map.seats_in_row
+    if not 1 <= count <= seats_in_row:
+        return None
+
+    bitmap = bytes(seat_map.bitmap)
+    row_mask = (1 << seats_in_row) - 1
+    # bit ``seats_in_row - seat`` of a row mask stands for ``seat``, so
+    # a block starting at ``seat`` is flagged at its last seat's bit
+    offset = seats_in_row - count + 1
+    target = offset - ((seats_in_row - count) // 2 + 1)
+
+    for row in _row_order(seat_map.rows, preference):
+        first_bit = (row - 1) * seats_in_row
+        last_bit = first_bit + seats_in_row - 1
+        chunk = bitmap[first_bit // 8 : last_bit // 8 + 1]
+        taken = int.from_bytes(chunk, "big") >> (7 - last_bit % 8)
+        free = ~taken & row_mask
+        starts = _block_starts(free, count)
+        if starts:
+            start = offset - _nearest_bit(starts, target)
+            return row, list(range(start, start + count))
+    return None
@@ -0,0 +1,235 @@
+"""Seats available per performance and per day.
+
+``PerformanceAvailability`` rows are updated with every sale and refund
+so listings and reports read availability without counting tickets.
+They are the only sold-seat counter; ``find_drift`` compares them with
+the tickets and ``rebuild_availability`` recounts them.
+"""
+import multiprocessing
+from typing import Iterable
+
+from django.db import connection, connections, transaction
+from django.db.models import (
+    Count,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest, Now, TruncDate
+from django.utils import timezone
+
+from theatre.models import Performance, PerformanceAvailability, SeatHold
+
+MAX_CALENDAR_DAYS = 400
+SUMMARY_FIELDS = [
+    "tickets_sold",
+    "tickets_remaining",
+    "first_sale_at",
+    "last_sale_at",
+]
+
+
+def tickets_available():
+    """Seats of a performance neither sold nor held right now."""
+    return F("availability__tickets_remaining") - Coalesce(
+        Subquery(
+            SeatHold.objects.filter(
+                performance=OuterRef("pk"), expires_at__gt=Now()
+            )
+            .order_by()
+            .values("performance")
+            .annotate(held=Count("id"))
+            .values("held")
+        ),
+        Value(0),
+    )
+
+
+def daily_availability(performances: QuerySet) -> QuerySet:
+    """Performances and available seats per day, in one grouped query."""
+    return (
+        performances.order_by()
+        .annotate(day=TruncDate("show_time"))
+        .values("day")
+        .annotate(
+            performances=Count("id"),
+            seats_available=Sum(tickets_available()),
+        )
+        .order_by("day")
+    )
+
+
+def summarize(
+    performance_ids: Iterable[int],
+) -> list[PerformanceAvailability]:
+    """Unsaved availability of ``performance_ids`` counted from tickets."""
+    performances = (
+        Performance.objects.filter(id__in=list(performance_ids))
+        .order_by()
+        .annotate(
+            sold=Count("ticket"),
+            first_sale_at=Min("ticket__reservation__created_at"),
+            last_sale_at=Max("ticket__reservation__created_at"),
+        )
+        .values_list(
+            "id",
+            "theatre_hall__rows",
+            "theatre_hall__seats_in_row",
+            "sold",
+            "first_sale_at",
+            "last_sale_at",
+        )
+    )
+    return [
+        PerformanceAvailability(
+            performance_id=performance_id,
+            tickets_sold=sold,
+            tickets_remaining=rows * seats_in_row - sold,
+            first_sale_at=first_sale_at,
+            last_sale_at=last_sale_at,
+        )
+        for (
+            performance_id,
+            rows,
+            seats_in_row,
+            sold,
+            first_sale_at,
+            last_sale_at,
+        ) in performances
+    ]
+
+
+def write_summaries(summaries: list[PerformanceAvailability]) -> None:
+    PerformanceAvailability.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["performance"],
+        update_fields=SUMMARY_FIELDS,
+    )
+
+
+def record_sales(performance_id: int, count: int, sold: bool) -> None:
+    """Apply ``count`` seats sold or freed to the performance's summary."""
+    if sold:
+        now = timezone.now()
+        changes = {
+            "tickets_sold": F("tickets_sold") + count,
+            "tickets_remaining": F("tickets_remaining") - count,
+            "first_sale_at": Coalesce(F("first_sale_at"), Value(now)),
+            "last_sale_at": Value(now),
+        }
+    else:
+        changes = {
+            "tickets_sold": Greatest(F("tickets_sold") - count, Value(0)),
+            "tickets_remaining": F("tickets_remaining") + count,
+        }
+    updated = PerformanceAvailability.objects.filter(
+        performance_id=performance_id
+    ).update(**changes)
+    if not updated:
+        write_summaries(summarize([performance_id]))
+
+
+def refresh_remaining(performances: QuerySet) -> None:
+    """Recount remaining seats of ``performances`` after a hall change."""
+    PerformanceAvailability.objects.filter(
+        performance__in=performances
+    ).update(
+        tickets_remaining=Subquery(
+            Performance.objects.filter(pk=OuterRef("performance"))
+            .annotate(
+                capacity=F("theatre_hall__rows")
+                * F("theatre_hall__seats_in_row")
+            )
+            .values("capacity")
+        )
+        - F("tickets_sold")
+    )
+
+
+def _chunks(performance_ids, chunk_size: int) -> list[list[int]]:
+    if performance_ids is None:
+        performance_ids = Performance.objects.order_by("id").values_list(
+            "id", flat=True
+        )
+    performance_ids = list(performance_ids)
+    return [
+        performance_ids[i:i + chunk_size]
+        for i in range(0, len(performance_ids), chunk_size)
+    ]
+
+
+def find_drift(
+    performance_ids: Iterable[int] | None = None, chunk_size: int = 1000
+) -> list[tuple[int, int | None, int]]:
+    """Performances whose summary disagrees with their tickets.
+
+    Each is ``(performance_id, summary tickets_sold, tickets counted)``;
+    the summary count is ``None`` when the row is missing. Remaining
+    seats are compared too, so a summary stale after a hall resize
+    shows up with equal counts.
+    """
+    drift = []
+    for chunk in _chunks(performance_ids, chunk_size):
+        stored = PerformanceAvailability.objects.in_bulk(chunk)
+        for counted in summarize(chunk):
+            summary = stored.get(counted.performance_id)
+            if (
+                summary is None
+                or summary.tickets_sold != counted.tickets_sold
+                or summary.tickets_remaining != counted.tickets_remaining
+            ):
+                drift.append(
+                    (
+                        counted.performance_id,
+                        summary and summary.tickets_sold,
+                        counted.tickets_sold,
+                    )
+                )
+    return drift
+
+
+def rebuild_chunk(performance_ids: list[int]) -> int:
+    with transaction.atomic():
+        summaries = summarize(performance_ids)
+        write_summaries(summaries)
+    return len(summaries)
+
+
+def _rebuild_in_worker(chunks: list[list[int]]) -> int:
+    try:
+        return sum(rebuild_chunk(chunk) for chunk in chunks)
+    finally:
+        connections.close_all()
+
+
+def rebuild_availability(
+    performance_ids: Iterable[int] | None = None,
+    chunk_size: int = 1000,
+    workers: int = 1,
+) -> int:
+    """Recount availability of all or some performances from tickets.
+
+    Performances are summarized ``chunk_size`` at a time, each chunk with
+    one grouped query and one upsert in its own transaction. Several
+    ``workers`` split the chunks between forked processes with their own
+    connections; SQLite allows a single writer, so it always uses one.
+    """
+    chunks = _chunks(performance_ids, chunk_size)
+
+    if workers <= 1 or len(chunks) <= 1 or connection.vendor == "sqlite":
+        return sum(rebuild_chunk(chunk) for chunk in chunks)
+
+    connections.close_all()
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        return sum(
+            pool.map(
+                _rebuild_in_worker,
+                [chunks[i::workers] for i in range(workers)],
+            )
+        )
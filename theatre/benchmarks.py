@@ -0,0 +1,439 @@
+"""In-process API benchmarks with JSON baselines.
+
+Each scenario drives one route through the full middleware stack with a
+real JWT and records latency percentiles, queries per request and peak
+Python memory. Results are compared against a stored baseline to flag
+regressions.
+"""
+import itertools
+import json
+import math
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from theatre.models import Actor, Genre, Performance, Play, Reservation
+from theatre.seat_map import get_seat_map
+from theatre.seeding import SeedOptions
+
+BASELINE_VERSION = 1
+# process-local cache the benchmarks fill and clear, whatever the
+# configured default cache is
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "theatre-benchmarks",
+    }
+}
+DATASET = SeedOptions(
+    halls=10,
+    plays=1_000,
+    actors=2_000,
+    genres=30,
+    performances=2_000,
+    users=1_000,
+    reservations=20_000,
+    tickets=60_000,
+)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    url: str
+    payload: Callable[[], dict] | None = None
+    client: str = "jwt"
+
+
+@dataclass
+class Result:
+    name: str
+    requests: int
+    p50_ms: float
+    p95_ms: float
+    queries: int
+    peak_kb: float
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.metric} {self.current:g} "
+            f"(baseline {self.baseline:g})"
+        )
+
+
+def dataset(scale: float, seed: int) -> SeedOptions:
+    """``DATASET`` with every row count multiplied by ``scale``."""
+    counts = {
+        name: max(round(getattr(DATASET, name) * scale), 1)
+        for name in (
+            "halls",
+            "plays",
+            "actors",
+            "genres",
+            "performances",
+            "users",
+            "reservations",
+            "tickets",
+        )
+    }
+    return SeedOptions(**counts, seed=seed)
+
+
+def has_data() -> bool:
+    """Whether the database has rows a seeded dataset would add to."""
+    return any(
+        model.objects.exists()
+        for model in (Play, Actor, Genre, Performance, Reservation)
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def _free_seat_pairs(performance: Performance) -> Iterator[list[dict]]:
+    """Yield reservation payload tickets, two free seats at a time."""
+    seat_map = get_seat_map(performance)
+    free = (
+        (row, seat)
+        for row in range(1, seat_map.rows + 1)
+        for seat in range(1, seat_map.seats_in_row + 1)
+        if not seat_map.is_taken(row, seat)
+    )
+    while pair := list(itertools.islice(free, 2)):
+        yield [
+            {"row": row, "seat": seat, "performance": performance.id}
+            for row, seat in pair
+        ]
+
+
+def benchmark_user():
+    """A user with reservations, so history endpoints have rows to show."""
+    user = (
+        get_user_model()
+        .objects.filter(
+            id__in=Reservation.objects.values("user_id")[:1]
+        )
+        .first()
+    )
+    if user is None:
+        user = get_user_model().objects.create_user(
+            email="benchmark@theatre.test", password="benchmarkpassword"
+        )
+    return user
+
+
+def scenarios(user) -> list[Scenario]:
+    """One scenario per route and representative filter."""
+    play = Play.objects.order_by("id").first()
+    performance = (
+        Performance.objects.select_related("theatre_hall")
+        .order_by("availability__tickets_sold", "id")
+        .first()
+    )
+    actor = Actor.objects.order_by("id").first()
+    genre = Genre.objects.order_by("id").first()
+    if None in (play, performance, actor, genre):
+        raise ValueError("Seed the database before running benchmarks.")
+
+    seats = _free_seat_pairs(performance)
+    registrations = itertools.count()
+    refresh = str(RefreshToken.for_user(user))
+    plays = reverse("theatre:play-list")
+    performances = reverse("theatre:performance-list")
+    reservations = reverse("theatre:reservation-list")
+    performance_url = reverse(
+        "theatre:performance-detail", args=(performance.id,)
+    )
+    return [
+        Scenario("plays list", "get", plays),
+        Scenario("plays list cursor", "get", f"{plays}?pagination=cursor"),
+        Scenario(
+            "plays filter genres", "get", f"{plays}?genres={genre.id}"
+        ),
+        Scenario(
+            "plays filter actors", "get", f"{plays}?actors={actor.id}"
+        ),
+        Scenario("plays filter title", "get", f"{plays}?title=play"),
+        Scenario("plays search", "get", f"{plays}?q=play"),
+        Scenario(
+            "plays retrieve",
+            "get",
+            reverse("theatre:play-detail", args=(play.id,)),
+        ),
+        Scenario("performances list", "get", performances),
+        Scenario(
+            "performances filter date",
+            "get",
+            f"{performances}?date={performance.show_time:%Y-%m-%d}",
+        ),
+        Scenario(
+            "performances filter play",
+            "get",
+            f"{performances}?play={performance.play_id}",
+        ),
+        Scenario("performances retrieve", "get", performance_url),
+        Scenario(
+            "performances calendar",
+            "get",
+            reverse("theatre:performance-calendar")
+            + f"?start={performance.show_time:%Y}-01-01"
+            f"&end={performance.show_time:%Y}-12-31",
+        ),
+        Scenario(
+            "performances seat map",
+            "get",
+            reverse("theatre:performance-seat-map", args=(performance.id,)),
+        ),
+        Scenario(
+            "performances best available",
+            "get",
+            reverse(
+                "theatre:performance-best-available", args=(performance.id,)
+            )
+            + "?count=2",
+        ),
+        Scenario("reservations list", "get", reservations),
+        Scenario(
+            "reservations create",
+            "post",
+            reservations,
+            lambda: {"tickets": next(seats)},
+        ),
+        Scenario(
+            "reservations export",
+            "get",
+            reverse("theatre:reservation-export") + "?format=ndjson",
+        ),
+        Scenario("actors list", "get", reverse("theatre:actor-list")),
+        Scenario("genres list", "get", reverse("theatre:genre-list")),
+        Scenario(
+            "theatre halls list", "get", reverse("theatre:theatrehall-list")
+        ),
+        Scenario(
+            "user register",
+            "post",
+            reverse("user:create"),
+            lambda: {
+                "email": f"bench{next(registrations)}@theatre.test",
+                "password": "benchmarkpassword",
+            },
+            client="anonymous",
+        ),
+        Scenario(
+            "user profile", "get", reverse("user:manage_user"), client="token"
+        ),
+        Scenario(
+            "token refresh",
+            "post",
+            reverse("user:token_refresh"),
+            lambda: {"refresh": refresh},
+            client="anonymous",
+        ),
+    ]
+
+
+def clients(user) -> dict[str, APIClient]:
+    access_token = RefreshToken.for_user(user).access_token
+    token, _ = Token.objects.get_or_create(user=user)
+    jwt = APIClient()
+    jwt.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+    token_client = APIClient()
+    token_client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+    return {"jwt": jwt, "token": token_client, "anonymous": APIClient()}
+
+
+def _request(client: APIClient, scenario: Scenario):
+    kwargs = {}
+    if scenario.payload is not None:
+        kwargs = {"data": scenario.payload(), "format": "json"}
+    response = getattr(client, scenario.method)(scenario.url, **kwargs)
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f"{scenario.name}: {scenario.method.upper()} {scenario.url} "
+            f"returned {response.status_code}"
+        )
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def run_scenario(
+    client: APIClient, scenario: Scenario, iterations: int, warmup: int
+) -> Result:
+    for _ in range(warmup):
+        _request(client, scenario)
+
+    timings = []
+    queries = 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            _request(client, scenario)
+            timings.append(time.perf_counter() - started)
+        queries = max(queries, len(captured))
+
+    # a separate request, tracing allocations would skew the timings
+    tracemalloc.start()
+    try:
+        _request(client, scenario)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(
+        name=scenario.name,
+        requests=iterations,
+        p50_ms=round(percentile(timings, 50) * 1000, 3),
+        p95_ms=round(percentile(timings, 95) * 1000, 3),
+        queries=queries,
+        peak_kb=round(peak / 1024, 1),
+    )
+
+
+@contextmanager
+def _isolated():
+    """No throttling, and ``BENCHMARK_CACHES`` in place of the configured
+    caches, so clearing the cache never touches a shared one."""
+    allowed_hosts = [*settings.ALLOWED_HOSTS, "testserver"]
+    with mock.patch.object(
+        APIView, "get_throttles", return_value=[]
+    ), override_settings(ALLOWED_HOSTS=allowed_hosts, CACHES=BENCHMARK_CACHES):
+        try:
+            yield
+        finally:
+            cache.clear()
+
+
+def json_payloads() -> dict[str, object]:
+    """``response.data`` of every scenario reading JSON, by name."""
+    user = benchmark_user()
+    by_client = clients(user)
+    payloads = {}
+    with _isolated():
+        for scenario in scenarios(user):
+            if scenario.method != "get" or "format=" in scenario.url:
+                continue
+            response = _request(by_client[scenario.client], scenario)
+            payloads[scenario.name] = response.data
+    return payloads
+
+
+def run(iterations: int = 50, warmup: int = 5, only=None) -> list[Result]:
+    """Benchmark every scenario on the current database.
+
+    Throttling is switched off so repeated requests measure the views,
+    and the benchmarks' own cache is cleared once per scenario; the timed
+    requests run warm, as production traffic mostly does. Cache hits are
+    local memory reads, without a shared cache's round trips.
+    """
+    user = benchmark_user()
+    by_client = clients(user)
+    results = []
+    with _isolated():
+        for scenario in scenarios(user):
+            if only and not any(name in scenario.name for name in only):
+                continue
+            cache.clear()
+            results.append(
+                run_scenario(
+                    by_client[scenario.client], scenario, iterations, warmup
+                )
+            )
+    return results
+
+
+def write_baseline(path, results: list[Result], meta: dict) -> None:
+    with open(path, "w") as baseline:
+        json.dump(
+            {
+                "version": BASELINE_VERSION,
+                "meta": meta,
+                "results": {
+                    result.name: asdict(result) for result in results
+                },
+            },
+            baseline,
+            indent=2,
+            sort_keys=True,
+        )
+        baseline.write("\n")
+
+
+def load_baseline(path) -> dict[str, dict]:
+    with open(path) as baseline:
+        return json.load(baseline)["results"]
+
+
+def compare(
+    results: list[Result],
+    baseline: dict[str, dict],
+    latency_tolerance: float = 0.25,
+    memory_tolerance: float = 0.25,
+    min_latency_ms: float = 1.0,
+) -> list[Regression]:
+    """Regressions of ``results`` against ``baseline``.
+
+    Any extra query is a regression; latency and memory only beyond
+    their relative tolerance, and latency by at least ``min_latency_ms``
+    so sub-millisecond noise does not count.
+    """
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        if result.queries > previous["queries"]:
+            regressions.append(
+                Regression(
+                    result.name,
+                    "queries",
+                    previous["queries"],
+                    result.queries,
+                )
+            )
+        for metric in ("p50_ms", "p95_ms"):
+            current, before = getattr(result, metric), previous[metric]
+            if (
+                current > before * (1 + latency_tolerance)
+                and current - before >= min_latency_ms
+            ):
+                regressions.append(
+                    Regression(result.name, metric, before, current)
+                )
+        if result.peak_kb > previous["peak_kb"] * (1 + memory_tolerance):
+            regressions.append(
+                Regression(
+                    result.name,
+                    "peak_kb",
+                    previous["peak_kb"],
+                    result.peak_kb,
+                )
+            )
+    return regressions
@@ -0,0 +1,132 @@
+import random
+import time
+from collections import defaultdict
+from typing import Iterable
+
+from django.db import IntegrityError, OperationalError, connection, transaction
+
+from theatre.availability import record_sales
+from theatre.cache import bump_performance
+from theatre.exceptions import ReservationBusy, SeatsUnavailable
+from theatre.holds import active_holds, consume_holds, seats_q
+from theatre.locks import lock_performances
+from theatre.models import Reservation, Ticket
+from theatre.seat_map import mark_seats
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 0.05
+# serialization failure and deadlock detected
+TRANSIENT_PGCODES = {"40001", "40P01"}
+
+
+def record_seats(
+    performance_id: int, seats: Iterable[tuple[int, int]], sold: bool
+) -> None:
+    """Apply sold or freed seats to the availability summary and seat map."""
+    seats = list(seats)
+    with transaction.atomic():
+        record_sales(performance_id, len(seats), sold)
+        mark_seats(performance_id, seats, taken=sold)
+    bump_performance(performance_id)
+
+
+def book_tickets(
+    reservation: Reservation, tickets_data: list[dict]
+) -> list[Ticket]:
+    """Insert validated tickets of a reservation with a single query.
+
+    Must be called inside a transaction; keeps counters and seat maps in
+    sync since ``bulk_create`` bypasses ``Ticket.save`` and its signals.
+    """
+    tickets = [
+        Ticket(reservation=reservation, **ticket_data)
+        for ticket_data in tickets_data
+    ]
+    Ticket.objects.bulk_create(tickets)
+
+    seats_by_performance = defaultdict(list)
+    for ticket in tickets:
+        seats_by_performance[ticket.performance_id].append(
+            (ticket.row, ticket.seat)
+        )
+    for performance_id, seats in seats_by_performance.items():
+        record_seats(performance_id, seats, sold=True)
+
+    return tickets
+
+
+def _seat(ticket_data: dict) -> tuple[int, int, int]:
+    return (
+        ticket_data["performance"].id,
+        ticket_data["row"],
+        ticket_data["seat"],
+    )
+
+
+def _reserve(user, tickets_data: list[dict], allow_partial: bool):
+    requested = [_seat(ticket_data) for ticket_data in tickets_data]
+    lock_performances(performance_id for performance_id, _, _ in requested)
+
+    conflicts = set(
+        Ticket.objects.filter(seats_q(requested)).values_list(
+            "performance_id", "row", "seat"
+        )
+    ) | set(
+        active_holds()
+        .filter(seats_q(requested))
+        .exclude(user=user)
+        .values_list("performance_id", "row", "seat")
+    )
+    if conflicts and (not allow_partial or conflicts >= set(requested)):
+        raise SeatsUnavailable(conflicts)
+
+    reservation = Reservation.objects.create(user=user)
+    tickets = book_tickets(
+        reservation,
+        [
+            ticket_data
+            for ticket_data in tickets_data
+            if _seat(ticket_data) not in conflicts
+        ],
+    )
+    consume_holds(
+        user,
+        [
+            (ticket.performance_id, ticket.row, ticket.seat)
+            for ticket in tickets
+        ],
+    )
+    reservation.skipped_seats = sorted(conflicts)
+    return reservation
+
+
+def _is_transient(error: OperationalError) -> bool:
+    if getattr(error.__cause__, "pgcode", None) in TRANSIENT_PGCODES:
+        return True
+    return "database is locked" in str(error)
+
+
+def reserve_tickets(
+    user, tickets_data: list[dict], allow_partial: bool = False
+) -> Reservation:
+    """Book validated tickets as one reservation, all or nothing.
+
+    Seats are identified by ``(performance, row, seat)``. Conflicts with
+    sold or held seats raise ``SeatsUnavailable`` listing them, unless
+    ``allow_partial`` is set: then the remaining seats are booked and the
+    conflicting ones are left in ``reservation.skipped_seats``. Lock
+    timeouts, deadlocks and races with writers bypassing the locks are
+    retried with a jittered backoff.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                return _reserve(user, tickets_data, allow_partial)
+        except IntegrityError:
+            # a seat got sold outside of the locks, the next attempt sees it
+            pass
+        except OperationalError as error:
+            if connection.in_atomic_block or not _is_transient(error):
+                raise
+        time.sleep(RETRY_DELAY * attempt * random.uniform(0.5, 1.5))
+    raise ReservationBusy()
@@ -0,0 +1,137 @@
+import hashlib
+import time
+from typing import Callable
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+LIST_VERSION_KEY = "theatre:performances:version"
+CATALOGUE_VERSION_KEY = "theatre:catalogue:version"
+PERFORMANCE_VERSION_KEY = "theatre:performance:{}:version"
+TABLE_MODIFIED_KEY = "theatre:table:{}:modified"
+STATS_KEYS = {
+    "hits": "theatre:performance-cache:hits",
+    "misses": "theatre:performance-cache:misses",
+    "invalidations": "theatre:performance-cache:invalidations",
+}
+
+
+def _incr(key: str) -> int:
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def _bump(*keys: str) -> None:
+    """Bump versions now and again on commit.
+
+    The second bump drops anything a concurrent request cached from the
+    pre-commit state of the database under the first new version.
+    """
+    _incr(STATS_KEYS["invalidations"])
+    for key in keys:
+        _incr(key)
+    transaction.on_commit(lambda: [_incr(key) for key in keys])
+
+
+def bump_performance(performance_id: int) -> None:
+    _bump(LIST_VERSION_KEY, PERFORMANCE_VERSION_KEY.format(performance_id))
+
+
+def bump_listing() -> None:
+    _bump(LIST_VERSION_KEY)
+
+
+def bump_catalogue() -> None:
+    _bump(LIST_VERSION_KEY, CATALOGUE_VERSION_KEY)
+
+
+def _version(key: str) -> int:
+    return cache.get(key) or 0
+
+
+def _query_hash(request) -> str:
+    """Digest of the query parameters, whatever their order or length."""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    return hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+
+
+def list_cache_key(request, scope: str = "performance-list") -> str:
+    return (
+        f"theatre:{scope}:{_version(LIST_VERSION_KEY)}:"
+        f"{_query_hash(request)}"
+    )
+
+
+def detail_cache_key(request, pk) -> str:
+    return (
+        f"theatre:performance-detail:{pk}:"
+        f"{_version(PERFORMANCE_VERSION_KEY.format(pk))}:"
+        f"{_version(CATALOGUE_VERSION_KEY)}:"
+        f"{_query_hash(request)}"
+    )
+
+
+def cached_response(key: str, build: Callable[[], Response]) -> Response:
+    """Serve ``build()`` data from the cache until its versions change.
+
+    Always builds unless ``PERFORMANCE_CACHE_ENABLED``: versions bumped
+    in a cache of one process never reach the others.
+    """
+    if not settings.PERFORMANCE_CACHE_ENABLED:
+        return build()
+    data = cache.get(key)
+    if data is not None:
+        _incr(STATS_KEYS["hits"])
+        return Response(data)
+
+    _incr(STATS_KEYS["misses"])
+    response = build()
+    if response.status_code == 200:
+        cache.set(key, response.data, settings.PERFORMANCE_CACHE_TIMEOUT)
+    return response
+
+
+def cache_stats() -> dict:
+    stats = {name: cache.get(key) or 0 for name, key in STATS_KEYS.items()}
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+def reset_cache_stats() -> None:
+    cache.delete_many(list(STATS_KEYS.values()))
+
+
+def touch_tables(*tables: str) -> None:
+    """Record that rows of ``tables`` changed, now and again on commit."""
+
+    def touch():
+        now = time.time()
+        cache.set_many(
+            {TABLE_MODIFIED_KEY.format(table): now for table in tables},
+            timeout=None,
+        )
+
+    touch()
+    transaction.on_commit(touch)
+
+
+def tables_modified(tables) -> float:
+    """Latest change timestamp of ``tables``.
+
+    Tables unseen since the cache was (re)started count as modified now.
+    """
+    keys = [TABLE_MODIFIED_KEY.format(table) for table in tables]
+    modified = cache.get_many(keys)
+    for key in keys:
+        if key not in modified:
+            now = time.time()
+            cache.add(key, now, timeout=None)
+            modified[key] = cache.get(key, now)
+    return max(modified.values())
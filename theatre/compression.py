@@ -0,0 +1,176 @@
+"""Negotiated gzip and brotli compression of response bodies.
+
+Brotli is offered when the ``brotli`` package is installed. Streams are
+compressed chunk by chunk and flushed after every chunk, so clients
+still get each exported row as soon as it is produced. Bytes in and out
+and the CPU time spent compressing are aggregated per route in the
+cache, like the query stats.
+"""
+import gzip
+import time
+import zlib
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+# brotli's default of 11 is meant for static assets, 4-5 suits live ones
+BROTLI_QUALITY = 4
+STATS_LABELS_KEY = "theatre:compression-stats:labels"
+STATS_KEY = "theatre:compression-stats:{}:{}"
+COUNTERS = ("responses", "compressed", "bytes_in", "bytes_out", "cpu_us")
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Encodings the server can produce, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best supported encoding of an ``Accept-Encoding`` header, if any.
+
+    The highest ``q`` wins, ties go to the server's preference; ``*``
+    stands for any encoding the header does not name.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor whose every chunk can be decoded at once."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(
+                GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+@dataclass
+class CompressionRecord:
+    """What compressing one response cost and saved."""
+
+    bytes_in: int = 0
+    bytes_out: int = 0
+    cpu: float = 0.0
+    compressed: bool = False
+
+    def run(self, codec, data: bytes) -> bytes:
+        """``codec(data)``, counting its sizes and CPU time."""
+        started = time.process_time()
+        try:
+            output = codec(data)
+        finally:
+            self.cpu += time.process_time() - started
+        self.bytes_in += len(data)
+        self.bytes_out += len(output)
+        return output
+
+
+def record_compression(label: str, record: CompressionRecord) -> None:
+    """Add one compressible response of ``label`` to the stats."""
+    labels = cache.get(STATS_LABELS_KEY) or set()
+    if label not in labels:
+        cache.set(STATS_LABELS_KEY, labels | {label}, timeout=None)
+
+    increments = {"responses": 1}
+    if record.compressed:
+        increments.update(
+            compressed=1,
+            bytes_in=record.bytes_in,
+            bytes_out=record.bytes_out,
+            cpu_us=round(record.cpu * 1_000_000),
+        )
+    for counter, delta in increments.items():
+        key = STATS_KEY.format(label, counter)
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def compression_stats() -> list[dict]:
+    """Per route totals, most bytes saved first."""
+    stats = []
+    for label in sorted(cache.get(STATS_LABELS_KEY) or ()):
+        values = cache.get_many(
+            [STATS_KEY.format(label, name) for name in COUNTERS]
+        )
+        row = {
+            name: values.get(STATS_KEY.format(label, name)) or 0
+            for name in COUNTERS
+        }
+        if not row["responses"]:
+            continue
+        compressed = row["compressed"]
+        stats.append(
+            {
+                "route": label,
+                **row,
+                "ratio": (
+                    row["bytes_in"] / row["bytes_out"]
+                    if row["bytes_out"]
+                    else None
+                ),
+                "avg_cpu_ms": (
+                    row["cpu_us"] / compressed / 1000 if compressed else 0.0
+                ),
+            }
+        )
+    return sorted(
+        stats, key=lambda row: row["bytes_out"] - row["bytes_in"]
+    )
+
+
+def reset_compression_stats() -> None:
+    labels = cache.get(STATS_LABELS_KEY) or ()
+    cache.delete_many(
+        [
+            STATS_KEY.format(label, name)
+            for label in labels
+            for name in COUNTERS
+        ]
+        + [STATS_LABELS_KEY]
+    )
@@ -0,0 +1,33 @@
+from typing import Iterable
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatsUnavailable(APIException):
+    """Some of the requested seats are sold or held by somebody else."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are not available."
+    default_code = "seats_unavailable"
+
+    def __init__(self, conflicts: Iterable[tuple[int, int, int]]):
+        self.conflicts = sorted(set(conflicts))
+        super().__init__({"detail": self.default_detail})
+        # keep seat coordinates as numbers rather than ErrorDetail strings
+        self.detail["conflicts"] = [
+            {"performance": performance, "row": row, "seat": seat}
+            for performance, row, seat in self.conflicts
+        ]
+
+
+class NoAdjacentSeats(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "No block of adjacent free seats of this size."
+    default_code = "no_adjacent_seats"
+
+
+class ReservationBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many concurrent reservations, please retry."
+    default_code = "reservation_busy"
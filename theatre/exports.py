@@ -0,0 +1,61 @@
+import csv
+import json
+from typing import Iterable, Iterator
+
+from django.db.models import QuerySet
+from rest_framework.utils import encoders
+
+from theatre.models import Reservation
+from theatre.serializers import ReservationListSerializer
+
+EXPORT_CHUNK_SIZE = 200
+CSV_FIELDS = (
+    "reservation",
+    "created_at",
+    "performance",
+    "performance_title",
+    "theatre_hall_name",
+    "show_time",
+    "row",
+    "seat",
+)
+
+
+class _Echo:
+    """File-like object handing back whatever csv.writer writes."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_reservations(reservations: QuerySet) -> Iterator[Reservation]:
+    """Walk reservations in chunks, prefetching tickets chunk by chunk."""
+    return reservations.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def stream_ndjson(reservations: Iterable[Reservation]) -> Iterator[str]:
+    for reservation in reservations:
+        yield json.dumps(
+            ReservationListSerializer(reservation).data,
+            cls=encoders.JSONEncoder,
+        ) + "\n"
+
+
+def stream_csv(reservations: Iterable[Reservation]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_FIELDS)
+    for reservation in reservations:
+        for ticket in reservation.tickets.all():
+            performance = ticket.performance
+            yield writer.writerow(
+                (
+                    reservation.id,
+                    reservation.created_at.isoformat(),
+                    performance.id,
+                    performance.play.title,
+                    performance.theatre_hall.name,
+                    performance.show_time.isoformat(),
+                    ticket.row,
+                    ticket.seat,
+                )
+            )
@@ -0,0 +1,100 @@
+"""Sparse fieldsets: ``?fields=`` and ``?omit=`` on read requests.
+
+Both parameters take comma separated names of top-level output fields.
+Besides the serializer dropping the other fields, the queryset loads
+only the columns the kept fields read and only the ``select_related``
+joins they traverse. Annotations and prefetches belong to the viewsets,
+which skip those of fields that are not rendered.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+
+def parse_names(value: str | None) -> list[str]:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def select_fields(
+    available: tuple[str, ...], fields: list[str], omit: list[str]
+) -> tuple[str, ...]:
+    """``available`` narrowed to ``fields``, if any, minus ``omit``."""
+    errors = {}
+    for param, names in ((FIELDS_PARAM, fields), (OMIT_PARAM, omit)):
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            errors[param] = f"Unknown fields: {', '.join(unknown)}."
+    if errors:
+        raise ValidationError(errors)
+
+    selected = tuple(
+        name
+        for name in available
+        if (not fields or name in fields) and name not in omit
+    )
+    if not selected:
+        raise ValidationError({OMIT_PARAM: "At least one field must be kept."})
+    return selected
+
+
+def loaded_paths(
+    queryset: QuerySet, fields: dict, sources: dict
+) -> set[str] | None:
+    """Model fields of ``queryset`` the serializer ``fields`` read.
+
+    ``sources`` maps output fields computed in Python to the model
+    fields they read. ``None`` when a field reads anything else, as then
+    nothing can be safely deferred.
+    """
+    opts = queryset.model._meta
+    paths = {opts.pk.name}
+    for name, field in fields.items():
+        if name in sources:
+            paths.update(sources[name])
+            continue
+        if field.source == "*":
+            return None
+        attr = field.source_attrs[0]
+        if attr in queryset.query.annotations:
+            continue
+        try:
+            model_field = opts.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        # M2M and reverse relations come from prefetches, not columns
+        if model_field.concrete and not model_field.many_to_many:
+            paths.add(attr)
+    return paths
+
+
+def _related_paths(tree: dict, prefix: str = "") -> list[str]:
+    paths = []
+    for name, subtree in tree.items():
+        paths.append(prefix + name)
+        paths.extend(_related_paths(subtree, f"{prefix}{name}__"))
+    return paths
+
+
+def load_only(
+    queryset: QuerySet, fields: dict, sources: dict, extra: tuple = ()
+) -> QuerySet:
+    """``queryset`` loading just what the serializer ``fields`` read.
+
+    ``extra`` model fields are loaded as well, such as the ordering a
+    cursor paginator reads from the last row of a page.
+    """
+    paths = loaded_paths(queryset, fields, sources)
+    if paths is None:
+        return queryset
+    paths.update(extra)
+
+    related = queryset.query.select_related
+    if isinstance(related, dict):
+        queryset = queryset.select_related(None)
+        kept = {name: related[name] for name in related if name in paths}
+        if kept:
+            queryset = queryset.select_related(*_related_paths(kept))
+    return queryset.only(*paths)
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Q, QuerySet
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from theatre.cache import bump_performance
+from theatre.exceptions import SeatsUnavailable
+from theatre.locks import lock_performances
+from theatre.models import Performance, SeatHold, SeatMap, Ticket
+
+DEFAULT_HOLD_MINUTES = 10
+MAX_HOLD_MINUTES = 30
+
+
+def active_holds() -> QuerySet:
+    return SeatHold.objects.filter(expires_at__gt=timezone.now())
+
+
+def seats_q(seats: Iterable[tuple[int, int, int]]) -> Q:
+    """Match ``(performance, row, seat)`` triples in a single filter."""
+    return reduce(
+        or_,
+        (
+            Q(performance_id=performance_id, row=row, seat=seat)
+            for performance_id, row, seat in seats
+        ),
+        Q(pk__in=[]),
+    )
+
+
+def prefetch_active_holds() -> Prefetch:
+    """Prefetch the active holds of performances as ``active_holds``."""
+    return Prefetch(
+        "seat_holds",
+        queryset=active_holds().only("performance", "row", "seat"),
+        to_attr="active_holds",
+    )
+
+
+def held_seats(performance_id: int) -> list[tuple[int, int]]:
+    return list(
+        active_holds()
+        .filter(performance_id=performance_id)
+        .values_list("row", "seat")
+    )
+
+
+def with_held_seats(
+    seat_map: SeatMap, seats: Optional[list[tuple[int, int]]] = None
+) -> SeatMap:
+    """Return an unsaved copy of the seat map with held seats marked.
+
+    ``seats`` are the held ``(row, seat)`` pairs if already loaded.
+    """
+    if seats is None:
+        seats = held_seats(seat_map.performance_id)
+    if not seats:
+        return seat_map
+    overlay = SeatMap(
+        performance_id=seat_map.performance_id,
+        rows=seat_map.rows,
+        seats_in_row=seat_map.seats_in_row,
+        bitmap=bytes(seat_map.bitmap),
+    )
+    overlay.set_seats(seats, taken=True)
+    return overlay
+
+
+def hold_seats(
+    user,
+    performance: Performance,
+    seats: list[tuple[int, int]],
+    minutes: int = DEFAULT_HOLD_MINUTES,
+) -> list[SeatHold]:
+    """Hold every seat for ``minutes`` or none of them.
+
+    Seats the user holds already get their expiry extended.
+    """
+    for row, seat in seats:
+        Ticket.validate_ticket(
+            row, seat, performance.theatre_hall, ValidationError
+        )
+
+    seats = sorted(set(seats))
+    requested = [(performance.id, row, seat) for row, seat in seats]
+    now = timezone.now()
+    expires_at = now + timedelta(minutes=minutes)
+
+    try:
+        with transaction.atomic():
+            lock_performances([performance.id])
+            SeatHold.objects.filter(
+                performance=performance, expires_at__lte=now
+            ).delete()
+
+            sold = Ticket.objects.filter(seats_q(requested)).values_list(
+                "performance_id", "row", "seat"
+            )
+            holds = {
+                (hold.row, hold.seat): hold
+                for hold in SeatHold.objects.filter(seats_q(requested))
+            }
+            conflicts = set(sold) | {
+                (performance.id, hold.row, hold.seat)
+                for hold in holds.values()
+                if hold.user_id != user.id
+            }
+            if conflicts:
+                raise SeatsUnavailable(conflicts)
+
+            SeatHold.objects.filter(
+                pk__in=[h.pk for h in holds.values()]
+            ).update(expires_at=expires_at)
+            SeatHold.objects.bulk_create(
+                SeatHold(
+                    performance=performance,
+                    row=row,
+                    seat=seat,
+                    user=user,
+                    expires_at=expires_at,
+                )
+                for row, seat in seats
+                if (row, seat) not in holds
+            )
+    except IntegrityError:
+        raise SeatsUnavailable(requested)
+    bump_performance(performance.id)
+
+    return list(SeatHold.objects.filter(user=user).filter(seats_q(requested)))
+
+
+def release_holds(user, performance_id: Optional[int] = None) -> int:
+    holds = SeatHold.objects.filter(user=user)
+    if performance_id is not None:
+        holds = holds.filter(performance_id=performance_id)
+    performance_ids = set(holds.values_list("performance_id", flat=True))
+    deleted, _ = holds.delete()
+    for held_performance_id in performance_ids:
+        bump_performance(held_performance_id)
+    return deleted
+
+
+def consume_holds(user, seats: Iterable[tuple[int, int, int]]) -> None:
+    """Drop the user's holds on seats that have just been booked."""
+    SeatHold.objects.filter(user=user).filter(seats_q(seats)).delete()
+
+
+def sweep_expired_holds(batch_size: int = 1000) -> int:
+    """Delete expired holds in batches, returning how many were removed."""
+    now = timezone.now()
+    swept = 0
+    while True:
+        expired_ids = list(
+            SeatHold.objects.filter(expires_at__lte=now).values_list(
+                "pk", flat=True
+            )[:batch_size]
+        )
+        if not expired_ids:
+            return swept
+        expired = SeatHold.objects.filter(pk__in=expired_ids)
+        performance_ids = set(expired.values_list("performance_id", flat=True))
+        deleted, _ = expired.delete()
+        swept += deleted
+        for performance_id in performance_ids:
+            bump_performance(performance_id)
@@ -0,0 +1,18 @@
+from typing import Iterable
+
+from theatre.models import Performance
+
+
+def lock_performances(performance_ids: Iterable[int]) -> None:
+    """Row-lock performances in ascending id order.
+
+    Every write path touching seats of several performances takes these
+    locks first and always in the same order, so concurrent reservations
+    queue up instead of deadlocking.
+    """
+    list(
+        Performance.objects.select_for_update()
+        .filter(pk__in=set(performance_ids))
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
@@ -0,0 +1,118 @@
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from theatre import benchmarks
+from theatre.seeding import seed
+
+
+class Command(BaseCommand):
+    """Command to benchmark every API route in-process"""
+
+    help = (
+        "Seed a throwaway dataset, drive the theatre and user routes and "
+        "report p50/p95 latency, queries and peak memory per route. "
+        "Writes a JSON baseline and flags regressions against one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiply the row counts of the seeded dataset.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--existing",
+            action="store_true",
+            help="Benchmark the data already in the database, no seeding.",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            help="Only run scenarios whose name contains one of these.",
+        )
+        parser.add_argument(
+            "--output", help="Write the results to this JSON baseline."
+        )
+        parser.add_argument(
+            "--baseline", help="Compare the results with this JSON baseline."
+        )
+        parser.add_argument(
+            "--latency-tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed relative p50/p95 slowdown (default 25%%).",
+        )
+        parser.add_argument(
+            "--memory-tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed relative peak memory growth (default 25%%).",
+        )
+
+    def handle(self, *args, **options):
+        if not options["existing"] and benchmarks.has_data():
+            raise CommandError(
+                "The database already has data, seeding on top of it would "
+                "make runs incomparable. Use an empty database, or "
+                "--existing to benchmark the data as it is."
+            )
+        with transaction.atomic():
+            if not options["existing"]:
+                dataset = benchmarks.dataset(
+                    options["scale"], options["seed"]
+                )
+                seed(dataset, log=self.stdout.write)
+            results = benchmarks.run(
+                options["iterations"], options["warmup"], options["only"]
+            )
+            # benchmarks write reservations and users, never keep them
+            transaction.set_rollback(True)
+
+        self.report(results)
+        if options["output"]:
+            benchmarks.write_baseline(
+                options["output"],
+                results,
+                {
+                    "database": connection.vendor,
+                    "python": platform.python_version(),
+                    "iterations": options["iterations"],
+                    "scale": options["scale"],
+                    "seed": options["seed"],
+                    "existing": options["existing"],
+                },
+            )
+            self.stdout.write(f"Baseline written to {options['output']}.")
+        if options["baseline"]:
+            regressions = benchmarks.compare(
+                results,
+                benchmarks.load_baseline(options["baseline"]),
+                latency_tolerance=options["latency_tolerance"],
+                memory_tolerance=options["memory_tolerance"],
+            )
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(str(regression)))
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} regressions against "
+                    f"{options['baseline']}."
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions."))
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'route':<30} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'queries':>7} {'peak KB':>9}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result.name:<30} {result.p50_ms:>8.2f} "
+                f"{result.p95_ms:>8.2f} {result.queries:>7} "
+                f"{result.peak_kb:>9.1f}"
+            )
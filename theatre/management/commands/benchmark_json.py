@@ -0,0 +1,99 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from theatre import benchmarks
+from theatre.parsers import FastJSONParser
+from theatre.renderers import FastJSONRenderer, orjson
+from theatre.seeding import seed
+
+
+class Command(BaseCommand):
+    """Command to compare the JSON renderers and parsers on API payloads"""
+
+    help = (
+        "Seed a throwaway dataset, collect the payload of every JSON read "
+        "route and time rendering and parsing them with DRF's stdlib "
+        "JSONRenderer/JSONParser against FastJSONRenderer/FastJSONParser."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiply the row counts of the seeded dataset.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--existing",
+            action="store_true",
+            help="Use the data already in the database, no seeding.",
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(
+                self.style.WARNING(
+                    "orjson is not installed, both sides use the stdlib."
+                )
+            )
+        with transaction.atomic():
+            if not options["existing"]:
+                seed(benchmarks.dataset(options["scale"], options["seed"]))
+            payloads = benchmarks.json_payloads()
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{'route':<30} {'bytes':>7} {'render us':>17} "
+            f"{'parse us':>17}"
+        )
+        different = []
+        totals = [0.0] * 4
+        for name, data in payloads.items():
+            rendered = JSONRenderer().render(data)
+            if FastJSONRenderer().render(data) != rendered:
+                different.append(name)
+            timings = [
+                self.best_of(options["repeat"], lambda: renderer.render(data))
+                for renderer in (JSONRenderer(), FastJSONRenderer())
+            ] + [
+                self.best_of(
+                    options["repeat"],
+                    lambda: parser.parse(io.BytesIO(rendered)),
+                )
+                for parser in (JSONParser(), FastJSONParser())
+            ]
+            totals = [total + timing for total, timing in zip(totals, timings)]
+            self.stdout.write(self.row(name, len(rendered), timings))
+        self.stdout.write(self.row("total", None, totals))
+
+        if different:
+            raise CommandError(
+                f"FastJSONRenderer output differs for: {', '.join(different)}"
+            )
+
+    @staticmethod
+    def best_of(repeat, run) -> float:
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    @staticmethod
+    def row(name, size, timings) -> str:
+        stdlib_render, fast_render, stdlib_parse, fast_parse = (
+            timing * 1e6 for timing in timings
+        )
+        return (
+            f"{name:<30} {'' if size is None else size:>7} "
+            f"{stdlib_render:>7.1f} -> {fast_render:>6.1f} "
+            f"{stdlib_parse:>7.1f} -> {fast_parse:>6.1f}"
+        )
@@ -0,0 +1,105 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from theatre.rows import row_format
+from theatre.seeding import SeedOptions, seed
+from theatre.views import PerformanceViewSet, PlayViewSet
+
+
+class Command(BaseCommand):
+    """Command to compare list serialization with and without row formats"""
+
+    help = (
+        "Seed a throwaway dataset and time fetching and serializing "
+        "list pages through the DRF serializers against values() rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--existing",
+            action="store_true",
+            help="Use the data already in the database, no seeding.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options["existing"]:
+                seed(
+                    SeedOptions(
+                        plays=options["rows"],
+                        actors=options["rows"],
+                        performances=options["rows"],
+                        reservations=options["rows"],
+                        tickets=options["rows"] * 3,
+                        seed=options["seed"],
+                    )
+                )
+            for view_class in (PlayViewSet, PerformanceViewSet):
+                self.report(view_class, options["rows"], options["repeat"])
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def best_of(repeat, run) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def report(self, view_class, limit, repeat):
+        view = view_class(action="list", kwargs={}, format_kwarg=None)
+        view.request = Request(APIRequestFactory().get("/"))
+        serializer_class = view.get_serializer_class()
+        queryset = view.get_queryset()[:limit]
+        rows = row_format(serializer_class)
+
+        instances = list(queryset.all())
+        values = list(rows.values(queryset))
+        slow_data = serializer_class(instances, many=True).data
+        fast_data = rows.to_data(values)
+        renderer = JSONRenderer()
+        identical = renderer.render(slow_data) == renderer.render(fast_data)
+
+        timings = {
+            "fetch + serialize": (
+                self.best_of(
+                    repeat,
+                    lambda: serializer_class(
+                        list(queryset.all()), many=True
+                    ).data,
+                ),
+                self.best_of(
+                    repeat, lambda: rows.to_data(list(rows.values(queryset)))
+                ),
+            ),
+            "serialize only": (
+                self.best_of(
+                    repeat,
+                    lambda: serializer_class(instances, many=True).data,
+                ),
+                self.best_of(repeat, lambda: rows.to_data(values)),
+            ),
+        }
+
+        self.stdout.write(
+            f"{serializer_class.__name__}, {len(instances)} rows "
+            f"({'identical' if identical else 'DIFFERENT'} JSON):"
+        )
+        for name, (slow, fast) in timings.items():
+            self.stdout.write(
+                f"  {name}: serializer {slow * 1000:.1f}ms, "
+                f"rows {fast * 1000:.1f}ms ({slow / fast:.1f}x)"
+            )
+        if not identical:
+            self.stdout.write(
+                self.style.ERROR("  row format output differs!")
+            )
@@ -0,0 +1,145 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from theatre.models import Actor, Genre, Play
+from theatre.views import PlayViewSet
+
+# plan lines that mean a relation filter stopped being index-driven
+PLAN_SMELLS = re.compile(
+    r"SCAN theatre_play_(actors|genres)\b(?! USING)"
+    r"|TEMP B-TREE FOR DISTINCT"
+    r"|Seq Scan on theatre_play_(actors|genres)"
+    r"|HashAggregate|Unique",
+)
+
+
+class Command(BaseCommand):
+    """Command to compare query plans of the play relation filters"""
+
+    help = (
+        "Seed a throwaway catalogue, then EXPLAIN and time the PlayViewSet "
+        "relation filters against the legacy join + DISTINCT query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plays", type=int, default=100_000)
+        parser.add_argument("--actors", type=int, default=5_000)
+        parser.add_argument("--genres", type=int, default=40)
+        parser.add_argument("--links", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the seeded catalogue instead of rolling it back.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            self.report(options["repeat"])
+            transaction.set_rollback(not options["keep"])
+
+    def seed(self, options):
+        rng = random.Random(0)
+        started = time.perf_counter()
+        genres = Genre.objects.bulk_create(
+            Genre(name=f"Genre {i}") for i in range(options["genres"])
+        )
+        actors = Actor.objects.bulk_create(
+            (
+                Actor(first_name="Actor", last_name=str(i))
+                for i in range(options["actors"])
+            ),
+            batch_size=1000,
+        )
+        plays = Play.objects.bulk_create(
+            (
+                Play(title=f"Play {i:06d}", description="x" * 200)
+                for i in range(options["plays"])
+            ),
+            batch_size=1000,
+        )
+        links = options["links"]
+        Play.genres.through.objects.bulk_create(
+            (
+                Play.genres.through(play_id=play.id, genre_id=genre.id)
+                for play in plays
+                for genre in rng.sample(genres, min(links, len(genres)))
+            ),
+            batch_size=5000,
+        )
+        Play.actors.through.objects.bulk_create(
+            (
+                Play.actors.through(play_id=play.id, actor_id=actor.id)
+                for play in plays
+                for actor in rng.sample(actors, min(links, len(actors)))
+            ),
+            batch_size=5000,
+        )
+        self.genre_ids = [genre.id for genre in genres[:2]]
+        self.actor_ids = [actor.id for actor in actors[:2]]
+        self.stdout.write(
+            f"Seeded {len(plays)} plays in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+    def play_queryset(self, **params):
+        view = PlayViewSet(action="list", kwargs={}, format_kwarg=None)
+        view.request = Request(APIRequestFactory().get("/", params))
+        return view.get_queryset()
+
+    def scenarios(self):
+        genres = ",".join(map(str, self.genre_ids))
+        actors = ",".join(map(str, self.actor_ids))
+        return {
+            "legacy genres join + distinct": Play.objects.filter(
+                genres__id__in=self.genre_ids
+            ).distinct(),
+            "genres any": self.play_queryset(genres=genres),
+            "genres all": self.play_queryset(
+                genres=genres, genres_match="all"
+            ),
+            "actors any": self.play_queryset(actors=actors),
+            "actors all": self.play_queryset(
+                actors=actors, actors_match="all"
+            ),
+            "genres any + actors any": self.play_queryset(
+                genres=genres, actors=actors
+            ),
+        }
+
+    @staticmethod
+    def best_of(repeat, run) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def report(self, repeat):
+        for name, queryset in self.scenarios().items():
+            plan = queryset.explain()
+            page = self.best_of(repeat, lambda: list(queryset[:20]))
+            count = self.best_of(repeat, queryset.count)
+
+            smells = [
+                line.strip()
+                for line in plan.splitlines()
+                if PLAN_SMELLS.search(line)
+            ]
+            style = self.style.WARNING if smells else self.style.SUCCESS
+            self.stdout.write(
+                style(
+                    f"{name}: first page {page * 1000:.1f}ms, "
+                    f"count {count * 1000:.1f}ms, "
+                    f"{'NOT index-driven' if smells else 'index-driven'}"
+                )
+            )
+            self.stdout.write(plan)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from theatre.compression import compression_stats, reset_compression_stats
+
+
+class Command(BaseCommand):
+    """Command to report response compression per route"""
+
+    help = (
+        "Print compressed responses, bytes saved, compression ratio and "
+        "CPU time per route."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the stats after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        stats = compression_stats()
+        if not stats:
+            self.stdout.write("No compressible responses recorded.")
+        else:
+            self.stdout.write(
+                f"{'route':<45} {'resp':>6} {'compr':>6} {'KB in':>9} "
+                f"{'KB out':>9} {'ratio':>6} {'cpu ms':>7}"
+            )
+        for row in stats:
+            ratio = f"{row['ratio']:.1f}x" if row["ratio"] else "-"
+            self.stdout.write(
+                f"{row['route']:<45} {row['responses']:>6} "
+                f"{row['compressed']:>6} {row['bytes_in'] / 1024:>9.1f} "
+                f"{row['bytes_out'] / 1024:>9.1f} {ratio:>6} "
+                f"{row['avg_cpu_ms']:>7.3f}"
+            )
+        if options["reset"]:
+            reset_compression_stats()
@@ -0,0 +1,137 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+ACTIVITY_SQL = (
+    "SELECT coalesce(state, 'unknown'), count(*), "
+    "count(*) FILTER (WHERE wait_event_type IS NOT NULL), "
+    "coalesce(max(extract(epoch FROM now() - state_change)), 0) "
+    "FROM pg_stat_activity WHERE datname = current_database() "
+    "GROUP BY 1 ORDER BY 1"
+)
+
+
+class Command(BaseCommand):
+    """Command to report database connection reuse and pool usage"""
+
+    help = (
+        "Print connection settings, the cost of opening a connection "
+        "against reusing one, server connections by state and, behind "
+        "PgBouncer, pool sizes and client wait times."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=5,
+            help="Connections to open when timing connection setup.",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        settings_dict = connection.settings_dict
+        self.stdout.write(
+            f"{options['database']}: {connection.vendor}, "
+            f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}, "
+            f"CONN_HEALTH_CHECKS={settings_dict['CONN_HEALTH_CHECKS']}, "
+            f"pooler={os.environ.get('DB_POOLER') or 'none'}"
+        )
+
+        connect_ms, query_ms = self.time_connections(
+            connection, options["samples"]
+        )
+        self.stdout.write(
+            f"new connection + SELECT 1: {connect_ms:.2f}ms, "
+            f"reused connection SELECT 1: {query_ms:.2f}ms"
+        )
+
+        if connection.vendor == "postgresql":
+            self.report_activity(connection)
+            if os.environ.get("DB_POOLER") == "pgbouncer":
+                self.report_pools(settings_dict)
+
+    @staticmethod
+    def time_connections(connection, samples: int) -> tuple[float, float]:
+        """Average ms of a query on a fresh and on a reused connection."""
+
+        def select_one():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+
+        fresh = []
+        for _ in range(max(samples, 1)):
+            connection.close()
+            started = time.perf_counter()
+            select_one()
+            fresh.append(time.perf_counter() - started)
+
+        reused = []
+        for _ in range(max(samples, 1)):
+            started = time.perf_counter()
+            select_one()
+            reused.append(time.perf_counter() - started)
+
+        return (
+            sum(fresh) / len(fresh) * 1000,
+            sum(reused) / len(reused) * 1000,
+        )
+
+    def report_activity(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW max_connections")
+            (max_connections,) = cursor.fetchone()
+            cursor.execute(ACTIVITY_SQL)
+            rows = cursor.fetchall()
+
+        self.stdout.write(
+            f"server connections ({max_connections} max): "
+            f"{sum(row[1] for row in rows)}"
+        )
+        for state, count, waiting, longest in rows:
+            self.stdout.write(
+                f"  {state:<30} {count:>5} ({waiting} waiting), "
+                f"longest in state {longest:.1f}s"
+            )
+
+    def report_pools(self, settings_dict):
+        """``SHOW POOLS`` from the PgBouncer admin console."""
+        import psycopg2
+
+        console = psycopg2.connect(
+            dbname="pgbouncer",
+            user=os.environ.get(
+                "PGBOUNCER_ADMIN_USER", settings_dict["USER"]
+            ),
+            password=os.environ.get(
+                "PGBOUNCER_ADMIN_PASSWORD", settings_dict["PASSWORD"]
+            ),
+            host=settings_dict["HOST"],
+            port=settings_dict["PORT"] or None,
+        )
+        console.autocommit = True
+        try:
+            with console.cursor() as cursor:
+                cursor.execute("SHOW POOLS")
+                columns = [column.name for column in cursor.description]
+                pools = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            console.close()
+
+        self.stdout.write("pgbouncer pools:")
+        for pool in pools:
+            if pool["database"] == "pgbouncer":
+                continue
+            wait = pool.get("maxwait", 0) + pool.get("maxwait_us", 0) / 1e6
+            self.stdout.write(
+                f"  {pool['database']}/{pool['user']} "
+                f"({pool.get('pool_mode', '?')}): "
+                f"clients {pool['cl_active']} active, "
+                f"{pool['cl_waiting']} waiting (longest {wait:.3f}s); "
+                f"servers {pool['sv_active']} active, "
+                f"{pool['sv_idle']} idle, {pool['sv_used']} used"
+            )
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from theatre.cache import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    """Command to report hit rate of the performance response cache"""
+
+    help = "Print performance cache hits, misses and invalidations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.PERFORMANCE_CACHE_ENABLED:
+            self.stdout.write(
+                "The performance cache is disabled, "
+                "set REDIS_URL or PERFORMANCE_CACHE_ENABLED."
+            )
+            return
+        stats = cache_stats()
+        self.stdout.write(
+            f"hits: {stats['hits']}\n"
+            f"misses: {stats['misses']}\n"
+            f"invalidations: {stats['invalidations']}\n"
+            f"hit rate: {stats['hit_rate']:.1%}"
+        )
+        if options["reset"]:
+            reset_cache_stats()
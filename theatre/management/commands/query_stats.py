@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from theatre.queries import query_stats, reset_query_stats
+
+
+class Command(BaseCommand):
+    """Command to report SQL queries per API view action"""
+
+    help = (
+        "Print query count, SQL time and slowest query per view action, "
+        "over the requests sampled by QUERY_STATS_SAMPLE_RATE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sql",
+            action="store_true",
+            help="Also print the slowest statement of each view action.",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the stats after printing them.",
+        )
+
+    def handle(self, *args, **options):
+        stats = query_stats()
+        if not stats:
+            self.stdout.write("No requests recorded.")
+        else:
+            self.stdout.write(
+                f"{'view':<40} {'requests':>8} {'avg q':>6} {'max q':>6} "
+                f"{'avg ms':>8} {'slow ms':>8} {'over':>5}"
+            )
+        for row in stats:
+            self.stdout.write(
+                f"{row['view']:<40} {row['requests']:>8} "
+                f"{row['avg_queries']:>6.1f} {row['max_queries']:>6} "
+                f"{row['avg_sql_ms']:>8.2f} {row['slowest_ms']:>8.2f} "
+                f"{row['over_budget']:>5}"
+            )
+            if options["sql"] and row["slowest_sql"]:
+                self.stdout.write(f"    {row['slowest_sql']}")
+        if options["reset"]:
+            reset_query_stats()
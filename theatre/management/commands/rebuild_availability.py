@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from theatre.availability import find_drift, rebuild_availability
+
+
+class Command(BaseCommand):
+    """Command to check and recount performance availability summaries"""
+
+    help = (
+        "Report performances whose sold and remaining seats disagree with "
+        "their tickets, exiting non-zero if any do. With --repair, rebuild "
+        "every summary from the tickets, in chunks spread over workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Rebuild the summaries instead of only reporting drift.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Performances summarized per query and transaction.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes rebuilding chunks in parallel (not on SQLite).",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(options["chunk_size"], 1)
+        drift = find_drift(chunk_size=chunk_size)
+        for performance_id, summary_sold, sold in drift:
+            self.stdout.write(
+                f"Performance {performance_id}: summary "
+                f"{'missing' if summary_sold is None else summary_sold}, "
+                f"tickets {sold}"
+            )
+
+        if not options["repair"]:
+            if drift:
+                raise CommandError(
+                    f"{len(drift)} drifted summaries, "
+                    "rerun with --repair to rebuild them."
+                )
+            self.stdout.write(self.style.SUCCESS("No drifted summaries."))
+            return
+
+        started = time.perf_counter()
+        rebuilt = rebuild_availability(
+            chunk_size=chunk_size, workers=options["workers"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt availability of {rebuilt} performances in "
+                f"{time.perf_counter() - started:.1f}s."
+            )
+        )
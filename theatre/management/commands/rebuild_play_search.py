@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from theatre.search import rebuild_index, supports_search
+
+
+class Command(BaseCommand):
+    """Command to rebuild the full-text play search index"""
+
+    help = "Reindex every play, e.g. after bulk writes that skip signals."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not supports_search():
+            self.stdout.write("No search index on this database backend.")
+            return
+        with transaction.atomic():
+            indexed = rebuild_index(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} plays."))
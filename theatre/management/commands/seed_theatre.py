@@ -0,0 +1,61 @@
+import time
+from dataclasses import fields
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from theatre.seeding import SeedOptions, flush, seed
+
+
+class Command(BaseCommand):
+    """Command to fill the database with synthetic theatre data"""
+
+    help = (
+        "Seed halls, plays, actors, genres, performances, users, "
+        "reservations and tickets with batched bulk inserts. The same "
+        "options and --seed always give the same data."
+    )
+
+    def add_arguments(self, parser):
+        for field in fields(SeedOptions):
+            parser.add_argument(
+                f"--{field.name.replace('_', '-')}",
+                type=int,
+                default=field.default,
+            )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Empty theatre tables and drop seeded users first.",
+        )
+
+    def handle(self, *args, **options):
+        seed_options = SeedOptions(
+            **{
+                field.name: options[field.name]
+                for field in fields(SeedOptions)
+            }
+        )
+        if seed_options.workers > 1 and connection.vendor == "sqlite":
+            self.stdout.write(
+                self.style.WARNING(
+                    "SQLite allows one writer at a time, using 1 worker."
+                )
+            )
+
+        started = time.perf_counter()
+        if options["flush"]:
+            flush()
+        counts = seed(seed_options, log=self.stdout.write)
+        # responses cached before are keyed by ids the new rows may reuse
+        cache.clear()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                ", ".join(f"{count} {name}" for name, count in counts.items())
+                + f" seeded in {elapsed:.1f}s "
+                f"({counts['tickets'] / max(elapsed, 1e-9):,.0f} tickets/s)."
+            )
+        )
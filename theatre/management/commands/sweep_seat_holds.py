@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from theatre.holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    """Command to reclaim seats of expired holds"""
+
+    help = "Delete expired seat holds, once or every --interval seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep sweeping every N seconds instead of running once.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        while True:
+            swept = sweep_expired_holds(batch_size=options["batch_size"])
+            self.stdout.write(f"Swept {swept} expired seat holds.")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from theatre.replicas import sync_sqlite
+
+SQLITE_ENGINE = "django.db.backends.sqlite3"
+
+
+class Command(BaseCommand):
+    """Command to refresh local SQLite read replicas from the primary"""
+
+    help = (
+        "Copy the primary SQLite database to every DATABASE_REPLICAS "
+        "file, once or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep syncing every N seconds instead of running once.",
+        )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if primary["ENGINE"] != SQLITE_ENGINE:
+            raise CommandError(
+                "Only SQLite replicas are synced here, other databases "
+                "replicate on their own."
+            )
+        if not settings.DATABASE_REPLICAS:
+            self.stdout.write("No replicas configured (SQLITE_REPLICAS).")
+            return
+
+        while True:
+            started = time.perf_counter()
+            for alias in settings.DATABASE_REPLICAS:
+                sync_sqlite(
+                    str(primary["NAME"]),
+                    str(settings.DATABASES[alias]["NAME"]),
+                )
+            self.stdout.write(
+                f"Synced {len(settings.DATABASE_REPLICAS)} replicas in "
+                f"{(time.perf_counter() - started) * 1000:.0f}ms."
+            )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
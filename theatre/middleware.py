@@ -0,0 +1,184 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from theatre.compression import (
+    CompressionRecord,
+    StreamCompressor,
+    choose_encoding,
+    compress,
+    record_compression,
+)
+from theatre.queries import (
+    QueryBudgetExceeded,
+    QueryRecorder,
+    query_budget,
+    record_view_queries,
+    view_action,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetMiddleware:
+    """Record SQL per view action and check it against ``query_budgets``.
+
+    Views of ``QUERY_STATS_VIEW_MODULES`` have the query count, total
+    SQL time and slowest statement of a sample of requests added to the
+    aggregated stats of ``theatre.queries``. Going over a budget is
+    logged, or raises ``QueryBudgetExceeded`` when
+    ``QUERY_BUDGETS_ENFORCED`` is on, as it is under the test runner.
+    Queries run while a streaming response is consumed are not seen.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        resolved = (
+            view_action(request.resolver_match, request.method)
+            if request.resolver_match is not None
+            else None
+        )
+        if resolved is None:
+            return response
+        view_class, action = resolved
+        if view_class.__module__ not in settings.QUERY_STATS_VIEW_MODULES:
+            return response
+
+        label = f"{view_class.__name__}.{action}"
+        budget = query_budget(view_class, action)
+        record_view_queries(label, recorder, budget)
+        if budget is not None and recorder.queries > budget:
+            message = (
+                f"{label} ran {recorder.queries} queries, "
+                f"budget is {budget}"
+            )
+            if settings.QUERY_BUDGETS_ENFORCED:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as ``Accept-Encoding`` asks.
+
+    Only ``COMPRESSION_CONTENT_TYPES`` are compressed, never files under
+    ``MEDIA_URL`` or ``STATIC_URL``, nor responses that are already
+    encoded. Buffered bodies shorter than ``COMPRESSION_MIN_SIZE`` or
+    that would not shrink are sent as they are; streams are compressed
+    as they are consumed. Ratio and CPU time go to the per route
+    ``compression_stats``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(request, response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        label = self.route(request)
+        record = CompressionRecord()
+        encoding = choose_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        if encoding is None:
+            record_compression(label, record)
+            return response
+
+        if response.streaming:
+            compressor = StreamCompressor(encoding)
+            if response.is_async:
+                response.streaming_content = self.compress_async_stream(
+                    response.streaming_content, compressor, record, label
+                )
+            else:
+                response.streaming_content = self.compress_stream(
+                    response.streaming_content, compressor, record, label
+                )
+            del response["Content-Length"]
+        else:
+            content = response.content
+            if len(content) < settings.COMPRESSION_MIN_SIZE:
+                record_compression(label, record)
+                return response
+            compressed = record.run(
+                lambda data: compress(data, encoding), content
+            )
+            if len(compressed) >= len(content):
+                record_compression(label, CompressionRecord())
+                return response
+            record.compressed = True
+            record_compression(label, record)
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # the encoded body is not byte for byte the entity a strong tag names
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+    @staticmethod
+    def compressible(request, response) -> bool:
+        if response.has_header("Content-Encoding"):
+            return False
+        content_type = response.get("Content-Type", "").partition(";")[0]
+        if (
+            content_type.strip().lower()
+            not in settings.COMPRESSION_CONTENT_TYPES
+        ):
+            return False
+        if request.path.startswith(
+            (settings.MEDIA_URL, "/" + settings.STATIC_URL.lstrip("/"))
+        ):
+            return False
+        content_length = response.get("Content-Length")
+        return not (
+            response.streaming
+            and content_length
+            and int(content_length) < settings.COMPRESSION_MIN_SIZE
+        )
+
+    @staticmethod
+    def route(request) -> str:
+        match = request.resolver_match
+        view = match.view_name if match is not None else "unresolved"
+        return f"{view}:{request.method}"
+
+    @staticmethod
+    def compress_stream(chunks, compressor, record, label):
+        record.compressed = True
+        try:
+            for chunk in chunks:
+                data = record.run(compressor.compress, chunk)
+                if data:
+                    yield data
+            yield record.run(lambda _: compressor.finish(), b"")
+        finally:
+            record_compression(label, record)
+
+    @staticmethod
+    async def compress_async_stream(chunks, compressor, record, label):
+        record.compressed = True
+        try:
+            async for chunk in chunks:
+                data = record.run(compressor.compress, chunk)
+                if data:
+                    yield data
+            yield record.run(lambda _: compressor.finish(), b"")
+        finally:
+            record_compression(label, record)
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.6 on 2026-10-17 15:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_seat_maps(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    SeatMap = apps.get_model("theatre", "SeatMap")
+    Ticket = apps.get_model("theatre", "Ticket")
+
+    for performance in Performance.objects.select_related("theatre_hall"):
+        rows = performance.theatre_hall.rows
+        seats_in_row = performance.theatre_hall.seats_in_row
+        bitmap = bytearray((rows * seats_in_row + 7) // 8)
+        for row, seat in Ticket.objects.filter(
+            performance=performance
+        ).values_list("row", "seat"):
+            if 1 <= row <= rows and 1 <= seat <= seats_in_row:
+                index = (row - 1) * seats_in_row + (seat - 1)
+                bitmap[index // 8] |= 0x80 >> (index % 8)
+        SeatMap.objects.create(
+            performance=performance,
+            rows=rows,
+            seats_in_row=seats_in_row,
+            bitmap=bytes(bitmap),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0005_alter_play_actors_alter_play_genres"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatMap",
+            fields=[
+                (
+                    "performance",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="seat_map",
+                        serialize=False,
+                        to="theatre.performance",
+                    ),
+                ),
+                ("rows", models.IntegerField()),
+                ("seats_in_row", models.IntegerField()),
+                ("bitmap", models.BinaryField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-17 15:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_tickets_sold(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    Ticket = apps.get_model("theatre", "Ticket")
+
+    Performance.objects.update(
+        tickets_sold=Coalesce(
+            Subquery(
+                Ticket.objects.filter(performance=OuterRef("pk"))
+                .order_by()
+                .values("performance")
+                .annotate(sold=Count("id"))
+                .values("sold")
+            ),
+            Value(0),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0007_seathold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="performance",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_tickets_sold, migrations.RunPython.noop),
+    ]
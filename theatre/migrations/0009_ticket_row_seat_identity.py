@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-17 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0008_performance_tickets_sold"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="ticket",
+            name="unique_ticket_seat_performance",
+        ),
+        migrations.AddConstraint(
+            model_name="ticket",
+            constraint=models.UniqueConstraint(
+                fields=("performance", "row", "seat"),
+                name="unique_ticket_row_seat_performance",
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-17 16:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0009_ticket_row_seat_identity"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="performance",
+            index=models.Index(
+                fields=["-show_time", "id"],
+                name="theatre_per_show_ti_574036_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="play",
+            index=models.Index(
+                fields=["title", "id"], name="theatre_pla_title_97f6e4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reservation",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="theatre_res_user_id_3b3a95_idx",
+            ),
+        ),
+    ]
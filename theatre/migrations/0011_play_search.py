@@ -0,0 +1,79 @@
+from django.db import migrations
+
+# The index as of this migration; theatre.search keeps it up to date
+# afterwards. Column weights: title > actor/genre names > description.
+CREATE_SQL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE theatre_play_search USING fts5("
+        "title, description, actors, genres, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    ],
+    "postgresql": [
+        "CREATE TABLE theatre_play_search ("
+        "play_id integer PRIMARY KEY "
+        "REFERENCES theatre_play (id) ON DELETE CASCADE "
+        "DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX theatre_play_search_document_gin "
+        "ON theatre_play_search USING gin (document)",
+    ],
+}
+DROP_SQL = {
+    "sqlite": ["DROP TABLE IF EXISTS theatre_play_search"],
+    "postgresql": ["DROP TABLE IF EXISTS theatre_play_search"],
+}
+INSERT_SQL = {
+    "sqlite": "INSERT INTO theatre_play_search "
+    "(rowid, title, description, actors, genres) "
+    "VALUES (%s, %s, %s, %s, %s)",
+    "postgresql": "INSERT INTO theatre_play_search (play_id, document) "
+    "VALUES (%s, "
+    "setweight(to_tsvector('simple', %s), 'A') || "
+    "setweight(to_tsvector('simple', %s), 'C') || "
+    "setweight(to_tsvector('simple', %s), 'B') || "
+    "setweight(to_tsvector('simple', %s), 'B'))",
+}
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor not in CREATE_SQL:
+        return
+    for sql in CREATE_SQL[connection.vendor]:
+        schema_editor.execute(sql)
+
+    Play = apps.get_model("theatre", "Play")
+    plays = Play.objects.using(connection.alias).prefetch_related(
+        "actors", "genres"
+    )
+    documents = [
+        (
+            play.id,
+            play.title,
+            play.description,
+            " ".join(
+                f"{actor.first_name} {actor.last_name}"
+                for actor in play.actors.all()
+            ),
+            " ".join(genre.name for genre in play.genres.all()),
+        )
+        for play in plays
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(INSERT_SQL[connection.vendor], documents)
+
+
+def drop_search_index(apps, schema_editor):
+    for sql in DROP_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0010_cursor_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.6 on 2026-10-17 17:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def summarize_performances(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    PerformanceAvailability = apps.get_model(
+        "theatre", "PerformanceAvailability"
+    )
+
+    performances = Performance.objects.annotate(
+        sold=Count("ticket"),
+        first_sale_at=Min("ticket__reservation__created_at"),
+        last_sale_at=Max("ticket__reservation__created_at"),
+    ).values_list(
+        "id",
+        "theatre_hall__rows",
+        "theatre_hall__seats_in_row",
+        "sold",
+        "first_sale_at",
+        "last_sale_at",
+    )
+    PerformanceAvailability.objects.bulk_create(
+        (
+            PerformanceAvailability(
+                performance_id=performance_id,
+                tickets_sold=sold,
+                tickets_remaining=rows * seats_in_row - sold,
+                first_sale_at=first_sale_at,
+                last_sale_at=last_sale_at,
+            )
+            for (
+                performance_id,
+                rows,
+                seats_in_row,
+                sold,
+                first_sale_at,
+                last_sale_at,
+            ) in performances.iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0011_play_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PerformanceAvailability",
+            fields=[
+                (
+                    "performance",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="availability",
+                        serialize=False,
+                        to="theatre.performance",
+                    ),
+                ),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+                ("tickets_remaining", models.IntegerField(default=0)),
+                ("first_sale_at", models.DateTimeField(null=True)),
+                ("last_sale_at", models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.RunPython(
+            summarize_performances, migrations.RunPython.noop
+        ),
+    ]
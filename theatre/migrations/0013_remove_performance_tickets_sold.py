@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-17 18:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("theatre", "0012_performanceavailability"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="performance",
+            name="tickets_sold",
+        ),
+    ]
@@ -0,0 +1,271 @@
+import hashlib
+import math
+from functools import cached_property
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from theatre.cache import tables_modified
+from theatre.fieldsets import (
+    FIELDS_PARAM,
+    OMIT_PARAM,
+    load_only,
+    parse_names,
+    select_fields,
+)
+from theatre.replicas import (
+    pin_user,
+    start_replica_reads,
+    stop_replica_reads,
+    user_pinned,
+)
+from theatre.pagination import ordering_fields
+from theatre.rows import row_format
+from theatre.serializers import BatchRetrieveQuerySerializer
+
+
+class ConditionalGetMixin:
+    """ETag and Last-Modified support for ``list`` and ``retrieve``.
+
+    Validators come from change watermarks of ``conditional_tables``
+    bumped by model signals, so a matching ``If-None-Match`` or
+    ``If-Modified-Since`` is answered with 304 before the queryset or the
+    serializer run. Both actions read the primary: a body read from a
+    lagging replica would be stored under the primary's newer validators
+    and revalidated as fresh until the next write.
+
+    Disabled unless ``CONDITIONAL_GET_ENABLED``: the watermarks live in
+    the default cache and workers with a cache of their own would keep
+    answering 304 for tables another worker changed. Disabled, both
+    actions may read a replica again.
+    """
+
+    conditional_tables = ()
+
+    @property
+    def primary_read_actions(self) -> tuple[str, ...]:
+        if settings.CONDITIONAL_GET_ENABLED:
+            return ("list", "retrieve")
+        return ()
+
+    def get_validators(self, request) -> tuple[str, int]:
+        modified = tables_modified(self.conditional_tables)
+        representation = "|".join(
+            (
+                self.basename,
+                self.action,
+                str(sorted(self.kwargs.items())),
+                request.query_params.urlencode(),
+                request.accepted_media_type or "",
+                repr(modified),
+            )
+        )
+        etag = hashlib.md5(
+            representation.encode(), usedforsecurity=False
+        ).hexdigest()
+        return quote_etag(etag), math.ceil(modified)
+
+    def conditional_response(self, request, build):
+        if not settings.CONDITIONAL_GET_ENABLED:
+            return build()
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = build()
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+
+class ReplicaReadMixin:
+    """Serve safe requests from a read replica.
+
+    A user's successful write pins their following requests to the
+    primary for ``REPLICA_PIN_SECONDS``, so they see their own
+    reservations while the replicas lag behind. Actions named in a
+    ``primary_read_actions`` attribute always read the primary. Other
+    responses may reflect a lagging replica; cached performance
+    responses built from one are served until the performance changes
+    again or the cache entry expires.
+
+    The pins live in the default cache, so replicas are only read with
+    a ``SHARED_CACHE``; a pin in one worker's own cache would not keep
+    the user's next request, served by another worker, on the primary.
+    """
+
+    _replica_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            settings.SHARED_CACHE
+            and request.method in SAFE_METHODS
+            and self.action not in getattr(self, "primary_read_actions", ())
+            and not user_pinned(request.user)
+        ):
+            self._replica_token = start_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        stop_replica_reads(self._replica_token)
+        self._replica_token = None
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            pin_user(request.user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class SparseFieldsMixin:
+    """``?fields=`` and ``?omit=`` select the output fields of reads.
+
+    The serializer drops the other fields and the queryset defers what
+    only they read; ``field_sources`` names the model fields read by
+    outputs that are not model fields themselves. ``get_queryset``
+    should add annotations and prefetches only for fields it ``wants``.
+    """
+
+    field_sources = {}
+
+    @cached_property
+    def readable_fields(self) -> tuple[str, ...]:
+        serializer = self.get_serializer_class()(
+            context=self.get_serializer_context()
+        )
+        return tuple(
+            name
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        )
+
+    @cached_property
+    def sparse_fields(self) -> tuple[str, ...] | None:
+        """Output fields selected by the request, ``None`` for all."""
+        params = self.request.query_params
+        fields = parse_names(params.get(FIELDS_PARAM))
+        omit = parse_names(params.get(OMIT_PARAM))
+        if self.request.method not in SAFE_METHODS or not (fields or omit):
+            return None
+        return select_fields(self.readable_fields, fields, omit)
+
+    def wants(self, name: str) -> bool:
+        """Whether the output field ``name`` is rendered."""
+        if self.sparse_fields is None:
+            return name in self.readable_fields
+        return name in self.sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.sparse_fields is not None and "data" not in kwargs:
+            fields = getattr(serializer, "child", serializer).fields
+            for name in set(fields) - set(self.sparse_fields):
+                fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.sparse_fields is None:
+            return queryset
+        return load_only(
+            queryset,
+            self.get_serializer().fields,
+            self.field_sources,
+            ordering_fields(self.paginator),
+        )
+
+
+class ValuesListMixin:
+    """Serve ``list`` from ``.values()`` rows instead of model instances.
+
+    Rows go through the ``RowFormat`` compiled from the list serializer,
+    which skips instance building and per-field binding but renders the
+    same JSON, fields trimmed by ``get_serializer`` included. Set
+    ``values_list = False`` to use the serializer.
+    """
+
+    values_list = True
+
+    def list(self, request, *args, **kwargs):
+        if not self.values_list:
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.get_serializer()
+        rows = row_format(type(serializer), tuple(serializer.fields))
+        queryset = rows.values(
+            self.filter_queryset(self.get_queryset()),
+            ordering_fields(self.paginator),
+        )
+        page = self.paginate_queryset(queryset)
+        # serializer attached like to serializer.data, for the renderer
+        data = ReturnList(
+            rows.to_data(queryset if page is None else page),
+            serializer=serializer,
+        )
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class BatchRetrieveMixin:
+    """``GET batch/?ids=1,2,3`` renders several objects like ``retrieve``.
+
+    All of them load through ``get_queryset`` at once, so a batch costs
+    as many queries as a single object; ``get_queryset`` and
+    ``get_serializer_class`` treat the ``batch`` action as ``retrieve``.
+    Objects come in the order of ``ids``, missing ones are left out.
+    """
+
+    batch_max_size = 50
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "ids",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Comma separated IDs",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def batch(self, request):
+        """Get several objects by ID in one request."""
+        query = BatchRetrieveQuerySerializer(
+            data=request.query_params,
+            context={"max_size": self.batch_max_size},
+        )
+        query.is_valid(raise_exception=True)
+        ids = query.validated_data["ids"]
+
+        objects = self.filter_queryset(self.get_queryset()).in_bulk(ids)
+        serializer = self.get_serializer(
+            [objects[id_] for id_ in ids if id_ in objects], many=True
+        )
+        return Response(serializer.data)
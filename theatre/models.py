@@ -6,7 +6,7 @@ from django.db import models
 from django.db.models import UniqueConstraint
 from rest_framework.exceptions import ValidationError
 from django.utils.text import slugify
-from typing import Type
+from typing import Iterable, Iterator, Type
 
 
 def play_image_file_path(play: "Play", filename: str) -> pathlib.Path:
@@ -24,6 +24,7 @@ class Play(models.Model):
 
     class Meta:
         ordering = ["title"]
+        indexes = [models.Index(fields=["title", "id"])]
 
     def __str__(self: "Play") -> str:
         return self.title
@@ -49,11 +50,37 @@ class Performance(models.Model):
 
     class Meta:
         ordering = ["-show_time"]
+        indexes = [models.Index(fields=["-show_time", "id"])]
 
     def __str__(self: "Performance") -> str:
         return self.play.title + " " + str(self.show_time)
 
 
+class PerformanceAvailability(models.Model):
+    """Sold and remaining seats of a performance, kept up to date on sale.
+
+    Sale times are the first and last time a ticket still sold was
+    bought; freeing seats leaves them until the summary is rebuilt.
+    """
+
+    performance = models.OneToOneField(
+        Performance,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="availability",
+    )
+    tickets_sold = models.PositiveIntegerField(default=0)
+    tickets_remaining = models.IntegerField(default=0)
+    first_sale_at = models.DateTimeField(null=True)
+    last_sale_at = models.DateTimeField(null=True)
+
+    def __str__(self: "PerformanceAvailability") -> str:
+        return (
+            f"{self.performance_id}: {self.tickets_sold} sold, "
+            f"{self.tickets_remaining} remaining"
+        )
+
+
 class Ticket(models.Model):
     row = models.IntegerField()
     seat = models.IntegerField()
@@ -65,8 +92,8 @@ class Ticket(models.Model):
     class Meta:
         constraints = [
             UniqueConstraint(
-                fields=["seat", "performance"],
-                name="unique_ticket_seat_performance",
+                fields=["performance", "row", "seat"],
+                name="unique_ticket_row_seat_performance",
             )
         ]
 
@@ -116,6 +143,38 @@ class Ticket(models.Model):
         )
 
 
+class SeatHold(models.Model):
+    """Temporary claim on a seat while its holder checks out."""
+
+    performance = models.ForeignKey(
+        Performance, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["performance", "row", "seat"],
+                name="unique_seat_hold_performance",
+            )
+        ]
+        indexes = [models.Index(fields=["performance", "expires_at"])]
+
+    def __str__(self: "SeatHold") -> str:
+        return (
+            f"{self.performance_id} (row: {self.row}, seat: {self.seat}) "
+            f"until {self.expires_at}"
+        )
+
+
 class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
@@ -127,6 +186,7 @@ class Reservation(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "-created_at", "-id"])]
 
 
 class Actor(models.Model):
@@ -146,3 +206,73 @@ class Genre(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class SeatMap(models.Model):
+    """Packed occupancy bitset of a performance.
+
+    Seats are laid out row-major: bit ``(row - 1) * seats_in_row +
+    (seat - 1)`` is set when the seat is taken, most significant bit
+    of each byte first.
+    """
+
+    performance = models.OneToOneField(
+        Performance,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="seat_map",
+    )
+    rows = models.IntegerField()
+    seats_in_row = models.IntegerField()
+    bitmap = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self: "SeatMap") -> str:
+        return f"Seat map of {self.performance_id}"
+
+    @staticmethod
+    def empty_bitmap(rows: int, seats_in_row: int) -> bytearray:
+        return bytearray((rows * seats_in_row + 7) // 8)
+
+    def matches(self: "SeatMap", theatre_hall: "TheatreHall") -> bool:
+        return (
+            self.rows == theatre_hall.rows
+            and self.seats_in_row == theatre_hall.seats_in_row
+        )
+
+    def _index(self: "SeatMap", row: int, seat: int) -> int:
+        return (row - 1) * self.seats_in_row + (seat - 1)
+
+    def set_seats(
+        self: "SeatMap", seats: Iterable[tuple[int, int]], taken: bool
+    ) -> None:
+        bitmap = bytearray(self.bitmap)
+        for row, seat in seats:
+            if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+                continue
+            index = self._index(row, seat)
+            mask = 0x80 >> (index % 8)
+            if taken:
+                bitmap[index // 8] |= mask
+            else:
+                bitmap[index // 8] &= ~mask
+        self.bitmap = bytes(bitmap)
+
+    def is_taken(self: "SeatMap", row: int, seat: int) -> bool:
+        index = self._index(row, seat)
+        return bool(self.bitmap[index // 8] & (0x80 >> (index % 8)))
+
+    @property
+    def taken_count(self: "SeatMap") -> int:
+        return int.from_bytes(self.bitmap, "big").bit_count()
+
+    def taken_seats(self: "SeatMap") -> Iterator[tuple[int, int]]:
+        """Yield taken ``(row, seat)`` pairs in row-major order."""
+        for byte_index, byte in enumerate(bytes(self.bitmap)):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (0x80 >> bit):
+                    index = byte_index * 8 + bit
+                    row, seat = divmod(index, self.seats_in_row)
+                    yield row + 1, seat + 1
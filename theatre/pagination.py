@@ -0,0 +1,101 @@
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.settings import api_settings
+
+
+def ordering_fields(paginator) -> tuple[str, ...]:
+    """Fields ``paginator`` may read from the rows of a page."""
+    ordering = getattr(paginator, "cursor_ordering", None) or getattr(
+        paginator, "ordering", ()
+    )
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    return tuple(name.lstrip("-") for name in ordering)
+
+
+class OptInCursorPagination(BasePagination):
+    """Page number pagination unless the client asks for a cursor.
+
+    ``?pagination=cursor`` (and the ``cursor`` links it hands out) switch
+    a request to keyset pagination over ``cursor_ordering``: no COUNT(*)
+    and no OFFSET, so a deep page costs the same as the first one.
+    Requests with any of ``page_number_params``, which order the rows
+    otherwise, keep page numbers.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = None
+    cursor_ordering = ("id",)
+    switch_query_param = "pagination"
+    page_number_params = ()
+
+    def __init__(self):
+        self.paginator = None
+
+    def wants_cursor(self, request) -> bool:
+        params = request.query_params
+        if any(param in params for param in self.page_number_params):
+            return False
+        return (
+            params.get(self.switch_query_param) == "cursor"
+            or CursorPagination.cursor_query_param in params
+        )
+
+    def get_paginator(self, request) -> BasePagination:
+        if self.wants_cursor(request):
+            paginator = CursorPagination()
+            paginator.ordering = self.cursor_ordering
+        else:
+            paginator = PageNumberPagination()
+            paginator.max_page_size = self.max_page_size
+        paginator.page_size = self.page_size
+        return paginator
+
+    @property
+    def display_page_controls(self) -> bool:
+        return getattr(self.paginator, "display_page_controls", False)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *PageNumberPagination().get_schema_operation_parameters(view),
+            *CursorPagination().get_schema_operation_parameters(view),
+            {
+                "name": self.switch_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'cursor' for keyset pagination.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+        ]
+
+
+class PlayPagination(OptInCursorPagination):
+    cursor_ordering = ("title", "id")
+    # search results come by relevance, which a cursor cannot follow
+    page_number_params = ("q",)
+
+
+class PerformancePagination(OptInCursorPagination):
+    cursor_ordering = ("-show_time", "id")
+
+
+class ReservationPagination(OptInCursorPagination):
+    page_size = 3
+    max_page_size = 4
+    cursor_ordering = ("-created_at", "-id")
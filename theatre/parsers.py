@@ -0,0 +1,49 @@
+import codecs
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from theatre.renderers import FastJSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# digits enough for an integer beyond 64 bits, which orjson reads as a
+# float; strings matching too just take the stdlib path
+WIDE_NUMBER = re.compile(rb"\d{19}")
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` decoding UTF-8 bodies with orjson when installed.
+
+    orjson always rejects ``NaN`` and ``Infinity`` like the strict stdlib
+    parser; other charsets and non-strict parsing use the stdlib. So do
+    bodies with 19 digits in a row, as integers wider than 64 bits stay
+    ``int`` only there, and anything orjson rejects, such as ``1e400``
+    the stdlib reads as infinity, or invalid JSON.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get(
+            "encoding", settings.DEFAULT_CHARSET
+        )
+        if (
+            orjson is None
+            or not self.strict
+            or codecs.lookup(encoding).name != "utf-8"
+        ):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if not WIDE_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
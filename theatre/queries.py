@@ -0,0 +1,169 @@
+import random
+import time
+from dataclasses import dataclass
+from functools import cache as memoize
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import get_resolver
+
+STATS_KEY = "theatre:query-stats:{}:{}"
+COUNTERS = ("requests", "queries", "sql_us", "over_budget")
+SQL_PREVIEW_LENGTH = 500
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more SQL queries than its ``query_budgets`` allow."""
+
+
+@dataclass
+class QueryRecorder:
+    """``execute_wrapper`` counting and timing the queries it sees."""
+
+    queries: int = 0
+    duration: float = 0.0
+    slowest_duration: float = 0.0
+    slowest_sql: str = ""
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.duration += elapsed
+            if elapsed >= self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql
+
+
+def view_action(resolver_match, method: str) -> tuple[type, str] | None:
+    """View class and action (or handler name) a request resolved to."""
+    view_class = getattr(resolver_match.func, "cls", None)
+    if view_class is None:
+        return None
+    actions = getattr(resolver_match.func, "actions", None)
+    if actions is not None:
+        return view_class, actions.get(method.lower(), method.lower())
+    return view_class, method.lower()
+
+
+def query_budget(view_class: type, action: str) -> int | None:
+    return getattr(view_class, "query_budgets", {}).get(action)
+
+
+def _view_labels(patterns, labels: set) -> None:
+    for pattern in patterns:
+        if hasattr(pattern, "url_patterns"):
+            _view_labels(pattern.url_patterns, labels)
+            continue
+        view_class = getattr(pattern.callback, "cls", None)
+        if (
+            view_class is None
+            or view_class.__module__ not in settings.QUERY_STATS_VIEW_MODULES
+        ):
+            continue
+        actions = getattr(pattern.callback, "actions", None)
+        if actions is not None:
+            names = actions.values()
+        else:
+            names = [
+                method
+                for method in view_class.http_method_names
+                if hasattr(view_class, method)
+            ]
+        labels.update(f"{view_class.__name__}.{name}" for name in names)
+
+
+@memoize
+def stats_labels() -> frozenset[str]:
+    """Labels of every view action of ``QUERY_STATS_VIEW_MODULES``.
+
+    Read from the URLconf, so no shared label set is kept up to date
+    per request.
+    """
+    labels = set()
+    _view_labels(get_resolver().url_patterns, labels)
+    return frozenset(labels)
+
+
+def record_view_queries(label: str, recorder: QueryRecorder, budget) -> None:
+    """Add one request of ``label`` to the aggregated stats.
+
+    Only a ``QUERY_STATS_SAMPLE_RATE`` share of requests is recorded,
+    each with an atomic ``incr`` per counter and at most two round
+    trips for the peaks.
+    """
+    if label not in stats_labels():
+        return
+    if random.random() >= settings.QUERY_STATS_SAMPLE_RATE:
+        return
+
+    increments = {
+        "requests": 1,
+        "queries": recorder.queries,
+        "sql_us": round(recorder.duration * 1_000_000),
+        "over_budget": int(budget is not None and recorder.queries > budget),
+    }
+    for counter, delta in increments.items():
+        key = STATS_KEY.format(label, counter)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            if not cache.add(key, delta, timeout=None):
+                cache.incr(key, delta)
+
+    max_key = STATS_KEY.format(label, "max_queries")
+    slowest_key = STATS_KEY.format(label, "slowest")
+    peaks = cache.get_many([max_key, slowest_key])
+    updates = {}
+    if recorder.queries > peaks.get(max_key, -1):
+        updates[max_key] = recorder.queries
+    if recorder.slowest_duration > peaks.get(slowest_key, (0.0, ""))[0]:
+        updates[slowest_key] = (
+            recorder.slowest_duration,
+            recorder.slowest_sql[:SQL_PREVIEW_LENGTH],
+        )
+    if updates:
+        cache.set_many(updates, timeout=None)
+
+
+def query_stats() -> list[dict]:
+    """Per view action totals, most queries per request first."""
+    stats = []
+    for label in sorted(stats_labels()):
+        keys = {
+            name: STATS_KEY.format(label, name)
+            for name in (*COUNTERS, "max_queries", "slowest")
+        }
+        values = cache.get_many(list(keys.values()))
+        row = {name: values.get(key) for name, key in keys.items()}
+        requests = row["requests"] or 0
+        if not requests:
+            continue
+        slowest, slowest_sql = row["slowest"] or (0.0, "")
+        stats.append(
+            {
+                "view": label,
+                "requests": requests,
+                "queries": row["queries"] or 0,
+                "avg_queries": (row["queries"] or 0) / requests,
+                "max_queries": row["max_queries"] or 0,
+                "avg_sql_ms": (row["sql_us"] or 0) / requests / 1000,
+                "slowest_ms": slowest * 1000,
+                "slowest_sql": slowest_sql,
+                "over_budget": row["over_budget"] or 0,
+            }
+        )
+    return sorted(stats, key=lambda row: -row["avg_queries"])
+
+
+def reset_query_stats() -> None:
+    cache.delete_many(
+        [
+            STATS_KEY.format(label, name)
+            for label in stats_labels()
+            for name in (*COUNTERS, "max_queries", "slowest")
+        ]
+    )
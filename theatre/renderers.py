@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+
+from rest_framework import serializers
+from rest_framework.utils import encoders
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # dates and times go through DRF's encoder, which formats them itself
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# fields whose to_representation never returns a float
+FLOAT_FREE_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.DateTimeField,
+    serializers.DateField,
+    serializers.TimeField,
+    serializers.DurationField,
+    serializers.UUIDField,
+    serializers.FileField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.StringRelatedField,
+    serializers.HyperlinkedRelatedField,
+)
+
+
+def _float_free(field) -> bool:
+    """Whether ``field``, a serializer included, never renders a float.
+
+    Fields outside ``FLOAT_FREE_FIELDS`` opt in with a false
+    ``renders_floats`` attribute.
+    """
+    if hasattr(field, "renders_floats"):
+        return not field.renders_floats
+    if isinstance(field, serializers.ListSerializer):
+        return _float_free(field.child)
+    if isinstance(field, serializers.Serializer):
+        return all(
+            _float_free(child)
+            for child in field.fields.values()
+            if not child.write_only
+        )
+    if isinstance(field, serializers.ManyRelatedField):
+        return _float_free(field.child_relation)
+    if isinstance(field, serializers.ListField):
+        return _float_free(field.child)
+    if isinstance(field, serializers.DecimalField):
+        return field.coerce_to_string
+    return isinstance(field, FLOAT_FREE_FIELDS)
+
+
+def _may_hold_floats(data) -> bool:
+    """Whether ``data`` may contain floats, answered from the serializer
+    of ``ReturnDict`` and ``ReturnList`` data without walking it."""
+    serializer = getattr(data, "serializer", None)
+    if serializer is not None:
+        return not _float_free(serializer)
+    if isinstance(data, dict):
+        data = data.values()
+    elif not isinstance(data, (list, tuple)):
+        return isinstance(data, float)
+    return any(_may_hold_floats(value) for value in data)
+
+
+class SeatMapBinaryRenderer(BaseRenderer):
+    """Render a seat map bitset as raw bytes.
+
+    Anything else, such as the ``{"detail": ...}`` of an error response,
+    is rendered as JSON with a JSON content type.
+    """
+
+    media_type = "application/octet-stream"
+    format = "bin"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, bytearray)):
+            return bytes(data)
+
+        renderer = FastJSONRenderer()
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = renderer.media_type
+        return renderer.render(data, None, renderer_context)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` encoding with orjson when it is installed.
+
+    Values orjson has no native encoding for (dates, times, decimals,
+    lazy strings, ...) go through the same ``encoder_class`` hook, so the
+    output is byte for byte the one of ``JSONRenderer``. Indented or
+    ASCII-only output, and anything orjson rejects, such as integers
+    wider than 64 bits, use the stdlib encoder.
+
+    So does data that may hold floats: orjson writes NaN and infinities
+    as ``null`` where the strict stdlib encoder raises ``ValueError``,
+    and formats exponents differently (``1e16`` against ``1e+16``).
+    Serializer output is checked through its fields, other data is
+    walked.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            or _may_hold_floats(data)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # escaped like JSONRenderer does, to stay a strict JavaScript subset
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render a list as newline delimited JSON, one item per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        items = data if isinstance(data, list) else [data]
+        return "".join(
+            json.dumps(item, cls=encoders.JSONEncoder) + "\n" for item in items
+        ).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """Render a list of flat dicts as CSV with a header row."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        buffer = io.StringIO()
+        if rows:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return buffer.getvalue().encode(self.charset)
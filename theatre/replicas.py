@@ -0,0 +1,75 @@
+import random
+import sqlite3
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+USER_PIN_KEY = "theatre:replica-pin:{}"
+
+
+@dataclass
+class ReplicaReads:
+    """Replica serving the reads of one request until it writes."""
+
+    alias: str
+    pinned: bool = False
+
+
+_reads: ContextVar[ReplicaReads | None] = ContextVar(
+    "theatre_replica_reads", default=None
+)
+
+
+def start_replica_reads() -> Token | None:
+    """Send reads of the current request to a replica, if any is set up."""
+    if not settings.DATABASE_REPLICAS:
+        return None
+    return _reads.set(ReplicaReads(random.choice(settings.DATABASE_REPLICAS)))
+
+
+def stop_replica_reads(token: Token | None) -> None:
+    if token is not None:
+        _reads.reset(token)
+
+
+def pin_to_primary() -> None:
+    """Keep the rest of the request on the primary once it has written."""
+    reads = _reads.get()
+    if reads is not None:
+        reads.pinned = True
+
+
+def read_alias() -> str:
+    reads = _reads.get()
+    if reads is None or reads.pinned:
+        return DEFAULT_DB_ALIAS
+    return reads.alias
+
+
+def pin_user(user_id: int) -> None:
+    """Read ``user_id``'s requests from the primary until replicas catch up."""
+    cache.set(USER_PIN_KEY.format(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def user_pinned(user) -> bool:
+    return user.is_authenticated and bool(
+        cache.get(USER_PIN_KEY.format(user.pk))
+    )
+
+
+def sync_sqlite(source: str, target: str) -> None:
+    """Copy a consistent snapshot of the ``source`` database to ``target``.
+
+    Uses SQLite's online backup, so the primary keeps serving writes and
+    readers of the replica wait for the copy instead of seeing half of it.
+    """
+    primary = sqlite3.connect(source)
+    replica = sqlite3.connect(target)
+    try:
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
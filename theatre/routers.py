@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from theatre.replicas import pin_to_primary, read_alias
+
+
+class ReplicaRouter:
+    """Route reads of replica-enabled requests to ``DATABASE_REPLICAS``.
+
+    Everything else, writes and any read after a write in the same
+    request, goes to the primary. Replicas get their schema with the
+    data they copy, so they are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,117 @@
+"""Serialize ``.values()`` rows without DRF field machinery.
+
+A ``RowFormat`` is compiled once per serializer class and selection of
+its fields: each output field becomes a lookup (``source="play.title"``
+reads ``play__title``) and, unless the field returns database values
+unchanged, the field's own ``to_representation``. Rows then become
+output dicts through one ``itemgetter`` and a few conversions, giving
+the same data the serializer gives for model instances.
+
+Fields opt in to other lookups or conversions with ``row_lookup`` and
+``row_representation`` attributes; serializers map fields to database
+expressions with ``Meta.row_expressions``.
+"""
+from dataclasses import dataclass
+from functools import cache
+from operator import itemgetter
+from typing import Callable, Iterable
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+# fields whose to_representation returns what the database returns
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ReadOnlyField,
+)
+
+
+def _convert(field: serializers.Field) -> Callable | None:
+    if hasattr(field, "row_representation"):
+        return field.row_representation
+    if type(field) in PASSTHROUGH_FIELDS:
+        return None
+
+    def to_representation(value):
+        return None if value is None else field.to_representation(value)
+
+    return to_representation
+
+
+@dataclass(frozen=True)
+class RowFormat:
+    names: tuple[str, ...]
+    lookups: tuple[str, ...]
+    expressions: dict
+    conversions: tuple[tuple[str, Callable], ...]
+
+    @classmethod
+    def compile(cls, serializer_class, names=None) -> "RowFormat":
+        fields = {
+            name: field
+            for name, field in serializer_class().fields.items()
+            if names is None or name in names
+        }
+        expressions = {
+            name: expression
+            for name, expression in getattr(
+                serializer_class.Meta, "row_expressions", {}
+            ).items()
+            if name in fields
+        }
+        lookups = []
+        conversions = []
+        for name, field in fields.items():
+            if name in expressions:
+                lookups.append(name)
+            else:
+                lookups.append(
+                    getattr(field, "row_lookup", None)
+                    or "__".join(field.source_attrs)
+                )
+            convert = _convert(field)
+            if convert is not None:
+                conversions.append((name, convert))
+        return cls(
+            names=tuple(fields),
+            lookups=tuple(lookups),
+            expressions=expressions,
+            conversions=tuple(conversions),
+        )
+
+    def values(
+        self, queryset: QuerySet, extra: Iterable[str] = ()
+    ) -> QuerySet:
+        """Dict rows holding the lookups of every output field.
+
+        ``extra`` lookups, such as the fields a cursor paginator reads,
+        are selected too but left out of ``to_data``.
+        """
+        return queryset.prefetch_related(None).values(
+            *(
+                lookup
+                for lookup in dict.fromkeys((*self.lookups, *extra))
+                if lookup not in self.expressions
+            ),
+            **self.expressions,
+        )
+
+    def to_data(self, rows: Iterable[dict]) -> list[dict]:
+        names = self.names
+        get = itemgetter(*self.lookups)
+        if len(self.lookups) == 1:
+            data = [{names[0]: get(row)} for row in rows]
+        else:
+            data = [dict(zip(names, get(row))) for row in rows]
+        for name, convert in self.conversions:
+            for item in data:
+                item[name] = convert(item[name])
+        return data
+
+
+@cache
+def row_format(serializer_class, names: tuple[str, ...] = None) -> RowFormat:
+    """Format of the ``names`` fields of ``serializer_class``, or all."""
+    return RowFormat.compile(serializer_class, names)
@@ -0,0 +1,156 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from theatre.models import Play
+
+SEARCH_TABLE = "theatre_play_search"
+
+# Column weights: title > actor/genre names > description.
+CREATE_SQL = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        "title, description, actors, genres, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    ],
+    "postgresql": [
+        f"CREATE TABLE {SEARCH_TABLE} ("
+        "play_id integer PRIMARY KEY "
+        "REFERENCES theatre_play (id) ON DELETE CASCADE "
+        "DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        f"CREATE INDEX {SEARCH_TABLE}_document_gin "
+        f"ON {SEARCH_TABLE} USING gin (document)",
+    ],
+}
+DROP_SQL = {
+    "sqlite": [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"],
+    "postgresql": [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"],
+}
+
+_DELETE_SQL = {
+    "sqlite": f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+    "postgresql": f"DELETE FROM {SEARCH_TABLE} WHERE play_id = %s",
+}
+_INSERT_SQL = {
+    "sqlite": f"INSERT INTO {SEARCH_TABLE} "
+    "(rowid, title, description, actors, genres) "
+    "VALUES (%s, %s, %s, %s, %s)",
+    "postgresql": f"INSERT INTO {SEARCH_TABLE} (play_id, document) "
+    "VALUES (%s, "
+    "setweight(to_tsvector('simple', %s), 'A') || "
+    "setweight(to_tsvector('simple', %s), 'C') || "
+    "setweight(to_tsvector('simple', %s), 'B') || "
+    "setweight(to_tsvector('simple', %s), 'B'))",
+}
+_MATCH_SQL = {
+    "sqlite": f"SELECT rowid FROM {SEARCH_TABLE} "
+    f"WHERE {SEARCH_TABLE} MATCH %s",
+    "postgresql": f"SELECT play_id FROM {SEARCH_TABLE} "
+    "WHERE document @@ to_tsquery('simple', %s)",
+}
+# correlated per matching play; both backends rank higher-is-better
+_RANK_SQL = {
+    "sqlite": f"SELECT -bm25({SEARCH_TABLE}, 10.0, 1.0, 5.0, 5.0) "
+    f"FROM {SEARCH_TABLE} "
+    f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = "theatre_play"."id"',
+    "postgresql": "SELECT ts_rank(document, to_tsquery('simple', %s)) "
+    f"FROM {SEARCH_TABLE} "
+    f'WHERE play_id = "theatre_play"."id"',
+}
+
+
+def supports_search(conn=connection) -> bool:
+    return conn.vendor in CREATE_SQL
+
+
+def search_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def match_expression(terms: list[str], vendor: str) -> str:
+    """Every term must match, each as a prefix."""
+    if vendor == "sqlite":
+        return " ".join(f'"{term}"*' for term in terms)
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def play_documents(plays) -> list[tuple]:
+    """Index rows for plays fetched with their actors and genres."""
+    return [
+        (
+            play.id,
+            play.title,
+            play.description,
+            " ".join(
+                f"{actor.first_name} {actor.last_name}"
+                for actor in play.actors.all()
+            ),
+            " ".join(genre.name for genre in play.genres.all()),
+        )
+        for play in plays
+    ]
+
+
+def write_documents(conn, play_ids, documents) -> None:
+    """Replace the index rows of ``play_ids`` with ``documents``."""
+    if not supports_search(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            _DELETE_SQL[conn.vendor], [(play_id,) for play_id in play_ids]
+        )
+        cursor.executemany(_INSERT_SQL[conn.vendor], documents)
+
+
+def index_plays(play_ids) -> None:
+    """Bring the search index of ``play_ids`` in line with the database."""
+    play_ids = list(play_ids)
+    if not play_ids or not supports_search():
+        return
+    plays = Play.objects.filter(id__in=play_ids).prefetch_related(
+        "actors", "genres"
+    )
+    write_documents(connection, play_ids, play_documents(plays))
+
+
+def rebuild_index(batch_size: int = 500) -> int:
+    """Reindex every play; returns how many were indexed."""
+    if not supports_search():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    ids = list(Play.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        index_plays(ids[start:end])
+    return len(ids)
+
+
+def search_plays(queryset, query: str):
+    """Filter plays matching ``query`` and order them by relevance.
+
+    Falls back to ``title__icontains`` on backends without an index.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    if not supports_search():
+        return queryset.filter(title__icontains=query)
+
+    expression = match_expression(terms, connection.vendor)
+    return (
+        queryset.filter(
+            id__in=RawSQL(_MATCH_SQL[connection.vendor], (expression,))
+        )
+        .annotate(
+            search_rank=RawSQL(
+                _RANK_SQL[connection.vendor],
+                (expression,),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-search_rank", "title", "id")
+    )
@@ -0,0 +1,91 @@
+from typing import Iterable, Optional
+
+from django.db import transaction
+
+from theatre.models import Performance, SeatMap, Ticket
+
+
+def build_seat_map(performance: Performance) -> SeatMap:
+    """Build an unsaved seat map from the performance's tickets."""
+    theatre_hall = performance.theatre_hall
+    seat_map = SeatMap(
+        performance=performance,
+        rows=theatre_hall.rows,
+        seats_in_row=theatre_hall.seats_in_row,
+        bitmap=bytes(
+            SeatMap.empty_bitmap(theatre_hall.rows, theatre_hall.seats_in_row)
+        ),
+    )
+    seat_map.set_seats(
+        Ticket.objects.filter(performance=performance).values_list(
+            "row", "seat"
+        ),
+        taken=True,
+    )
+    return seat_map
+
+
+def rebuild_seat_map(performance: Performance) -> SeatMap:
+    seat_map = build_seat_map(performance)
+    SeatMap.objects.update_or_create(
+        performance=performance,
+        defaults={
+            "rows": seat_map.rows,
+            "seats_in_row": seat_map.seats_in_row,
+            "bitmap": seat_map.bitmap,
+        },
+    )
+    return seat_map
+
+
+def get_seat_map(performance: Performance) -> SeatMap:
+    """Return an up-to-date seat map, rebuilding it if missing or stale."""
+    try:
+        seat_map = performance.seat_map
+    except SeatMap.DoesNotExist:
+        seat_map = None
+
+    if seat_map is None or not seat_map.matches(performance.theatre_hall):
+        seat_map = rebuild_seat_map(performance)
+        performance.seat_map = seat_map
+    return seat_map
+
+
+def get_seat_map_by_performance_id(performance_id) -> Optional[SeatMap]:
+    """Fetch a seat map together with its hall in a single query."""
+    seat_map = (
+        SeatMap.objects.select_related("performance__theatre_hall")
+        .filter(performance_id=performance_id)
+        .first()
+    )
+    if seat_map is None:
+        performance = (
+            Performance.objects.select_related("theatre_hall")
+            .filter(pk=performance_id)
+            .first()
+        )
+        return get_seat_map(performance) if performance else None
+    return get_seat_map(seat_map.performance)
+
+
+def mark_seats(
+    performance_id: int, seats: Iterable[tuple[int, int]], taken: bool
+) -> None:
+    """Flip seats of an existing seat map inside the current transaction.
+
+    Missing maps are left alone, they are built lazily on the next read.
+    """
+    with transaction.atomic():
+        seat_map = (
+            SeatMap.objects.select_for_update()
+            .select_related("performance__theatre_hall")
+            .filter(performance_id=performance_id)
+            .first()
+        )
+        if seat_map is None:
+            return
+        if not seat_map.matches(seat_map.performance.theatre_hall):
+            rebuild_seat_map(seat_map.performance)
+            return
+        seat_map.set_seats(seats, taken=taken)
+        seat_map.save(update_fields=["bitmap", "updated_at"])
@@ -0,0 +1,388 @@
+"""Deterministic synthetic data for load tests and benchmarks.
+
+The same options and seed always produce the same catalogue, schedule,
+seat choices and reservations, whatever the number of workers.
+"""
+import multiprocessing
+import random
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+
+from theatre.availability import rebuild_availability
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    SeatHold,
+    SeatMap,
+    Ticket,
+    TheatreHall,
+)
+from theatre.search import rebuild_index
+
+SEED_EMAIL_DOMAIN = "seed.theatre.test"
+SEED_PASSWORD = "seedpassword"
+SCHEDULE_START = datetime(2025, 1, 1, 19, 0)
+SHOW_HOURS = (-5, -2, 0)
+_INSERT_TICKETS_SQL = (
+    f'INSERT INTO "{Ticket._meta.db_table}" '
+    '("row", "seat", "performance_id", "reservation_id") '
+    "VALUES (%s, %s, %s, %s)"
+)
+
+
+@dataclass(frozen=True)
+class SeedOptions:
+    halls: int = 10
+    plays: int = 1_000
+    actors: int = 2_000
+    genres: int = 30
+    performances: int = 10_000
+    users: int = 10_000
+    reservations: int = 100_000
+    tickets: int = 300_000
+    actors_per_play: int = 4
+    genres_per_play: int = 2
+    days: int = 365
+    seed: int = 0
+    batch_size: int = 5_000
+    workers: int = 1
+
+
+@dataclass(frozen=True)
+class PerformancePlan:
+    """Sold seats and reservation count of one seeded performance."""
+
+    index: int
+    performance_id: int
+    rows: int
+    seats_in_row: int
+    tickets: int
+    reservations: int
+
+
+def spread(total: int, caps: list[int]) -> list[int]:
+    """Split ``total`` as evenly as ``caps`` allow, in a stable order."""
+    counts = [0] * len(caps)
+    remaining = total
+    open_slots = [i for i, cap in enumerate(caps) if cap > 0]
+    while remaining and open_slots:
+        share = max(remaining // len(open_slots), 1)
+        still_open = []
+        for i in open_slots:
+            added = min(share, caps[i] - counts[i], remaining)
+            counts[i] += added
+            remaining -= added
+            if counts[i] < caps[i]:
+                still_open.append(i)
+            if not remaining:
+                break
+        open_slots = still_open
+    return counts
+
+
+def flush() -> None:
+    """Empty the theatre tables and remove previously seeded users."""
+    tables = [
+        model._meta.db_table
+        for model in (
+            Ticket,
+            Reservation,
+            SeatHold,
+            SeatMap,
+            Performance,
+            Play.actors.through,
+            Play.genres.through,
+            Play,
+            Actor,
+            Genre,
+            TheatreHall,
+        )
+    ]
+    connection.ops.execute_sql_flush(
+        connection.ops.sql_flush(
+            no_style(), tables, reset_sequences=True, allow_cascade=True
+        )
+    )
+    get_user_model().objects.filter(
+        email__endswith=f"@{SEED_EMAIL_DOMAIN}"
+    ).delete()
+
+
+def seed_catalogue(options: SeedOptions, rng: random.Random):
+    """Create halls, genres, actors and plays with their relations."""
+    halls = TheatreHall.objects.bulk_create(
+        TheatreHall(
+            name=f"Hall {i}",
+            rows=rng.randint(10, 30),
+            seats_in_row=rng.randint(15, 40),
+        )
+        for i in range(options.halls)
+    )
+    genres = Genre.objects.bulk_create(
+        Genre(name=f"Genre {i}") for i in range(options.genres)
+    )
+    actors = Actor.objects.bulk_create(
+        (
+            Actor(first_name=f"First{i % 997}", last_name=f"Last{i}")
+            for i in range(options.actors)
+        ),
+        batch_size=options.batch_size,
+    )
+    plays = Play.objects.bulk_create(
+        (
+            Play(title=f"Play {i:07d}", description=f"Synthetic play {i}")
+            for i in range(options.plays)
+        ),
+        batch_size=options.batch_size,
+    )
+    for through, field, related, per_play in (
+        (Play.actors.through, "actor_id", actors, options.actors_per_play),
+        (Play.genres.through, "genre_id", genres, options.genres_per_play),
+    ):
+        through.objects.bulk_create(
+            (
+                through(play_id=play.id, **{field: item.id})
+                for play in plays
+                for item in rng.sample(related, min(per_play, len(related)))
+            ),
+            batch_size=options.batch_size,
+        )
+    return halls, plays
+
+
+def seed_users(options: SeedOptions) -> list[int]:
+    password = make_password(SEED_PASSWORD)
+    users = get_user_model().objects.bulk_create(
+        (
+            get_user_model()(
+                email=f"user{i}@{SEED_EMAIL_DOMAIN}", password=password
+            )
+            for i in range(options.users)
+        ),
+        batch_size=options.batch_size,
+    )
+    return [user.id for user in users]
+
+
+def seed_schedule(
+    options: SeedOptions, rng: random.Random, halls, plays
+) -> list[PerformancePlan]:
+    """Create performances and plan the seats sold for each.
+
+    Tickets are spread over performances up to each hall's capacity and
+    every reservation holds at least one ticket. With fewer reservations
+    than performances, tickets go only to performances that get one.
+    """
+    schedule = [
+        (
+            rng.choice(plays),
+            rng.choice(halls),
+            SCHEDULE_START
+            + timedelta(
+                days=rng.randrange(max(options.days, 1)),
+                hours=rng.choice(SHOW_HOURS),
+            ),
+        )
+        for _ in range(options.performances)
+    ]
+    capacities = [hall.capacity for _, hall, _ in schedule]
+    tickets = spread(options.tickets, capacities)
+    reservations = spread(options.reservations, tickets)
+    if any(
+        sold and not reserved for sold, reserved in zip(tickets, reservations)
+    ):
+        tickets = spread(
+            options.tickets,
+            [
+                capacity if reserved else 0
+                for capacity, reserved in zip(capacities, reservations)
+            ],
+        )
+        reservations = spread(options.reservations, tickets)
+    # seats are only inserted through reservations
+    tickets = [
+        sold if reserved else 0
+        for sold, reserved in zip(tickets, reservations)
+    ]
+
+    performances = Performance.objects.bulk_create(
+        (
+            Performance(play=play, theatre_hall=hall, show_time=show_time)
+            for play, hall, show_time in schedule
+        ),
+        batch_size=options.batch_size,
+    )
+    return [
+        PerformancePlan(
+            index=index,
+            performance_id=performance.id,
+            rows=hall.rows,
+            seats_in_row=hall.seats_in_row,
+            tickets=sold,
+            reservations=reserved,
+        )
+        for index, (performance, (_, hall, _), sold, reserved) in enumerate(
+            zip(performances, schedule, tickets, reservations)
+        )
+    ]
+
+
+def _sell(plan: PerformancePlan, seed: int, user_ids: list[int]):
+    """Reservations, their seats and the seat map of one performance."""
+    rng = random.Random(seed * 1_000_003 + plan.index)
+    seat_indexes = rng.sample(
+        range(plan.rows * plan.seats_in_row), plan.tickets
+    )
+    seat_map = SeatMap(
+        performance_id=plan.performance_id,
+        rows=plan.rows,
+        seats_in_row=plan.seats_in_row,
+        bitmap=bytes(SeatMap.empty_bitmap(plan.rows, plan.seats_in_row)),
+    )
+    seats = [
+        (index // plan.seats_in_row + 1, index % plan.seats_in_row + 1)
+        for index in seat_indexes
+    ]
+
+    groups = []
+    start = 0
+    for i in range(plan.reservations):
+        size = plan.tickets // plan.reservations + (
+            i < plan.tickets % plan.reservations
+        )
+        groups.append((rng.choice(user_ids), seats[start:start + size]))
+        start += size
+    # only seats that made it into a reservation are sold
+    seat_map.set_seats(seats[:start], taken=True)
+    return seat_map, groups
+
+
+def insert_tickets(rows: list[tuple], batch_size: int) -> None:
+    """Insert ``(row, seat, performance_id, reservation_id)`` tuples.
+
+    The bulk of seeded rows; plain parameter batches skip building a
+    model instance and compiling an INSERT per ticket.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            from psycopg2.extras import execute_values
+
+            execute_values(
+                cursor.cursor,
+                _INSERT_TICKETS_SQL.replace("(%s, %s, %s, %s)", "%s"),
+                rows,
+                page_size=batch_size,
+            )
+        else:
+            cursor.executemany(_INSERT_TICKETS_SQL, rows)
+
+
+def _write(seat_maps, groups, batch_size) -> int:
+    with transaction.atomic():
+        SeatMap.objects.bulk_create(seat_maps, batch_size=batch_size)
+        reservations = Reservation.objects.bulk_create(
+            (Reservation(user_id=user_id) for user_id, _, _ in groups),
+            batch_size=batch_size,
+        )
+        tickets = [
+            (row, seat, performance_id, reservation.id)
+            for reservation, (_, performance_id, seats) in zip(
+                reservations, groups
+            )
+            for row, seat in seats
+        ]
+        insert_tickets(tickets, batch_size)
+    return len(tickets)
+
+
+def sell_tickets(
+    plans: list[PerformancePlan], options: SeedOptions, user_ids: list[int]
+) -> int:
+    """Insert seat maps, reservations and tickets of ``plans``."""
+    sold = 0
+    seat_maps, groups, pending = [], [], 0
+    for plan in plans:
+        seat_map, plan_groups = _sell(plan, options.seed, user_ids)
+        seat_maps.append(seat_map)
+        groups.extend(
+            (user_id, plan.performance_id, seats)
+            for user_id, seats in plan_groups
+        )
+        pending += plan.tickets
+        if pending >= options.batch_size:
+            sold += _write(seat_maps, groups, options.batch_size)
+            seat_maps, groups, pending = [], [], 0
+    if seat_maps:
+        sold += _write(seat_maps, groups, options.batch_size)
+    return sold
+
+
+def _sell_in_worker(args) -> int:
+    plans, options, user_ids = args
+    try:
+        return sell_tickets(plans, options, user_ids)
+    finally:
+        connections.close_all()
+
+
+def sell_tickets_in_parallel(
+    plans: list[PerformancePlan], options: SeedOptions, user_ids: list[int]
+) -> int:
+    """Split ``plans`` over forked worker processes with own connections.
+
+    Reservation and ticket ids then interleave between workers, the rows
+    themselves stay the same as with a single worker.
+    """
+    chunks = [plans[i::options.workers] for i in range(options.workers)]
+    connections.close_all()
+    with multiprocessing.get_context("fork").Pool(options.workers) as pool:
+        return sum(
+            pool.map(
+                _sell_in_worker,
+                [(chunk, options, user_ids) for chunk in chunks],
+            )
+        )
+
+
+def seed(options: SeedOptions, log=lambda message: None) -> dict:
+    """Seed the database; returns how many rows of each kind were made."""
+    rng = random.Random(options.seed)
+
+    with transaction.atomic():
+        halls, plays = seed_catalogue(options, rng)
+        log(f"Catalogue: {len(halls)} halls, {len(plays)} plays")
+        user_ids = seed_users(options)
+        log(f"Users: {len(user_ids)}")
+        if not user_ids:
+            options = replace(options, tickets=0, reservations=0)
+        plans = seed_schedule(options, rng, halls, plays)
+        log(f"Performances: {len(plans)}")
+        rebuild_index(options.batch_size)
+
+    if options.workers > 1 and connection.vendor != "sqlite":
+        tickets = sell_tickets_in_parallel(plans, options, user_ids)
+    else:
+        tickets = sell_tickets(plans, options, user_ids)
+    log(f"Tickets: {tickets}")
+    rebuild_availability(
+        [plan.performance_id for plan in plans],
+        chunk_size=options.batch_size,
+        workers=options.workers,
+    )
+
+    return {
+        "halls": len(halls),
+        "plays": len(plays),
+        "users": len(user_ids),
+        "performances": len(plans),
+        "reservations": sum(plan.reservations for plan in plans),
+        "tickets": tickets,
+    }
@@ -1,6 +1,11 @@
-from django.db import transaction
+import base64
+
+from django.db.models import F
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
 
 from theatre.models import (
     Play,
@@ -10,7 +15,18 @@ from theatre.models import (
     Reservation,
     Actor,
     Genre,
+    SeatMap,
+    SeatHold,
+)
+from theatre.allocation import CENTRE, PREFERENCES
+from theatre.availability import MAX_CALENDAR_DAYS
+from theatre.booking import reserve_tickets
+from theatre.holds import (
+    MAX_HOLD_MINUTES,
+    DEFAULT_HOLD_MINUTES,
+    with_held_seats,
 )
+from theatre.seat_map import get_seat_map
 
 
 class ActorSerializer(serializers.ModelSerializer):
@@ -39,13 +55,41 @@ class PlaySerializer(serializers.ModelSerializer):
         fields = ("id", "title", "description", "actors", "genres", "image")
 
 
+@extend_schema_field(serializers.ListField(child=serializers.CharField()))
+class NameListField(serializers.ReadOnlyField):
+    """Names annotated onto the row as ``names_attr``.
+
+    Falls back to ``slug_field`` of each related object on instances
+    loaded without the annotation.
+    """
+
+    renders_floats = False
+
+    def __init__(self, names_attr, slug_field, **kwargs):
+        self.names_attr = names_attr
+        self.slug_field = slug_field
+        super().__init__(**kwargs)
+
+    @property
+    def row_lookup(self):
+        return self.names_attr
+
+    @staticmethod
+    def row_representation(names):
+        return names or []
+
+    def get_attribute(self, instance):
+        if hasattr(instance, self.names_attr):
+            return getattr(instance, self.names_attr) or []
+        return [
+            getattr(related, self.slug_field)
+            for related in super().get_attribute(instance).all()
+        ]
+
+
 class PlayListSerializer(serializers.ModelSerializer):
-    actors = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="full_name"
-    )
-    genres = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="name"
-    )
+    actors = NameListField(names_attr="actor_names", slug_field="full_name")
+    genres = NameListField(names_attr="genre_names", slug_field="name")
 
     class Meta:
         model = Play
@@ -100,9 +144,88 @@ class PerformanceListSerializer(PerformanceSerializer):
             "theatre_hall_capacity",
             "tickets_available",
         )
+        row_expressions = {
+            "theatre_hall_capacity": F("theatre_hall__rows")
+            * F("theatre_hall__seats_in_row"),
+        }
+
+
+class PerformanceCalendarQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    play = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        days = (attrs["end"] - attrs["start"]).days + 1
+        if days < 1:
+            raise ValidationError({"end": "Must not be before start."})
+        if days > MAX_CALENDAR_DAYS:
+            raise ValidationError(
+                {"end": f"At most {MAX_CALENDAR_DAYS} days per request."}
+            )
+        return attrs
+
+
+class PerformanceCalendarDaySerializer(serializers.Serializer):
+    date = serializers.DateField(source="day")
+    performances = serializers.IntegerField()
+    seats_available = serializers.IntegerField()
+
+
+class BatchRetrieveQuerySerializer(serializers.Serializer):
+    ids = serializers.CharField()
+
+    def validate_ids(self, value) -> list[int]:
+        try:
+            ids = list(dict.fromkeys(int(id_) for id_ in value.split(",")))
+        except ValueError:
+            raise ValidationError("Must be comma separated integers.")
+        max_size = self.context["max_size"]
+        if len(ids) > max_size:
+            raise ValidationError(f"At most {max_size} ids per request.")
+        return ids
+
+
+class PerformanceRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field resolving performances preloaded by its parent."""
+
+    def __init__(self, **kwargs):
+        self._preloaded = {}
+        super().__init__(**kwargs)
+
+    def preload(self, performance_ids):
+        self._preloaded = (
+            self.get_queryset()
+            .select_related("theatre_hall")
+            .in_bulk(performance_ids)
+        )
+
+    def to_internal_value(self, data):
+        try:
+            return self._preloaded[int(data)]
+        except (KeyError, TypeError, ValueError):
+            return super().to_internal_value(data)
+
+
+class TicketBulkListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        performance_field = self.child.fields.get("performance")
+        if isinstance(data, list) and isinstance(
+            performance_field, PerformanceRelatedField
+        ):
+            performance_ids = set()
+            for item in data:
+                try:
+                    performance_ids.add(int(item["performance"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            performance_field.preload(performance_ids)
+        return super().to_internal_value(data)
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    performance = PerformanceRelatedField(queryset=Performance.objects.all())
+
     class Meta:
         model = Ticket
         fields = (
@@ -111,6 +234,9 @@ class TicketSerializer(serializers.ModelSerializer):
             "seat",
             "performance",
         )
+        list_serializer_class = TicketBulkListSerializer
+        # Seat uniqueness is checked for the whole batch by the reservation
+        validators = []
 
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
@@ -142,32 +268,116 @@ class PerformanceDetailSerializer(PerformanceSerializer):
         fields = ("id", "show_time", "play", "theatre_hall", "taken_seats")
 
     def get_taken_seats(self, instance):
-        tickets = instance.ticket_set.all()
+        # batches prefetch the holds of every performance at once
+        holds = getattr(instance, "active_holds", None)
+        if holds is not None:
+            holds = [(hold.row, hold.seat) for hold in holds]
+        seat_map = with_held_seats(get_seat_map(instance), holds)
         return [
-            f"row: {ticket.row}, seat: {ticket.seat}" for ticket in tickets
+            f"row: {row}, seat: {seat}" for row, seat in seat_map.taken_seats()
         ]
 
 
-class ReservationSerializer(serializers.ModelSerializer):
-    tickets = TicketListSerializer(
-        many=True, read_only=False, allow_empty=False
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    seats = SeatSerializer(many=True, allow_empty=False, write_only=True)
+    minutes = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_HOLD_MINUTES,
+        default=DEFAULT_HOLD_MINUTES,
+        write_only=True,
     )
 
+
+class SeatHoldListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("performance", "row", "seat", "expires_at")
+
+
+class SeatAllocationSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1)
+    preference = serializers.ChoiceField(choices=PREFERENCES, default=CENTRE)
+
+
+class SeatBlockSerializer(serializers.Serializer):
+    performance = serializers.IntegerField()
+    row = serializers.IntegerField()
+    seats = serializers.ListField(child=serializers.IntegerField())
+
+
+class SeatMapSerializer(serializers.ModelSerializer):
+    taken = serializers.IntegerField(source="taken_count", read_only=True)
+    bitmap = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SeatMap
+        fields = ("performance", "rows", "seats_in_row", "taken", "bitmap")
+
+    def get_bitmap(self, instance) -> str:
+        return base64.b64encode(bytes(instance.bitmap)).decode("ascii")
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    allow_partial = serializers.BooleanField(default=False, write_only=True)
+
     class Meta:
         model = Reservation
         fields = (
             "id",
             "tickets",
             "created_at",
+            "allow_partial",
         )
 
+    def validate_tickets(self, tickets_data):
+        """Reject seats repeated within the request."""
+        seats = set()
+        errors = []
+        for ticket_data in tickets_data:
+            seat = (
+                ticket_data["performance"].id,
+                ticket_data["row"],
+                ticket_data["seat"],
+            )
+            errors.append(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        UniqueTogetherValidator.message.format(
+                            field_names="performance, row, seat"
+                        )
+                    ]
+                }
+                if seat in seats
+                else {}
+            )
+            seats.add(seat)
+
+        if any(errors):
+            raise ValidationError(errors)
+        return tickets_data
+
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
-            return reservation
+        return reserve_tickets(
+            validated_data.pop("user"),
+            validated_data.pop("tickets"),
+            allow_partial=validated_data.pop("allow_partial"),
+        )
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        skipped_seats = getattr(instance, "skipped_seats", None)
+        if skipped_seats:
+            data["skipped_seats"] = [
+                {"performance": performance, "row": row, "seat": seat}
+                for performance, row, seat in skipped_seats
+            ]
+        return data
 
 
 class ReservationDetailSerializer(serializers.ModelSerializer):
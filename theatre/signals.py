@@ -0,0 +1,189 @@
+from django.db import connection
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from theatre.availability import refresh_remaining
+from theatre.booking import record_seats
+from theatre.cache import (
+    bump_catalogue,
+    bump_listing,
+    bump_performance,
+    touch_tables,
+)
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    PerformanceAvailability,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.search import index_plays, write_documents
+from theatre.seat_map import build_seat_map, rebuild_seat_map
+
+
+@receiver(post_save, sender=Performance)
+def create_seat_map(sender, instance, created, **kwargs):
+    if created:
+        build_seat_map(instance).save()
+
+
+@receiver(post_save, sender=Performance)
+def summarize_availability(sender, instance, created, **kwargs):
+    if created:
+        PerformanceAvailability.objects.create(
+            performance=instance,
+            tickets_remaining=instance.theatre_hall.capacity,
+        )
+    else:
+        refresh_remaining(Performance.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=TheatreHall)
+def resize_availability(sender, instance, created, **kwargs):
+    if not created:
+        refresh_remaining(Performance.objects.filter(theatre_hall=instance))
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_seat(sender, instance, **kwargs):
+    """Keep the stored ``(performance_id, row, seat)`` of an edited ticket."""
+    instance._previous_seat = (
+        None
+        if instance._state.adding
+        else Ticket.objects.filter(pk=instance.pk)
+        .values_list("performance_id", "row", "seat")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_sold(sender, instance, created, **kwargs):
+    if created:
+        record_seats(
+            instance.performance_id, [(instance.row, instance.seat)], True
+        )
+        return
+
+    previous = getattr(instance, "_previous_seat", None)
+    if previous is not None and previous[0] != instance.performance_id:
+        # a move frees the seat of one performance and sells another's
+        performance_id, row, seat = previous
+        record_seats(performance_id, [(row, seat)], False)
+        record_seats(
+            instance.performance_id, [(instance.row, instance.seat)], True
+        )
+    else:
+        rebuild_seat_map(instance.performance)
+        bump_performance(instance.performance_id)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_freed(sender, instance, **kwargs):
+    record_seats(
+        instance.performance_id, [(instance.row, instance.seat)], False
+    )
+
+
+@receiver(post_save, sender=Performance)
+@receiver(post_delete, sender=Performance)
+def invalidate_performance(sender, instance, **kwargs):
+    bump_performance(instance.id)
+
+
+@receiver(post_delete, sender=Reservation)
+def invalidate_listing(sender, instance, **kwargs):
+    # tickets removed by the cascade have bumped their performances already
+    bump_listing()
+
+
+CATALOGUE_TABLES = {
+    Play: "play",
+    Play.actors.through: "play",
+    Play.genres.through: "play",
+    Actor: "actor",
+    Genre: "genre",
+    TheatreHall: "theatre_hall",
+}
+
+
+@receiver(post_save, sender=Play)
+@receiver(post_delete, sender=Play)
+@receiver(post_save, sender=TheatreHall)
+@receiver(post_delete, sender=TheatreHall)
+@receiver(post_save, sender=Actor)
+@receiver(post_delete, sender=Actor)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(m2m_changed, sender=Play.actors.through)
+@receiver(m2m_changed, sender=Play.genres.through)
+def invalidate_catalogue(sender, action=None, **kwargs):
+    if action is None or action.startswith("post_"):
+        bump_catalogue()
+        touch_tables(CATALOGUE_TABLES[sender])
+
+
+@receiver(post_save, sender=Play)
+def index_play(sender, instance, **kwargs):
+    index_plays([instance.id])
+
+
+@receiver(post_delete, sender=Play)
+def unindex_play(sender, instance, **kwargs):
+    write_documents(connection, [instance.id], [])
+
+
+@receiver(m2m_changed, sender=Play.actors.through)
+@receiver(m2m_changed, sender=Play.genres.through)
+def index_play_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        index_plays([instance.id])
+    elif action == "post_clear":
+        index_plays(instance._search_play_ids)
+    else:
+        index_plays(pk_set)
+
+
+@receiver(m2m_changed, sender=Play.actors.through)
+@receiver(m2m_changed, sender=Play.genres.through)
+def remember_cleared_plays(sender, instance, action, reverse, **kwargs):
+    if action == "pre_clear" and reverse:
+        instance._search_play_ids = related_play_ids(instance)
+
+
+@receiver(pre_delete, sender=Actor)
+@receiver(pre_delete, sender=Genre)
+def remember_related_plays(sender, instance, **kwargs):
+    instance._search_play_ids = related_play_ids(instance)
+
+
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Genre)
+def reindex_related_plays(sender, instance, created, **kwargs):
+    if not created:
+        index_plays(related_play_ids(instance))
+
+
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Genre)
+def reindex_unlinked_plays(sender, instance, **kwargs):
+    index_plays(instance._search_play_ids)
+
+
+def related_play_ids(instance) -> list[int]:
+    plays = (
+        instance.plays
+        if isinstance(instance, Actor)
+        else instance.associated_plays
+    )
+    return list(plays.values_list("id", flat=True))
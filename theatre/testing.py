@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+from theatre.queries import QueryBudgetExceeded, query_budget
+
+
+class QueryBudgetRunner(DiscoverRunner):
+    """Test runner failing any request that goes over its query budget."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGETS_ENFORCED = True
+
+
+class QueryBudgetMixin:
+    """``TestCase`` mixin asserting code stays within a view's budget."""
+
+    @contextmanager
+    def assertQueryBudget(self, view_class, action):
+        budget = query_budget(view_class, action)
+        if budget is None:
+            self.fail(f"{view_class.__name__}.{action} has no query budget")
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+        if len(queries) > budget:
+            raise QueryBudgetExceeded(
+                f"{view_class.__name__}.{action} ran {len(queries)} "
+                f"queries, budget is {budget}:\n"
+                + "\n".join(query["sql"] for query in queries)
+            )
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    SeatHold,
+    TheatreHall,
+    Ticket,
+)
+from theatre.testing import QueryBudgetMixin
+from theatre.views import PerformanceViewSet, PlayViewSet
+
+PERFORMANCE_BATCH_URL = reverse("theatre:performance-batch")
+PLAY_BATCH_URL = reverse("theatre:play-batch")
+HALL_BATCH_URL = reverse("theatre:theatrehall-batch")
+
+
+def ids_param(objects):
+    return ",".join(str(obj.id) for obj in objects)
+
+
+class BatchRetrieveApiTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        actors = [
+            Actor.objects.create(first_name="Actor", last_name=str(i))
+            for i in range(3)
+        ]
+        genre = Genre.objects.create(name="Drama")
+        self.halls = [
+            TheatreHall.objects.create(name="Blue", rows=5, seats_in_row=8),
+            TheatreHall.objects.create(name="Red", rows=4, seats_in_row=5),
+        ]
+        self.plays = [
+            Play.objects.create(title=f"Play {i}", description="About")
+            for i in range(4)
+        ]
+        for i, play in enumerate(self.plays):
+            play.actors.add(*actors[: i + 1])
+            play.genres.add(genre)
+        self.performances = [
+            Performance.objects.create(
+                play=self.plays[i % 4],
+                theatre_hall=self.halls[i % 2],
+                show_time=f"2024-06-{i + 1:02d} 19:30",
+            )
+            for i in range(10)
+        ]
+        for i, performance in enumerate(self.performances):
+            Ticket.objects.create(
+                row=1,
+                seat=i // 2 + 1,
+                performance=performance,
+                reservation=Reservation.objects.create(user=self.user),
+            )
+            SeatHold.objects.create(
+                performance=performance,
+                row=2,
+                seat=i // 2 + 1,
+                user=self.user,
+                expires_at=timezone.now() + timedelta(minutes=5),
+            )
+
+    def test_performances_match_retrieve(self):
+        selected = self.performances[::-1][:6]
+
+        res = self.client.get(
+            PERFORMANCE_BATCH_URL, {"ids": ids_param(selected)}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                self.client.get(
+                    reverse("theatre:performance-detail", args=[obj.id])
+                ).data
+                for obj in selected
+            ],
+        )
+        self.assertEqual(
+            res.data[0]["taken_seats"], ["row: 1, seat: 5", "row: 2, seat: 5"]
+        )
+
+    def test_queries_do_not_grow_with_batch_size(self):
+        counts = []
+        for selected in (self.performances[:1], self.performances):
+            # seat maps are built on first read, count the steady state
+            self.client.get(
+                PERFORMANCE_BATCH_URL, {"ids": ids_param(selected)}
+            )
+            with self.assertQueryBudget(
+                PerformanceViewSet, "batch"
+            ) as queries:
+                self.client.get(
+                    PERFORMANCE_BATCH_URL, {"ids": ids_param(selected)}
+                )
+            counts.append(len(queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_plays_in_requested_order_without_missing(self):
+        with self.assertQueryBudget(PlayViewSet, "batch"):
+            res = self.client.get(
+                PLAY_BATCH_URL,
+                {"ids": f"{self.plays[2].id},999,{self.plays[0].id}"},
+            )
+
+        self.assertEqual(
+            [play["id"] for play in res.data],
+            [self.plays[2].id, self.plays[0].id],
+        )
+        self.assertEqual(len(res.data[0]["actors"]), 3)
+        self.assertEqual(res.data[1]["genres"][0]["name"], "Drama")
+
+    def test_halls(self):
+        res = self.client.get(HALL_BATCH_URL, {"ids": ids_param(self.halls)})
+
+        self.assertEqual(
+            [hall["capacity"] for hall in res.data], [40, 20]
+        )
+
+    def test_sparse_fields(self):
+        res = self.client.get(
+            PERFORMANCE_BATCH_URL,
+            {"ids": ids_param(self.performances[:2]), "fields": "id"},
+        )
+
+        self.assertEqual(
+            res.data, [{"id": obj.id} for obj in self.performances[:2]]
+        )
+
+    def test_invalid_ids_rejected(self):
+        for ids in ("", "1,a", ",".join(str(i) for i in range(1, 52))):
+            res = self.client.get(PLAY_BATCH_URL, {"ids": ids})
+
+            self.assertEqual(
+                res.status_code, status.HTTP_400_BAD_REQUEST, ids
+            )
+            self.assertIn("ids", res.data)
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from theatre.benchmarks import Result, compare, percentile
+from theatre.models import Play
+
+BENCHMARK_ARGS = ("--scale=0.01", "--iterations=2", "--warmup=0")
+
+
+class BenchmarkApiCommandTest(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def benchmark(self, *args):
+        out = StringIO()
+        call_command("benchmark_api", *BENCHMARK_ARGS, *args, stdout=out)
+        return out.getvalue()
+
+    def test_writes_baseline_and_rolls_back(self):
+        out = self.benchmark(f"--output={self.path}")
+
+        with open(self.path) as baseline:
+            results = json.load(baseline)["results"]
+        self.assertIn("plays list", results)
+        self.assertIn("reservations create", results)
+        self.assertEqual(
+            set(results["plays list"]),
+            {"name", "requests", "p50_ms", "p95_ms", "queries", "peak_kb"},
+        )
+        self.assertIn("plays list", out)
+        self.assertFalse(Play.objects.exists())
+
+    def test_refuses_to_seed_existing_data(self):
+        Play.objects.create(title="Hamlet")
+
+        with self.assertRaisesMessage(CommandError, "--existing"):
+            self.benchmark()
+
+        self.assertEqual(Play.objects.count(), 1)
+
+    def test_leaves_default_cache_alone(self):
+        cache.set("theatre:unrelated", "kept")
+
+        self.benchmark("--only", "plays list")
+
+        self.assertEqual(cache.get("theatre:unrelated"), "kept")
+
+    def test_flags_query_regression(self):
+        self.benchmark("--only", "plays list", f"--output={self.path}")
+        with open(self.path) as baseline:
+            data = json.load(baseline)
+        data["results"]["plays list"]["queries"] -= 1
+        with open(self.path, "w") as baseline:
+            json.dump(data, baseline)
+
+        with self.assertRaises(CommandError):
+            self.benchmark("--only", "plays list", f"--baseline={self.path}")
+
+
+class BenchmarkCompareTest(TestCase):
+    def result(self, **values):
+        defaults = {
+            "name": "plays list",
+            "requests": 10,
+            "p50_ms": 10.0,
+            "p95_ms": 20.0,
+            "queries": 3,
+            "peak_kb": 100.0,
+        }
+        defaults.update(values)
+        return Result(**defaults)
+
+    def baseline(self):
+        return {"plays list": vars(self.result())}
+
+    def test_within_tolerance(self):
+        results = [self.result(p95_ms=24.0, peak_kb=120.0)]
+
+        self.assertEqual(compare(results, self.baseline()), [])
+
+    def test_regressions(self):
+        regressions = compare(
+            [self.result(p50_ms=14.0, queries=4, peak_kb=200.0)],
+            self.baseline(),
+        )
+
+        self.assertEqual(
+            [regression.metric for regression in regressions],
+            ["queries", "p50_ms", "peak_kb"],
+        )
+
+    def test_sub_millisecond_noise_ignored(self):
+        baseline = {"plays list": vars(self.result(p50_ms=0.2))}
+
+        self.assertEqual(compare([self.result(p50_ms=0.5)], baseline), [])
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 95), 95.0)
+        self.assertEqual(percentile([7.0], 95), 7.0)
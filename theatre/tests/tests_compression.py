@@ -0,0 +1,149 @@
+import gzip
+import json
+import zlib
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre.compression import brotli, choose_encoding, compression_stats
+from theatre.models import Performance, Play, Reservation, TheatreHall, Ticket
+
+CALENDAR_URL = reverse("theatre:performance-calendar")
+EXPORT_URL = reverse("theatre:reservation-export")
+CALENDAR_PARAMS = {"start": "2024-06-01", "end": "2024-07-31"}
+
+
+class ChooseEncodingTest(TestCase):
+    def test_negotiation(self):
+        preferred = "br" if brotli is not None else "gzip"
+        for header, expected in (
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, deflate, br", preferred),
+            ("br;q=0.5, gzip;q=0.8", "gzip"),
+            ("*", preferred),
+            ("gzip;q=0, *;q=0.1", "br" if brotli is not None else None),
+        ):
+            self.assertEqual(choose_encoding(header), expected, header)
+
+    def test_without_brotli_installed(self):
+        with mock.patch("theatre.compression.brotli", None):
+            self.assertEqual(choose_encoding("br, gzip;q=0.5"), "gzip")
+            self.assertIsNone(choose_encoding("br"))
+
+
+class CompressionMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        play = Play.objects.create(title="Hamlet", description="About")
+        hall = TheatreHall.objects.create(name="Blue", rows=5, seats_in_row=8)
+        self.performances = [
+            Performance.objects.create(
+                play=play,
+                theatre_hall=hall,
+                show_time=f"2024-{6 + day // 30:02d}-{day % 30 + 1:02d}",
+            )
+            for day in range(60)
+        ]
+
+    def get_calendar(self, accept_encoding):
+        return self.client.get(
+            CALENDAR_URL,
+            CALENDAR_PARAMS,
+            HTTP_ACCEPT_ENCODING=accept_encoding,
+        )
+
+    def test_gzip_buffered_response(self):
+        plain = self.get_calendar("")
+        res = self.get_calendar("gzip")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        self.assertEqual(int(res["Content-Length"]), len(res.content))
+        self.assertLess(len(res.content), len(plain.content) / 4)
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+
+    @skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_buffered_response(self):
+        plain = self.get_calendar("")
+        res = self.get_calendar("gzip, br")
+
+        self.assertEqual(res["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(res.content), plain.content)
+
+    def test_identity_and_small_responses_untouched(self):
+        plain = self.get_calendar("")
+        small = self.client.get(
+            CALENDAR_URL,
+            {"start": "2024-06-01", "end": "2024-06-02"},
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", plain["Vary"])
+        self.assertFalse(small.has_header("Content-Encoding"))
+        self.assertEqual(len(json.loads(small.content)), 2)
+
+    @override_settings(COMPRESSION_CONTENT_TYPES=("text/csv",))
+    def test_content_type_allowlist(self):
+        res = self.get_calendar("gzip")
+
+        self.assertFalse(res.has_header("Content-Encoding"))
+        self.assertNotIn("Accept-Encoding", res.get("Vary", ""))
+
+    def test_media_files_skipped(self):
+        with override_settings(MEDIA_URL="/api/theatre/"):
+            res = self.get_calendar("gzip")
+
+        self.assertFalse(res.has_header("Content-Encoding"))
+
+    def test_streaming_export_compressed_chunk_by_chunk(self):
+        for performance in self.performances[:20]:
+            Ticket.objects.create(
+                row=1,
+                seat=1,
+                performance=performance,
+                reservation=Reservation.objects.create(user=self.user),
+            )
+        plain = b"".join(
+            self.client.get(EXPORT_URL, {"format": "ndjson"}).streaming_content
+        )
+
+        res = self.client.get(
+            EXPORT_URL, {"format": "ndjson"}, HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = [
+            decompressor.decompress(chunk) for chunk in res.streaming_content
+        ]
+        # every chunk decodes on arrival, clients need not wait for the end
+        self.assertTrue(all(chunks[:-1]))
+        self.assertEqual(b"".join(chunks), plain)
+
+    def test_compression_stats_command(self):
+        self.get_calendar("gzip")
+        self.get_calendar("")
+        out = StringIO()
+
+        call_command("compression_stats", "--reset", stdout=out)
+
+        self.assertIn(":performance-calendar:GET", out.getvalue())
+        self.assertRegex(out.getvalue(), r"\s2\s+1\s.*x\s")
+        self.assertEqual(compression_stats(), [])
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+from rest_framework import status
+
+from theatre.models import Actor, Genre, Play
+
+PLAY_URL = reverse("theatre:play-list")
+GENRE_URL = reverse("theatre:genre-list")
+
+
+@override_settings(CONDITIONAL_GET_ENABLED=True)
+class ConditionalGetApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.play = Play.objects.create(title="Hamlet")
+
+    def test_validators_sent(self):
+        res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", res)
+        self.assertIn("Last-Modified", res)
+
+    def test_matching_etag_skips_queries(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(PLAY_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_detail_matching_etag(self):
+        url = reverse("theatre:play-detail", args=(self.play.id,))
+        etag = self.client.get(url)["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_varies_with_query(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+
+        res = self.client.get(
+            PLAY_URL, {"title": "Ham"}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_related_write_changes_etag(self):
+        etag = self.client.get(PLAY_URL)["ETag"]
+        self.play.actors.add(
+            Actor.objects.create(first_name="Dave", last_name="Batista")
+        )
+
+        res = self.client.get(PLAY_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_unrelated_write_keeps_etag(self):
+        etag = self.client.get(GENRE_URL)["ETag"]
+        Play.objects.create(title="Macbeth")
+
+        res = self.client.get(GENRE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(GENRE_URL)["Last-Modified"]
+
+        res = self.client.get(GENRE_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Genre.objects.create(name="Drama")
+        res = self.client.get(
+            GENRE_URL, HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 1970 00:00:00 GMT"
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(CONDITIONAL_GET_ENABLED=False)
+    def test_disabled_without_shared_cache(self):
+        res = self.client.get(
+            PLAY_URL, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", res)
+        self.assertNotIn("Last-Modified", res)
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from theatre_reservation_system.database import (
+    POSTGRESQL_ENGINE,
+    SQLITE_ENGINE,
+    databases,
+)
+
+BASE_DIR = Path("/srv/theatre")
+POSTGRES_ENV = {
+    "DB_ENGINE": "postgresql",
+    "POSTGRES_DB": "theatre",
+    "POSTGRES_USER": "theatre",
+    "POSTGRES_PASSWORD": "secret",
+    "POSTGRES_HOST": "db",
+    "POSTGRES_PORT": "5432",
+}
+
+
+class DatabaseConfigTest(SimpleTestCase):
+    def test_sqlite_by_default(self):
+        config, replicas = databases({}, BASE_DIR)
+
+        self.assertEqual(config["default"]["ENGINE"], SQLITE_ENGINE)
+        self.assertEqual(config["default"]["NAME"], BASE_DIR / "db.sqlite3")
+        self.assertEqual(replicas, [])
+
+    def test_sqlite_replicas(self):
+        config, replicas = databases(
+            {"SQLITE_REPLICAS": "/tmp/a.sqlite3,/tmp/b.sqlite3"}, BASE_DIR
+        )
+
+        self.assertEqual(replicas, ["replica1", "replica2"])
+        self.assertEqual(config["replica2"]["NAME"], "/tmp/b.sqlite3")
+        self.assertEqual(config["replica1"]["TEST"], {"MIRROR": "default"})
+
+    def test_postgresql_persistent_connections(self):
+        config, _ = databases(POSTGRES_ENV, BASE_DIR)
+        default = config["default"]
+
+        self.assertEqual(default["ENGINE"], POSTGRESQL_ENGINE)
+        self.assertEqual(
+            (default["HOST"], default["PORT"], default["NAME"]),
+            ("db", "5432", "theatre"),
+        )
+        self.assertEqual(default["CONN_MAX_AGE"], 60)
+        self.assertTrue(default["CONN_HEALTH_CHECKS"])
+        self.assertFalse(default["DISABLE_SERVER_SIDE_CURSORS"])
+
+    def test_postgresql_tuning(self):
+        config, _ = databases(
+            {
+                **POSTGRES_ENV,
+                "DB_CONN_MAX_AGE": "none",
+                "DB_CONN_HEALTH_CHECKS": "False",
+                "DB_POOLER": "pgbouncer",
+                "DB_CONNECT_TIMEOUT": "2",
+            },
+            BASE_DIR,
+        )
+        default = config["default"]
+
+        self.assertIsNone(default["CONN_MAX_AGE"])
+        self.assertFalse(default["CONN_HEALTH_CHECKS"])
+        self.assertTrue(default["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertEqual(default["OPTIONS"]["connect_timeout"], 2)
+
+    def test_postgresql_replicas(self):
+        config, replicas = databases(
+            {**POSTGRES_ENV, "POSTGRES_REPLICA_HOSTS": "r1,r2:6432"},
+            BASE_DIR,
+        )
+
+        self.assertEqual(replicas, ["replica1", "replica2"])
+        self.assertEqual(
+            (config["replica2"]["HOST"], config["replica2"]["PORT"]),
+            ("r2", "6432"),
+        )
+        self.assertEqual(config["replica1"]["PORT"], "5432")
+        self.assertEqual(config["replica1"]["USER"], "theatre")
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            databases({"DB_ENGINE": "oracle"}, BASE_DIR)
+        with self.assertRaises(ValueError):
+            databases({**POSTGRES_ENV, "DB_POOLER": "pgpool"}, BASE_DIR)
@@ -0,0 +1,164 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest import mock, skipIf
+from zoneinfo import ZoneInfo
+
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from theatre.parsers import FastJSONParser
+from theatre.renderers import FastJSONRenderer, orjson
+
+PAYLOAD = ReturnDict(
+    {
+        "count": 2,
+        "results": ReturnList(
+            [
+                {
+                    "id": 1,
+                    "show_time": datetime(
+                        2024, 6, 1, 19, 30, 0, 123456, tzinfo=timezone.utc
+                    ),
+                    "local_time": datetime(
+                        2024, 6, 1, 19, 30, tzinfo=ZoneInfo("Europe/Kyiv")
+                    ),
+                    "naive_time": datetime(2024, 6, 1, 19, 30),
+                    "day": date(2024, 6, 1),
+                    "doors": time(19, 0),
+                    "duration": timedelta(hours=2, minutes=30),
+                    "price": Decimal("12.50"),
+                    "title": gettext_lazy("Hamlet"),
+                    "code": uuid.UUID(int=1),
+                    "note": "Act one\u2028Act two\u2029é",
+                    "seats": (1, 2),
+                    "held": None,
+                    "sold": True,
+                },
+                {"id": 2, 10: "int key"},
+            ],
+            serializer=None,
+        ),
+    },
+    serializer=None,
+)
+
+
+class FastJSONRendererTest(TestCase):
+    def test_matches_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+    def test_floats_use_stdlib(self):
+        data = {"ratio": 0.1, "large": 1e16, "small": 1e-7}
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_non_finite_floats_raise(self):
+        for value in (float("nan"), float("inf"), float("-inf")):
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({"results": [{"ratio": value}]})
+
+    @skipIf(orjson is None, "orjson is not installed")
+    def test_serializer_fields_decide_encoder(self):
+        class RatioSerializer(serializers.Serializer):
+            id = serializers.IntegerField()
+            ratio = serializers.FloatField()
+
+        class TitleSerializer(serializers.Serializer):
+            id = serializers.IntegerField()
+            title = serializers.CharField()
+
+        ratios = RatioSerializer([{"id": 1, "ratio": 1e16}], many=True)
+        titles = TitleSerializer([{"id": 1, "title": "Hamlet"}], many=True)
+
+        with mock.patch(
+            "theatre.renderers.orjson.dumps", wraps=orjson.dumps
+        ) as dumps:
+            self.assertEqual(
+                FastJSONRenderer().render({"results": ratios.data}),
+                JSONRenderer().render({"results": ratios.data}),
+            )
+            dumps.assert_not_called()
+
+            FastJSONRenderer().render({"results": titles.data})
+            dumps.assert_called_once()
+
+    def test_wide_integers_use_stdlib(self):
+        data = {"id": 2**70}
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indent_matches_json_renderer(self):
+        for accepted, context in (
+            ("application/json; indent=2", None),
+            (None, {"indent": 4}),
+        ):
+            self.assertEqual(
+                FastJSONRenderer().render(PAYLOAD, accepted, context),
+                JSONRenderer().render(PAYLOAD, accepted, context),
+            )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch("theatre.renderers.orjson", None):
+            self.assertEqual(
+                FastJSONRenderer().render(PAYLOAD),
+                JSONRenderer().render(PAYLOAD),
+            )
+
+
+class FastJSONParserTest(TestCase):
+    body = '{"tickets": [{"row": 1, "seat": 2}], "note": "é"}'.encode()
+
+    def test_matches_json_parser(self):
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(self.body)),
+            JSONParser().parse(io.BytesIO(self.body)),
+        )
+
+    def test_invalid_json_raises_parse_error(self):
+        for body in (b'{"row": ', b'{"row": NaN}'):
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+    def test_wide_numbers_use_stdlib(self):
+        for body in (
+            b'{"id": 1180591620717411303424}',
+            b'{"id": -9223372036854775809}',
+            b'{"ratio": 1e400}',
+        ):
+            self.assertEqual(
+                FastJSONParser().parse(io.BytesIO(body)),
+                JSONParser().parse(io.BytesIO(body)),
+            )
+
+    def test_other_charsets_use_stdlib(self):
+        body = '{"note": "é"}'.encode("latin-1")
+
+        data = FastJSONParser().parse(
+            io.BytesIO(body), parser_context={"encoding": "latin-1"}
+        )
+
+        self.assertEqual(data, {"note": "é"})
+
+    @skipIf(orjson is None, "orjson is not installed")
+    def test_utf8_bodies_use_orjson(self):
+        with mock.patch("theatre.parsers.orjson.loads") as loads:
+            FastJSONParser().parse(io.BytesIO(self.body))
+
+        loads.assert_called_once_with(self.body)
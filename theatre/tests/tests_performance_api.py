@@ -1,11 +1,27 @@
+from datetime import timedelta
+from io import StringIO
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework.reverse import reverse
 from rest_framework import status
-from theatre.models import Performance, Play, TheatreHall
+from theatre.cache import cache_stats
+from theatre.models import (
+    Performance,
+    PerformanceAvailability,
+    Play,
+    Reservation,
+    SeatHold,
+    TheatreHall,
+    Ticket,
+)
 
 PERFORMANCE_URL = reverse("theatre:performance-list")
+CALENDAR_URL = reverse("theatre:performance-calendar")
 
 
 def detail_url(performance_id):
@@ -119,3 +135,379 @@ class AdminPerformanceApiTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.data), 1)
         self.assertEqual(res.data[0]["id"], performance_1.id)
+
+
+class PerformanceAvailabilityTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def reserve(self, *seats):
+        return self.client.post(
+            reverse("theatre:reservation-list"),
+            {
+                "tickets": [
+                    {
+                        "row": 2,
+                        "seat": seat,
+                        "performance": self.performance.id,
+                    }
+                    for seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def availability(self):
+        return PerformanceAvailability.objects.get(
+            performance=self.performance
+        )
+
+    def test_summary_created_with_performance(self):
+        availability = self.availability()
+
+        self.assertEqual(availability.tickets_sold, 0)
+        self.assertEqual(availability.tickets_remaining, 100)
+        self.assertIsNone(availability.first_sale_at)
+
+    def test_summary_follows_sales_and_refunds(self):
+        self.reserve(1, 2)
+        first_sale_at = self.availability().first_sale_at
+        res = self.reserve(3)
+
+        availability = self.availability()
+        self.assertEqual(availability.tickets_sold, 3)
+        self.assertEqual(availability.tickets_remaining, 97)
+        self.assertEqual(availability.first_sale_at, first_sale_at)
+        self.assertGreater(availability.last_sale_at, first_sale_at)
+
+        Reservation.objects.get(id=res.data["id"]).delete()
+        availability = self.availability()
+        self.assertEqual(availability.tickets_sold, 2)
+        self.assertEqual(availability.tickets_remaining, 98)
+
+    def test_ticket_moved_to_other_performance(self):
+        self.reserve(1, 2)
+        other = sample_performance(show_time="2024-06-04")
+        ticket = Ticket.objects.get(seat=2)
+
+        ticket.performance = other
+        ticket.save()
+
+        self.assertEqual(self.availability().tickets_sold, 1)
+        moved = PerformanceAvailability.objects.get(performance=other)
+        self.assertEqual(moved.tickets_sold, 1)
+        self.assertEqual(moved.tickets_remaining, 99)
+        self.assertEqual(
+            self.client.get(detail_url(other.id)).data["taken_seats"],
+            ["row: 2, seat: 2"],
+        )
+
+    def test_list_reads_summary(self):
+        self.reserve(1, 2)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(res.data["results"][0]["tickets_available"], 98)
+
+    def test_hall_resize_updates_remaining(self):
+        self.reserve(1)
+        hall = self.performance.theatre_hall
+        hall.rows = 5
+        hall.save()
+
+        self.assertEqual(self.availability().tickets_remaining, 49)
+        res = self.client.get(PERFORMANCE_URL)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 49)
+
+    def test_rebuild_availability_command(self):
+        self.reserve(1, 2)
+        PerformanceAvailability.objects.all().delete()
+        out = StringIO()
+
+        call_command(
+            "rebuild_availability",
+            "--repair",
+            "--chunk-size",
+            "1",
+            stdout=out,
+        )
+
+        availability = self.availability()
+        self.assertEqual(availability.tickets_sold, 2)
+        self.assertEqual(availability.tickets_remaining, 98)
+        self.assertEqual(
+            availability.first_sale_at, Reservation.objects.get().created_at
+        )
+        self.assertIn(
+            f"Performance {self.performance.id}: summary missing, tickets 2",
+            out.getvalue(),
+        )
+        self.assertIn("Rebuilt availability of 1 performances", out.getvalue())
+
+    def test_rebuild_availability_check_reports_drift(self):
+        self.reserve(1, 2)
+        other = sample_performance(show_time="2024-06-04")
+        PerformanceAvailability.objects.filter(
+            performance=self.performance
+        ).update(tickets_sold=5)
+        PerformanceAvailability.objects.filter(performance=other).delete()
+        out = StringIO()
+
+        with self.assertRaisesMessage(CommandError, "2 drifted summaries"):
+            call_command("rebuild_availability", stdout=out)
+
+        self.assertIn(
+            f"Performance {self.performance.id}: summary 5, tickets 2",
+            out.getvalue(),
+        )
+        self.assertIn(
+            f"Performance {other.id}: summary missing, tickets 0",
+            out.getvalue(),
+        )
+        self.assertEqual(self.availability().tickets_sold, 5)
+
+        call_command("rebuild_availability", "--repair", stdout=StringIO())
+        out = StringIO()
+        call_command("rebuild_availability", stdout=out)
+        self.assertIn("No drifted summaries.", out.getvalue())
+
+
+class CursorPaginationPerformanceApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        play = sample_play()
+        theatre_hall = sample_theatre_hall()
+        for day in range(1, 13):
+            sample_performance(
+                play=play,
+                theatre_hall=theatre_hall,
+                show_time=f"2024-06-{day:02d}",
+            )
+
+    def test_page_number_pagination_by_default(self):
+        res = self.client.get(PERFORMANCE_URL, {"page": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 12)
+        self.assertEqual(len(res.data["results"]), 5)
+
+    def test_cursor_pagination_walks_all_pages(self):
+        res = self.client.get(PERFORMANCE_URL, {"pagination": "cursor"})
+        self.assertNotIn("count", res.data)
+
+        show_times = []
+        while True:
+            show_times += [item["show_time"] for item in res.data["results"]]
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+
+        self.assertEqual(len(show_times), 12)
+        self.assertEqual(show_times, sorted(show_times, reverse=True))
+
+    def test_cursor_page_skips_count_query(self):
+        first = self.client.get(PERFORMANCE_URL, {"pagination": "cursor"})
+
+        with self.assertNumQueries(1):
+            self.client.get(first.data["next"])
+
+
+@override_settings(PERFORMANCE_CACHE_ENABLED=True)
+class PerformanceCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def test_list_served_from_cache(self):
+        self.client.get(PERFORMANCE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(cache_stats()["hits"], 1)
+
+    def test_ticket_sale_invalidates_list_and_detail(self):
+        self.client.get(PERFORMANCE_URL)
+        self.client.get(detail_url(self.performance.id))
+
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=self.performance,
+            reservation=Reservation.objects.create(user=self.user),
+        )
+        listing = self.client.get(PERFORMANCE_URL)
+        detail = self.client.get(detail_url(self.performance.id))
+
+        self.assertEqual(listing.data["results"][0]["tickets_available"], 99)
+        self.assertEqual(detail.data["taken_seats"], ["row: 1, seat: 1"])
+
+    def test_detail_key_ignores_parameter_order(self):
+        url = detail_url(self.performance.id)
+        self.client.get(f"{url}?fields=id,show_time&omit=show_time")
+
+        with self.assertNumQueries(0):
+            res = self.client.get(f"{url}?omit=show_time&fields=id,show_time")
+
+        self.assertEqual(res.data, {"id": self.performance.id})
+
+    def test_ticket_edit_invalidates_detail(self):
+        ticket = Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=self.performance,
+            reservation=Reservation.objects.create(user=self.user),
+        )
+        self.client.get(detail_url(self.performance.id))
+
+        ticket.seat = 2
+        ticket.save()
+        res = self.client.get(detail_url(self.performance.id))
+
+        self.assertEqual(res.data["taken_seats"], ["row: 1, seat: 2"])
+
+    def test_play_change_invalidates_detail(self):
+        self.client.get(detail_url(self.performance.id))
+
+        self.performance.play.title = "Macbeth"
+        self.performance.play.save()
+        res = self.client.get(detail_url(self.performance.id))
+
+        self.assertEqual(res.data["play"]["title"], "Macbeth")
+
+    def test_performance_cache_stats_command(self):
+        self.client.get(PERFORMANCE_URL)
+        self.client.get(PERFORMANCE_URL)
+        out = StringIO()
+
+        call_command("performance_cache_stats", "--reset", stdout=out)
+
+        self.assertIn("hit rate: 50.0%", out.getvalue())
+        self.assertEqual(cache_stats()["hits"], 0)
+
+    @override_settings(PERFORMANCE_CACHE_ENABLED=False)
+    def test_disabled_without_shared_cache(self):
+        self.client.get(PERFORMANCE_URL)
+        Performance.objects.filter(id=self.performance.id).update(
+            show_time="2024-07-01 19:30"
+        )
+
+        res = self.client.get(PERFORMANCE_URL)
+        out = StringIO()
+        call_command("performance_cache_stats", stdout=out)
+
+        self.assertEqual(
+            res.data["results"][0]["show_time"], "2024-07-01T19:30:00"
+        )
+        self.assertEqual(cache_stats()["misses"], 0)
+        self.assertIn("disabled", out.getvalue())
+
+
+class PerformanceCalendarApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.play = sample_play()
+        self.hall = sample_theatre_hall()
+        for show_time in (
+            "2024-06-01 14:00",
+            "2024-06-01 19:00",
+            "2024-06-03 19:00",
+            "2024-07-01 19:00",
+        ):
+            sample_performance(
+                play=self.play, theatre_hall=self.hall, show_time=show_time
+            )
+        sample_performance(
+            play=sample_play("Macbeth"),
+            theatre_hall=self.hall,
+            show_time="2024-06-03 14:00",
+        )
+
+    def test_calendar_groups_by_day(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                CALENDAR_URL, {"start": "2024-06-01", "end": "2024-06-30"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "date": "2024-06-01",
+                    "performances": 2,
+                    "seats_available": 200,
+                },
+                {
+                    "date": "2024-06-03",
+                    "performances": 2,
+                    "seats_available": 200,
+                },
+            ],
+        )
+
+    def test_calendar_filter_by_play(self):
+        res = self.client.get(
+            CALENDAR_URL,
+            {"start": "2024-06-03", "end": "2024-07-01", "play": self.play.id},
+        )
+
+        self.assertEqual(
+            [(day["date"], day["performances"]) for day in res.data],
+            [("2024-06-03", 1), ("2024-07-01", 1)],
+        )
+
+    def test_calendar_subtracts_sold_and_held_seats(self):
+        performance = Performance.objects.filter(
+            play=self.play, show_time__date="2024-06-01"
+        ).first()
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=performance,
+            reservation=Reservation.objects.create(user=self.user),
+        )
+        SeatHold.objects.create(
+            performance=performance,
+            row=1,
+            seat=2,
+            user=self.user,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+        res = self.client.get(
+            CALENDAR_URL, {"start": "2024-06-01", "end": "2024-06-01"}
+        )
+
+        self.assertEqual(res.data[0]["seats_available"], 198)
+
+    def test_calendar_rejects_invalid_range(self):
+        for params in (
+            {"start": "2024-06-02", "end": "2024-06-01"},
+            {"start": "2024-01-01", "end": "2025-12-31"},
+            {"start": "2024-06-01"},
+        ):
+            res = self.client.get(CALENDAR_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
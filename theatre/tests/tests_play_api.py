@@ -1,4 +1,7 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework.reverse import reverse
@@ -146,3 +149,177 @@ class AdminPlayTest(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+class PlaySearchApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.hamlet = Play.objects.create(
+            title="Hamlet", description="The prince of Denmark"
+        )
+        self.macbeth = Play.objects.create(
+            title="Macbeth", description="A tragedy about Hamlet's rival"
+        )
+        self.actor = Actor.objects.create(
+            first_name="Dave", last_name="Batista"
+        )
+        self.macbeth.actors.add(self.actor)
+
+    def search(self, q):
+        res = self.client.get(PLAY_URL, {"q": q})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [play["title"] for play in res.data["results"]]
+
+    def test_prefix_match(self):
+        self.assertEqual(self.search("den"), ["Hamlet"])
+
+    def test_title_ranked_first(self):
+        self.assertEqual(self.search("hamlet"), ["Hamlet", "Macbeth"])
+
+    def test_rank_order_kept_with_cursor_pagination(self):
+        Play.objects.create(title="A Retelling", description="Macbeth again")
+
+        res = self.client.get(
+            PLAY_URL, {"q": "macbeth", "pagination": "cursor"}
+        )
+
+        self.assertEqual(
+            [play["title"] for play in res.data["results"]],
+            ["Macbeth", "A Retelling"],
+        )
+        self.assertEqual(res.data["count"], 2)
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search("tragedy prince"), [])
+
+    def test_index_follows_relations(self):
+        self.assertEqual(self.search("batis"), ["Macbeth"])
+
+        self.actor.last_name = "Bautista"
+        self.actor.save()
+        self.assertEqual(self.search("batis"), [])
+        self.assertEqual(self.search("bautista"), ["Macbeth"])
+
+        self.hamlet.genres.add(Genre.objects.create(name="Drama"))
+        self.assertEqual(self.search("dram"), ["Hamlet"])
+
+        self.actor.delete()
+        self.assertEqual(self.search("bautista"), [])
+
+    def test_index_follows_play_changes(self):
+        self.hamlet.title = "Othello"
+        self.hamlet.save()
+        self.assertEqual(self.search("othel"), ["Othello"])
+
+        self.hamlet.delete()
+        self.assertEqual(self.search("othel"), [])
+
+    def test_rebuild_command(self):
+        Play.objects.filter(id=self.hamlet.id).update(title="Othello")
+        self.assertEqual(self.search("othel"), [])
+
+        call_command("rebuild_play_search", stdout=StringIO())
+
+        self.assertEqual(self.search("othel"), ["Othello"])
+
+
+class PlayRelationFilterApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.drama = Genre.objects.create(name="Drama")
+        self.comedy = Genre.objects.create(name="Comedy")
+        self.actor = Actor.objects.create(first_name="Dave", last_name="B")
+        self.other = Actor.objects.create(first_name="Ann", last_name="C")
+
+        self.hamlet = Play.objects.create(title="Hamlet")
+        self.hamlet.genres.add(self.drama, self.comedy)
+        self.hamlet.actors.add(self.actor, self.other)
+        self.macbeth = Play.objects.create(title="Macbeth")
+        self.macbeth.genres.add(self.drama)
+        self.macbeth.actors.add(self.actor)
+        Play.objects.create(title="Othello")
+
+    def titles(self, **params):
+        res = self.client.get(PLAY_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [play["title"] for play in res.data["results"]]
+
+    def test_genres_any_without_duplicates(self):
+        genres = f"{self.drama.id},{self.comedy.id}"
+
+        self.assertEqual(self.titles(genres=genres), ["Hamlet", "Macbeth"])
+
+    def test_genres_all(self):
+        genres = f"{self.drama.id},{self.comedy.id}"
+
+        self.assertEqual(
+            self.titles(genres=genres, genres_match="all"), ["Hamlet"]
+        )
+
+    def test_actors_any_and_all(self):
+        actors = f"{self.actor.id},{self.other.id}"
+
+        self.assertEqual(self.titles(actors=actors), ["Hamlet", "Macbeth"])
+        self.assertEqual(
+            self.titles(actors=actors, actors_match="all"), ["Hamlet"]
+        )
+
+    def test_filters_combine(self):
+        self.assertEqual(
+            self.titles(genres=self.comedy.id, actors=self.actor.id),
+            ["Hamlet"],
+        )
+
+    def test_invalid_match_mode(self):
+        res = self.client.get(
+            PLAY_URL, {"genres": self.drama.id, "genres_match": "some"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PlayListNamesApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.hamlet = sample_play()
+        self.hamlet.actors.add(
+            Actor.objects.create(first_name="Ann", last_name="Lee")
+        )
+        Play.objects.create(title="Othello")
+
+    def test_names_aggregated_in_one_query(self):
+        # COUNT(*) for the page plus the plays with their names
+        with self.assertNumQueries(2):
+            res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        hamlet, othello = res.data["results"]
+        self.assertEqual(
+            sorted(hamlet["actors"]), ["Ann Lee", "Dave Batista"]
+        )
+        self.assertEqual(hamlet["genres"], ["Drama"])
+        self.assertEqual(othello["actors"], [])
+        self.assertEqual(othello["genres"], [])
+
+    def test_matches_related_serialization(self):
+        res = self.client.get(PLAY_URL)
+
+        expected = PlayListSerializer(self.hamlet).data
+        hamlet = res.data["results"][0]
+        self.assertEqual(sorted(hamlet["actors"]), sorted(expected["actors"]))
+        self.assertEqual(hamlet["genres"], expected["genres"])
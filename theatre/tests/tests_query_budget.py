@@ -0,0 +1,216 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.queries import QueryBudgetExceeded, query_stats, stats_labels
+from theatre.testing import QueryBudgetMixin
+from theatre.views import (
+    PerformanceViewSet,
+    PlayViewSet,
+    ReservationViewSet,
+)
+from user.views import CreateUserView, ManageUserView
+
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+class QueryBudgetApiTest(QueryBudgetMixin, TestCase):
+    """Representative requests against a populated catalogue.
+
+    Requests authenticate with a real JWT so the user lookup counts
+    against the budgets as it does in production.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer "
+            f"{RefreshToken.for_user(self.user).access_token}"
+        )
+
+        actors = [
+            Actor.objects.create(first_name=f"First{i}", last_name=f"Last{i}")
+            for i in range(4)
+        ]
+        genres = [Genre.objects.create(name=f"Genre{i}") for i in range(3)]
+        halls = [
+            TheatreHall.objects.create(name=f"Hall{i}", rows=5, seats_in_row=8)
+            for i in range(2)
+        ]
+        self.performances = []
+        for i in range(3):
+            play = Play.objects.create(title=f"Play{i}", description="About")
+            play.actors.add(*actors[i:i + 2])
+            play.genres.add(*genres[i:i + 2])
+            self.performances.append(
+                Performance.objects.create(
+                    play=play,
+                    theatre_hall=halls[i % 2],
+                    show_time=f"2024-06-0{i + 1} 19:00",
+                )
+            )
+        self.play = play
+        for i in range(2):
+            reservation = Reservation.objects.create(user=self.user)
+            for performance in self.performances:
+                Ticket.objects.create(
+                    row=i + 1,
+                    seat=1,
+                    performance=performance,
+                    reservation=reservation,
+                )
+
+    def test_play_list(self):
+        with self.assertQueryBudget(PlayViewSet, "list"):
+            res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_play_retrieve(self):
+        with self.assertQueryBudget(PlayViewSet, "retrieve"):
+            res = self.client.get(
+                reverse("theatre:play-detail", args=(self.play.id,))
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_performance_list(self):
+        with self.assertQueryBudget(PerformanceViewSet, "list"):
+            res = self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_performance_retrieve(self):
+        url = reverse(
+            "theatre:performance-detail", args=(self.performances[0].id,)
+        )
+        with self.assertQueryBudget(PerformanceViewSet, "retrieve"):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_reservation_list(self):
+        with self.assertQueryBudget(ReservationViewSet, "list"):
+            res = self.client.get(RESERVATION_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_reservation_create(self):
+        payload = {
+            "tickets": [
+                {"row": 5, "seat": seat, "performance": performance.id}
+                for performance in self.performances
+                for seat in (1, 2)
+            ]
+        }
+        with self.assertQueryBudget(ReservationViewSet, "create"):
+            res = self.client.post(RESERVATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_user_views(self):
+        with self.assertQueryBudget(CreateUserView, "post"):
+            res = self.client.post(
+                reverse("user:create"),
+                {"email": "new@test.test", "password": "newpassword"},
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=self.user)}"
+        )
+        with self.assertQueryBudget(ManageUserView, "get"):
+            res = client.get(reverse("user:manage_user"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+@override_settings(QUERY_STATS_SAMPLE_RATE=1.0)
+class QueryBudgetMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@test.test", password="testpassword"
+            )
+        )
+        Play.objects.create(title="Hamlet")
+
+    def test_stats_recorded(self):
+        self.client.get(PLAY_URL)
+        self.client.get(PLAY_URL, {"title": "ham"})
+
+        (stats,) = query_stats()
+        self.assertEqual(stats["view"], "PlayViewSet.list")
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["queries"], 4)
+        self.assertEqual(stats["max_queries"], 2)
+        self.assertIn("theatre_play", stats["slowest_sql"])
+        self.assertEqual(stats["over_budget"], 0)
+
+    def test_stats_of_every_view_action_kept(self):
+        self.client.get(PLAY_URL)
+        self.client.get(PERFORMANCE_URL)
+
+        self.assertEqual(
+            sorted(stats["view"] for stats in query_stats()),
+            ["PerformanceViewSet.list", "PlayViewSet.list"],
+        )
+        self.assertIn("ManageUserView.get", stats_labels())
+        self.assertIn("PerformanceViewSet.seat_map", stats_labels())
+
+    @override_settings(QUERY_STATS_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_not_recorded(self):
+        with mock.patch.object(PlayViewSet, "query_budgets", {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(PLAY_URL)
+
+        self.assertEqual(query_stats(), [])
+
+    def test_over_budget_fails(self):
+        with mock.patch.object(PlayViewSet, "query_budgets", {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(PLAY_URL)
+
+    @override_settings(QUERY_BUDGETS_ENFORCED=False)
+    def test_over_budget_logged_when_not_enforced(self):
+        with mock.patch.object(PlayViewSet, "query_budgets", {"list": 1}):
+            with self.assertLogs("theatre.middleware", "WARNING"):
+                res = self.client.get(PLAY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(query_stats()[0]["over_budget"], 1)
+
+    def test_stats_command(self):
+        self.client.get(PLAY_URL)
+        out = StringIO()
+
+        call_command("query_stats", "--reset", stdout=out)
+
+        self.assertIn("PlayViewSet.list", out.getvalue())
+        self.assertEqual(query_stats(), [])
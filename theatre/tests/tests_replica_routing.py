@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from theatre import mixins
+from theatre.models import Performance, Play, TheatreHall
+from theatre.replicas import (
+    start_replica_reads,
+    stop_replica_reads,
+    sync_sqlite,
+    user_pinned,
+)
+from theatre.routers import ReplicaRouter
+
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Play), DEFAULT_DB_ALIAS)
+
+    def test_reads_go_to_replica_until_a_write(self):
+        token = start_replica_reads()
+        try:
+            self.assertEqual(self.router.db_for_read(Play), "replica1")
+            self.assertEqual(self.router.db_for_write(Play), DEFAULT_DB_ALIAS)
+            self.assertEqual(self.router.db_for_read(Play), DEFAULT_DB_ALIAS)
+        finally:
+            stop_replica_reads(token)
+
+        self.assertEqual(self.router.db_for_read(Play), DEFAULT_DB_ALIAS)
+
+    def test_replicas_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica1", "theatre"))
+        self.assertIsNone(
+            self.router.allow_migrate(DEFAULT_DB_ALIAS, "theatre")
+        )
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        token = start_replica_reads()
+
+        self.assertIsNone(token)
+        self.assertEqual(self.router.db_for_read(Play), DEFAULT_DB_ALIAS)
+
+
+@override_settings(SHARED_CACHE=True)
+class ReplicaReadMixinTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Hamlet"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Hall", rows=5, seats_in_row=5
+            ),
+            show_time="2024-06-03",
+        )
+
+    def uses_replica(self, url, params=None):
+        with mock.patch.object(
+            mixins, "start_replica_reads", wraps=start_replica_reads
+        ) as start:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return start.called
+
+    def test_safe_requests_use_replica_reads(self):
+        self.assertTrue(self.uses_replica(PERFORMANCE_URL))
+
+    @override_settings(SHARED_CACHE=False)
+    def test_no_replica_reads_without_shared_cache(self):
+        self.assertFalse(self.uses_replica(PERFORMANCE_URL))
+
+    @override_settings(CONDITIONAL_GET_ENABLED=True)
+    def test_conditional_gets_read_primary(self):
+        play_id = self.performance.play_id
+
+        self.assertFalse(self.uses_replica(PLAY_URL))
+        self.assertFalse(
+            self.uses_replica(reverse("theatre:play-detail", args=[play_id]))
+        )
+        self.assertTrue(
+            self.uses_replica(
+                reverse("theatre:play-batch"), {"ids": str(play_id)}
+            )
+        )
+
+    def test_catalogue_reads_replica_without_conditional_get(self):
+        self.assertTrue(self.uses_replica(PLAY_URL))
+
+    def test_own_reservation_pins_user_to_primary(self):
+        res = self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "performance": self.performance.id}
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(user_pinned(self.user))
+        self.assertFalse(self.uses_replica(PERFORMANCE_URL))
+
+    def test_failed_write_does_not_pin(self):
+        res = self.client.post(RESERVATION_URL, {"tickets": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(user_pinned(self.user))
+
+
+class SyncSqliteTest(SimpleTestCase):
+    def test_copies_primary(self):
+        with tempfile.TemporaryDirectory() as directory:
+            primary = os.path.join(directory, "primary.sqlite3")
+            replica = os.path.join(directory, "replica.sqlite3")
+            with sqlite3.connect(primary) as db:
+                db.execute("CREATE TABLE seats (id integer)")
+                db.execute("INSERT INTO seats VALUES (1), (2)")
+
+            sync_sqlite(primary, replica)
+
+            db = sqlite3.connect(replica)
+            try:
+                rows = db.execute("SELECT count(*) FROM seats").fetchone()
+            finally:
+                db.close()
+            self.assertEqual(rows, (2,))
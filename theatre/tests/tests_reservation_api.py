@@ -1,16 +1,28 @@
+import csv
+import json
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework.reverse import reverse
 from rest_framework import status
 import user
-from theatre.models import Reservation
+from theatre.models import (
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
 from theatre.serializers import (
     ReservationListSerializer,
     ReservationDetailSerializer,
 )
 
 RESERVATION_URL = reverse("theatre:reservation-list")
+EXPORT_URL = reverse("theatre:reservation-export")
 
 
 def detail_url(reservation_id):
@@ -27,6 +39,16 @@ def sample_reservation(user=None, **params) -> Reservation:
     return Reservation.objects.create(**defaults)
 
 
+def sample_performance(rows=5, seats_in_row=10) -> Performance:
+    return Performance.objects.create(
+        play=Play.objects.create(title="Hamlet"),
+        theatre_hall=TheatreHall.objects.create(
+            name="Hall", rows=rows, seats_in_row=seats_in_row
+        ),
+        show_time="2024-06-03",
+    )
+
+
 class UnauthenticatedPlayApiTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -81,3 +103,168 @@ class AuthenticatedReservationApiTest(TestCase):
 
         res = self.client.get(url)
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CreateReservationApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def post_tickets(self, seats, performance=None):
+        performance = performance or self.performance
+        return self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "performance": performance.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def test_create_reservation(self):
+        res = self.post_tickets([(1, 1), (1, 2)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(
+            sorted(reservation.tickets.values_list("row", "seat")),
+            [(1, 1), (1, 2)],
+        )
+
+    def test_create_reservation_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as single:
+            self.post_tickets([(1, 1)])
+        with CaptureQueriesContext(connection) as group:
+            self.post_tickets([(2, seat) for seat in range(2, 10)])
+
+        self.assertEqual(len(single), len(group))
+        self.assertEqual(Ticket.objects.count(), 9)
+
+    def test_create_reservation_seat_out_of_range(self):
+        res = self.post_tickets([(6, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"][0]["row"][0],
+            "row number must be in available range: (1, rows): (1, 5)",
+        )
+
+    def test_create_reservation_duplicate_seat_in_request(self):
+        res = self.post_tickets([(1, 3), (1, 3)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_create_reservation_seat_already_taken(self):
+        self.post_tickets([(1, 3)])
+
+        res = self.post_tickets([(1, 4), (1, 3)])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["conflicts"],
+            [{"performance": self.performance.id, "row": 1, "seat": 3}],
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_create_reservation_allow_partial(self):
+        self.post_tickets([(1, 3)])
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {
+                        "row": 1,
+                        "seat": seat,
+                        "performance": self.performance.id,
+                    }
+                    for seat in (3, 4)
+                ],
+                "allow_partial": True,
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 1)
+        self.assertEqual(
+            res.data["skipped_seats"],
+            [{"performance": self.performance.id, "row": 1, "seat": 3}],
+        )
+
+    def test_same_seat_number_in_other_row(self):
+        self.post_tickets([(1, 3)])
+
+        res = self.post_tickets([(2, 3)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_create_reservation_unknown_performance(self):
+        res = self.client.post(
+            RESERVATION_URL,
+            {"tickets": [{"row": 1, "seat": 1, "performance": 999}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("performance", res.data["tickets"][0])
+
+
+class ExportReservationApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+        for seat in range(1, 4):
+            self.client.post(
+                RESERVATION_URL,
+                {
+                    "tickets": [
+                        {
+                            "row": 1,
+                            "seat": seat,
+                            "performance": self.performance.id,
+                        }
+                    ]
+                },
+                format="json",
+            )
+        sample_reservation(
+            user=get_user_model().objects.create_user(
+                email="other@test.test", password="testpassword"
+            )
+        )
+
+    def test_export_ndjson(self):
+        res = self.client.get(EXPORT_URL, {"format": "ndjson"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(
+            [record["tickets"][0]["seat"] for record in records], [3, 2, 1]
+        )
+
+    def test_export_csv(self):
+        res = self.client.get(EXPORT_URL, {"format": "csv"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = list(
+            csv.reader(b"".join(res.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(rows[0][-2:], ["row", "seat"])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][3], "Hamlet")
@@ -0,0 +1,122 @@
+import multiprocessing
+import random
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+from theatre.models import (
+    Performance,
+    PerformanceAvailability,
+    Play,
+    TheatreHall,
+    Ticket,
+)
+from theatre.seat_map import get_seat_map
+
+WORKERS = 8
+ROUNDS = 6
+ROWS = 3
+SEATS_IN_ROW = 4
+
+
+def book_randomly(user_id: int, performance_id: int, seed: int) -> list:
+    """Worker: try to book a few overlapping seat sets over HTTP."""
+    rng = random.Random(seed)
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.get(id=user_id))
+    statuses = []
+    for _ in range(ROUNDS):
+        seats = rng.sample(
+            [
+                (row, seat)
+                for row in range(1, ROWS + 1)
+                for seat in range(1, SEATS_IN_ROW + 1)
+            ],
+            3,
+        )
+        try:
+            res = client.post(
+                reverse("theatre:reservation-list"),
+                {
+                    "tickets": [
+                        {
+                            "row": row,
+                            "seat": seat,
+                            "performance": performance_id,
+                        }
+                        for row, seat in seats
+                    ],
+                    "allow_partial": rng.random() < 0.5,
+                },
+                format="json",
+            )
+            statuses.append(
+                (res.status_code, len(res.data.get("tickets", ())))
+            )
+        except Exception as error:  # noqa: B902 - reported to the parent
+            statuses.append((500, repr(error)))
+    connections.close_all()
+    return statuses
+
+
+@skipIf(
+    connection.vendor == "sqlite"
+    and connection.creation.is_in_memory_db(
+        connection.settings_dict["TEST"]["NAME"] or ":memory:"
+    ),
+    "needs a database shared between processes, set SQLITE_TEST_NAME",
+)
+class ConcurrentReservationStressTest(TransactionTestCase):
+    def test_concurrent_overlapping_reservations(self):
+        performance = Performance.objects.create(
+            play=Play.objects.create(title="Hamlet"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Hall", rows=ROWS, seats_in_row=SEATS_IN_ROW
+            ),
+            show_time="2024-06-03",
+        )
+        users = [
+            get_user_model().objects.create_user(
+                email=f"worker{index}@test.test", password="testpassword"
+            )
+            for index in range(WORKERS)
+        ]
+
+        connections.close_all()
+        with multiprocessing.get_context("fork").Pool(WORKERS) as pool:
+            results = pool.starmap(
+                book_randomly,
+                [
+                    (user.id, performance.id, seed)
+                    for seed, user in enumerate(users)
+                ],
+            )
+
+        statuses = [result for worker in results for result in worker]
+        self.assertEqual(
+            [result for result in statuses if result[0] not in (201, 409)], []
+        )
+        booked = sum(count for code, count in statuses if code == 201)
+        tickets = list(
+            Ticket.objects.filter(performance=performance).values_list(
+                "row", "seat"
+            )
+        )
+        self.assertEqual(len(tickets), len(set(tickets)))
+        self.assertEqual(len(tickets), booked)
+
+        self.assertEqual(
+            PerformanceAvailability.objects.get(
+                performance=performance
+            ).tickets_sold,
+            len(tickets),
+        )
+        # fetched again, the seat map cached on ``performance`` predates
+        # the workers
+        performance = Performance.objects.get(pk=performance.pk)
+        self.assertEqual(
+            sorted(get_seat_map(performance).taken_seats()), sorted(tickets)
+        )
@@ -0,0 +1,127 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+from rest_framework import status
+from theatre.allocation import find_best_block
+from theatre.models import (
+    Performance,
+    Play,
+    TheatreHall,
+    Reservation,
+    SeatMap,
+    Ticket,
+)
+
+
+def best_available_url(performance_id):
+    return reverse(
+        "theatre:performance-best-available", args=(performance_id,)
+    )
+
+
+def sample_seat_map(rows, seats_in_row, taken=()) -> SeatMap:
+    seat_map = SeatMap(
+        rows=rows,
+        seats_in_row=seats_in_row,
+        bitmap=bytes(SeatMap.empty_bitmap(rows, seats_in_row)),
+    )
+    seat_map.set_seats(taken, taken=True)
+    return seat_map
+
+
+class FindBestBlockTest(TestCase):
+    def test_centre_of_middle_row(self):
+        seat_map = sample_seat_map(5, 10)
+
+        self.assertEqual(find_best_block(seat_map, 2), (3, [5, 6]))
+
+    def test_front_and_back_preferences(self):
+        seat_map = sample_seat_map(5, 10, taken=[(1, 5)])
+
+        self.assertEqual(
+            find_best_block(seat_map, 4, "front"), (1, [6, 7, 8, 9])
+        )
+        self.assertEqual(
+            find_best_block(seat_map, 4, "back"), (5, [4, 5, 6, 7])
+        )
+
+    def test_skips_rows_without_enough_adjacent_seats(self):
+        taken = [(3, 3), (3, 7), (2, 5), (4, 5)]
+        seat_map = sample_seat_map(5, 10, taken=taken)
+
+        self.assertEqual(find_best_block(seat_map, 5), (2, [6, 7, 8, 9, 10]))
+
+    def test_no_block_available(self):
+        seat_map = sample_seat_map(2, 4, taken=[(1, 2), (2, 3)])
+
+        self.assertIsNone(find_best_block(seat_map, 3))
+        self.assertIsNone(find_best_block(seat_map, 5))
+
+    def test_large_hall(self):
+        taken = [
+            (row, seat)
+            for row in range(1, 201)
+            for seat in range(1, 201)
+            if not (row == 17 and 40 <= seat < 48)
+        ]
+        seat_map = sample_seat_map(200, 200, taken=taken)
+
+        self.assertEqual(
+            find_best_block(seat_map, 8), (17, list(range(40, 48)))
+        )
+
+
+class BestAvailableApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Hamlet"),
+            theatre_hall=TheatreHall.objects.create(
+                name="Hall", rows=3, seats_in_row=6
+            ),
+            show_time="2024-06-03",
+        )
+
+    def test_suggest_block(self):
+        res = self.client.get(
+            best_available_url(self.performance.id),
+            {"count": 3, "preference": "front"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {"performance": self.performance.id, "row": 1, "seats": [2, 3, 4]},
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_book_block(self):
+        res = self.client.post(
+            best_available_url(self.performance.id),
+            {"count": 2, "preference": "back"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        reservation = Reservation.objects.get(id=res.data["id"])
+        self.assertEqual(reservation.user, self.user)
+        self.assertEqual(
+            sorted(reservation.tickets.values_list("row", "seat")),
+            [(3, 3), (3, 4)],
+        )
+
+    def test_block_too_large(self):
+        res = self.client.get(
+            best_available_url(self.performance.id), {"count": 7}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_count_required(self):
+        res = self.client.get(best_available_url(self.performance.id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,164 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+from rest_framework import status
+from theatre.models import (
+    Performance,
+    Play,
+    TheatreHall,
+    Reservation,
+    SeatHold,
+)
+
+RESERVATION_URL = reverse("theatre:reservation-list")
+
+
+def hold_url(performance_id):
+    return reverse("theatre:performance-hold", args=(performance_id,))
+
+
+def sample_performance() -> Performance:
+    return Performance.objects.create(
+        play=Play.objects.create(title="Hamlet"),
+        theatre_hall=TheatreHall.objects.create(
+            name="Hall", rows=3, seats_in_row=5
+        ),
+        show_time="2024-06-03",
+    )
+
+
+class SeatHoldApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+
+    def hold(self, seats, user=None, minutes=10):
+        self.client.force_authenticate(user or self.user)
+        res = self.client.post(
+            hold_url(self.performance.id),
+            {
+                "seats": [{"row": row, "seat": seat} for row, seat in seats],
+                "minutes": minutes,
+            },
+            format="json",
+        )
+        self.client.force_authenticate(self.user)
+        return res
+
+    def test_hold_seats(self):
+        res = self.hold([(1, 1), (1, 2)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 2)
+
+    def test_held_seats_count_as_taken(self):
+        self.hold([(2, 3)], user=self.other_user)
+
+        detail = self.client.get(
+            reverse("theatre:performance-detail", args=(self.performance.id,))
+        )
+        listing = self.client.get(reverse("theatre:performance-list"))
+
+        self.assertEqual(detail.data["taken_seats"], ["row: 2, seat: 3"])
+        self.assertEqual(listing.data["results"][0]["tickets_available"], 14)
+
+    def test_hold_conflict(self):
+        self.hold([(1, 1)], user=self.other_user)
+
+        res = self.hold([(1, 1), (1, 2)])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["conflicts"],
+            [{"performance": self.performance.id, "row": 1, "seat": 1}],
+        )
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_hold_seat_out_of_range(self):
+        res = self.hold([(4, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reserve_seat_held_by_other_user(self):
+        self.hold([(1, 1)], user=self.other_user)
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "performance": self.performance.id}
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_reservation_consumes_holds(self):
+        self.hold([(1, 1)])
+
+        res = self.client.post(
+            RESERVATION_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "performance": self.performance.id}
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_release_holds(self):
+        self.hold([(1, 1)])
+
+        res = self.client.delete(hold_url(self.performance.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_expired_hold_is_reclaimed(self):
+        SeatHold.objects.create(
+            performance=self.performance,
+            row=1,
+            seat=1,
+            user=self.other_user,
+            expires_at=timezone.now() - timedelta(minutes=1),
+        )
+
+        res = self.hold([(1, 1)])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.get().user, self.user)
+
+    def test_sweep_seat_holds_command(self):
+        self.hold([(2, 2)])
+        SeatHold.objects.create(
+            performance=self.performance,
+            row=1,
+            seat=1,
+            user=self.other_user,
+            expires_at=timezone.now() - timedelta(minutes=1),
+        )
+        out = StringIO()
+
+        call_command("sweep_seat_holds", stdout=out)
+
+        self.assertIn("Swept 1 expired seat holds.", out.getvalue())
+        self.assertEqual(SeatHold.objects.get().row, 2)
@@ -0,0 +1,152 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework.reverse import reverse
+from rest_framework import status
+from theatre.models import (
+    Performance,
+    Play,
+    TheatreHall,
+    Reservation,
+    Ticket,
+)
+
+
+def seat_map_url(performance_id):
+    return reverse("theatre:performance-seat-map", args=(performance_id,))
+
+
+def sample_performance(rows=3, seats_in_row=5) -> Performance:
+    return Performance.objects.create(
+        play=Play.objects.create(title="Hamlet"),
+        theatre_hall=TheatreHall.objects.create(
+            name="Hall", rows=rows, seats_in_row=seats_in_row
+        ),
+        show_time="2024-06-03",
+    )
+
+
+class SeatMapApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        self.performance = sample_performance()
+        self.reservation = Reservation.objects.create(user=self.user)
+
+    def book(self, row, seat):
+        return Ticket.objects.create(
+            row=row,
+            seat=seat,
+            performance=self.performance,
+            reservation=self.reservation,
+        )
+
+    def test_seat_map_tracks_created_tickets(self):
+        self.book(1, 1)
+        self.book(2, 3)
+
+        res = self.client.get(seat_map_url(self.performance.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["rows"], 3)
+        self.assertEqual(res.data["seats_in_row"], 5)
+        self.assertEqual(res.data["taken"], 2)
+        bitmap = base64.b64decode(res.data["bitmap"])
+        self.assertEqual(bitmap, bytes([0b10000001, 0b00000000]))
+
+    def test_seat_map_frees_seats_of_deleted_reservation(self):
+        self.book(1, 1)
+        self.reservation.delete()
+
+        res = self.client.get(seat_map_url(self.performance.id))
+
+        self.assertEqual(res.data["taken"], 0)
+
+    def test_ticket_moved_to_other_performance(self):
+        ticket = self.book(1, 1)
+        other = sample_performance()
+
+        ticket.performance = other
+        ticket.seat = 2
+        ticket.save()
+
+        self.assertEqual(
+            self.client.get(seat_map_url(self.performance.id)).data["taken"],
+            0,
+        )
+        res = self.client.get(seat_map_url(other.id))
+        self.assertEqual(
+            base64.b64decode(res.data["bitmap"]),
+            bytes([0b01000000, 0b00000000]),
+        )
+
+    def test_seat_map_binary_format(self):
+        self.book(3, 5)
+
+        res = self.client.get(
+            seat_map_url(self.performance.id), {"format": "bin"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/octet-stream")
+        self.assertEqual(res["X-Seat-Map-Rows"], "3")
+        self.assertEqual(res["X-Seat-Map-Seats-In-Row"], "5")
+        self.assertEqual(res.content, bytes([0b00000000, 0b00000010]))
+
+    def test_seat_map_binary_format_errors_render_json(self):
+        missing = self.client.get(seat_map_url(0), {"format": "bin"})
+        self.client.force_authenticate(None)
+        anonymous = self.client.get(
+            seat_map_url(self.performance.id), {"format": "bin"}
+        )
+
+        for res, code in (
+            (missing, status.HTTP_404_NOT_FOUND),
+            (anonymous, status.HTTP_401_UNAUTHORIZED),
+        ):
+            self.assertEqual(res.status_code, code)
+            self.assertEqual(res["Content-Type"], "application/json")
+            self.assertIn("detail", res.json())
+
+    def test_seat_map_query_count(self):
+        self.client.get(seat_map_url(self.performance.id))
+
+        # the seat map itself and the active holds overlaid on it
+        with self.assertNumQueries(2):
+            self.client.get(seat_map_url(self.performance.id))
+
+    def test_seat_map_rebuilt_after_hall_resize(self):
+        self.book(2, 2)
+        hall = self.performance.theatre_hall
+        hall.seats_in_row = 2
+        hall.save()
+
+        res = self.client.get(seat_map_url(self.performance.id))
+
+        self.assertEqual(res.data["seats_in_row"], 2)
+        self.assertEqual(
+            base64.b64decode(res.data["bitmap"]), bytes([0b00010000])
+        )
+
+    def test_taken_seats_read_from_seat_map(self):
+        self.book(2, 4)
+        self.book(1, 2)
+
+        res = self.client.get(
+            reverse("theatre:performance-detail", args=(self.performance.id,))
+        )
+
+        self.assertEqual(
+            res.data["taken_seats"],
+            ["row: 1, seat: 2", "row: 2, seat: 4"],
+        )
+
+    def test_seat_map_of_missing_performance(self):
+        res = self.client.get(seat_map_url(self.performance.id + 1))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
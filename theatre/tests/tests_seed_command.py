@@ -0,0 +1,139 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from theatre.models import (
+    Performance,
+    PerformanceAvailability,
+    Play,
+    Reservation,
+    SeatMap,
+    TheatreHall,
+    Ticket,
+)
+from theatre.seeding import SEED_EMAIL_DOMAIN
+
+SEED_ARGS = (
+    "--halls=3",
+    "--plays=20",
+    "--actors=15",
+    "--genres=4",
+    "--performances=12",
+    "--users=8",
+    "--reservations=40",
+    "--tickets=150",
+    "--batch-size=50",
+)
+
+
+def seed(*args):
+    call_command("seed_theatre", *SEED_ARGS, *args, stdout=StringIO())
+
+
+def ticket_rows():
+    return list(
+        Ticket.objects.order_by(
+            "performance__show_time",
+            "performance__play__title",
+            "row",
+            "seat",
+        ).values_list(
+            "performance__show_time",
+            "performance__play__title",
+            "row",
+            "seat",
+        )
+    )
+
+
+class SeedTheatreCommandTest(TestCase):
+    def test_counts(self):
+        seed()
+
+        self.assertEqual(TheatreHall.objects.count(), 3)
+        self.assertEqual(Play.objects.count(), 20)
+        self.assertEqual(Performance.objects.count(), 12)
+        self.assertEqual(
+            get_user_model()
+            .objects.filter(email__endswith=SEED_EMAIL_DOMAIN)
+            .count(),
+            8,
+        )
+        self.assertEqual(Reservation.objects.count(), 40)
+        self.assertEqual(Ticket.objects.count(), 150)
+        self.assertFalse(
+            Reservation.objects.annotate(tickets_count=Count("tickets"))
+            .filter(tickets_count=0)
+            .exists()
+        )
+
+    def test_seats_fit_halls_and_derived_state(self):
+        seed()
+
+        for performance in Performance.objects.select_related(
+            "theatre_hall", "seat_map", "availability"
+        ):
+            hall = performance.theatre_hall
+            seats = set(
+                performance.ticket_set.values_list("row", "seat")
+            )
+            self.assertEqual(
+                performance.availability.tickets_sold, len(seats)
+            )
+            self.assertEqual(
+                performance.availability.tickets_remaining,
+                hall.capacity - len(seats),
+            )
+            self.assertTrue(
+                all(
+                    1 <= row <= hall.rows and 1 <= seat <= hall.seats_in_row
+                    for row, seat in seats
+                )
+            )
+            self.assertEqual(set(performance.seat_map.taken_seats()), seats)
+
+    def test_fewer_reservations_than_performances(self):
+        seed("--performances=50", "--reservations=10", "--tickets=100")
+
+        sold = Ticket.objects.count()
+        self.assertEqual(sold, 100)
+        self.assertEqual(Reservation.objects.count(), 10)
+        self.assertEqual(
+            sum(
+                PerformanceAvailability.objects.values_list(
+                    "tickets_sold", flat=True
+                )
+            ),
+            sold,
+        )
+        self.assertEqual(
+            sum(
+                len(list(seat_map.taken_seats()))
+                for seat_map in SeatMap.objects.all()
+            ),
+            sold,
+        )
+
+    def test_tickets_capped_by_capacity(self):
+        seed("--halls=1", "--performances=1", "--tickets=100000")
+
+        hall = TheatreHall.objects.get()
+        self.assertEqual(Ticket.objects.count(), hall.capacity)
+
+    def test_same_seed_same_state(self):
+        seed()
+        first = ticket_rows()
+
+        seed("--flush")
+
+        self.assertEqual(ticket_rows(), first)
+        self.assertEqual(SeatMap.objects.count(), 12)
+        self.assertEqual(
+            get_user_model()
+            .objects.filter(email__endswith=SEED_EMAIL_DOMAIN)
+            .count(),
+            8,
+        )
@@ -0,0 +1,180 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    TheatreHall,
+    Ticket,
+)
+from theatre.views import PerformanceViewSet, PlayViewSet
+
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+RESERVATION_URL = reverse("theatre:reservation-list")
+HALL_URL = reverse("theatre:theatrehall-list")
+GENRE_URL = reverse("theatre:genre-list")
+
+
+class SparseFieldsApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.play = Play.objects.create(title="Hamlet", description="About")
+        self.play.actors.add(
+            Actor.objects.create(first_name="Kate", last_name="Winslet")
+        )
+        self.play.genres.add(Genre.objects.create(name="Drama"))
+        hall = TheatreHall.objects.create(name="Blue", rows=5, seats_in_row=8)
+        performance = Performance.objects.create(
+            play=self.play, theatre_hall=hall, show_time="2024-06-01 19:30"
+        )
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=performance,
+            reservation=Reservation.objects.create(user=self.user),
+        )
+
+    def get(self, url, params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, " ".join(query["sql"] for query in queries)
+
+    def test_performance_fields_skip_annotation_and_joins(self):
+        for values_list in (False, True):
+            with patch.object(PerformanceViewSet, "values_list", values_list):
+                res, sql = self.get(
+                    PERFORMANCE_URL, {"fields": "id,show_time"}
+                )
+
+            self.assertEqual(
+                list(res.data["results"][0]), ["id", "show_time"]
+            )
+            self.assertNotIn("theatre_seathold", sql)
+            self.assertNotIn("theatre_performanceavailability", sql)
+            self.assertNotIn("theatre_play", sql)
+            self.assertNotIn("theatre_theatrehall", sql)
+
+    def test_performance_omit_tickets_available(self):
+        full, _ = self.get(PERFORMANCE_URL, {})
+        res, sql = self.get(PERFORMANCE_URL, {"omit": "tickets_available"})
+
+        expected = dict(full.data["results"][0])
+        del expected["tickets_available"]
+        self.assertEqual(res.data["results"][0], expected)
+        self.assertNotIn("theatre_seathold", sql)
+
+    def test_play_list_skips_omitted_names(self):
+        res, sql = self.get(PLAY_URL, {"fields": "title,genres"})
+
+        self.assertEqual(
+            res.data["results"], [{"title": "Hamlet", "genres": ["Drama"]}]
+        )
+        self.assertIn("theatre_play_genres", sql)
+        self.assertNotIn("theatre_play_actors", sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_play_detail_skips_prefetches(self):
+        url = reverse("theatre:play-detail", args=[self.play.id])
+
+        res, sql = self.get(url, {"fields": "id,title"})
+
+        self.assertEqual(res.data, {"id": self.play.id, "title": "Hamlet"})
+        self.assertNotIn("theatre_actor", sql)
+        self.assertNotIn("theatre_genre", sql)
+
+    def test_reservation_list_skips_ticket_prefetch(self):
+        res, sql = self.get(RESERVATION_URL, {"fields": "id"})
+
+        self.assertEqual(list(res.data["results"][0]), ["id"])
+        self.assertNotIn("theatre_ticket", sql)
+
+    def test_field_sources_load_their_columns(self):
+        res, sql = self.get(HALL_URL, {"fields": "capacity"})
+
+        self.assertEqual(res.data["results"], [{"capacity": 40}])
+        self.assertIn('"seats_in_row"', sql)
+        self.assertNotIn('"name"', sql)
+
+    def get_cursor_pages(self, url, params):
+        params = {**params, "pagination": "cursor"}
+        results = []
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+            while True:
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                results.extend(res.data["results"])
+                if res.data["next"] is None:
+                    return results, len(queries)
+                res = self.client.get(res.data["next"])
+
+    def test_cursor_pages_of_trimmed_rows(self):
+        for i in range(11):
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=TheatreHall.objects.get(),
+                show_time=f"2024-07-{i + 1:02d} 19:30",
+            )
+            Play.objects.create(title=f"Play {i:02d}", description="About")
+
+        for view_class, url, expected in (
+            (PlayViewSet, PLAY_URL, Play.objects.count()),
+            (PerformanceViewSet, PERFORMANCE_URL, Performance.objects.count()),
+        ):
+            for values_list in (False, True):
+                cache.clear()
+                with patch.object(view_class, "values_list", values_list):
+                    results, queries = self.get_cursor_pages(
+                        url, {"fields": "id"}
+                    )
+
+                self.assertEqual(
+                    sorted(row["id"] for row in results),
+                    sorted(
+                        view_class.queryset.values_list("id", flat=True)
+                    ),
+                )
+                self.assertEqual(len(results), expected)
+                self.assertTrue(all(list(row) == ["id"] for row in results))
+                # one query per page, none per row for the cursor position
+                self.assertEqual(queries, 3)
+
+    def test_unknown_fields_rejected(self):
+        res = self.client.get(PLAY_URL, {"fields": "title,budget"})
+        omitted_all = self.client.get(GENRE_URL, {"omit": "id,name"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("budget", str(res.data["fields"]))
+        self.assertEqual(
+            omitted_all.status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_writes_render_every_field(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(admin)
+
+        res = self.client.post(f"{GENRE_URL}?fields=id", {"name": "Comedy"})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["name"], "Comedy")
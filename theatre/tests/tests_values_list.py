@@ -0,0 +1,143 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    Reservation,
+    SeatHold,
+    TheatreHall,
+    Ticket,
+)
+from theatre.rows import row_format
+from theatre.serializers import PerformanceListSerializer
+from theatre.views import PerformanceViewSet, PlayViewSet
+
+PLAY_URL = reverse("theatre:play-list")
+PERFORMANCE_URL = reverse("theatre:performance-list")
+
+
+class ValuesListApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.test", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+
+        actors = [
+            Actor.objects.create(first_name="Actor", last_name=str(i))
+            for i in range(3)
+        ]
+        genre = Genre.objects.create(name="Drama")
+        halls = [
+            TheatreHall.objects.create(name="Blue", rows=10, seats_in_row=12),
+            TheatreHall.objects.create(name="Red", rows=4, seats_in_row=5),
+        ]
+        plays = [
+            Play.objects.create(title=title, description="About")
+            for title in ("Hamlet", "Macbeth", "Othello")
+        ]
+        plays[0].actors.add(*actors)
+        plays[0].genres.add(genre)
+        plays[1].actors.add(actors[0])
+
+        for day in range(6):
+            Performance.objects.create(
+                play=plays[day % 3],
+                theatre_hall=halls[day % 2],
+                show_time=f"2024-06-{day + 1:02d} 19:30",
+            )
+        performance = Performance.objects.earliest("show_time")
+        Ticket.objects.create(
+            row=1,
+            seat=1,
+            performance=performance,
+            reservation=Reservation.objects.create(user=self.user),
+        )
+        SeatHold.objects.create(
+            performance=performance,
+            row=1,
+            seat=2,
+            user=self.user,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+
+    def get_both(self, view_class, url, params=None):
+        responses = []
+        for values_list in (False, True):
+            cache.clear()
+            with patch.object(view_class, "values_list", values_list):
+                responses.append(self.client.get(url, params))
+        return responses
+
+    def test_play_list_renders_same_json(self):
+        for params in (None, {"actors": "1"}, {"pagination": "cursor"}):
+            slow, fast = self.get_both(PlayViewSet, PLAY_URL, params)
+
+            self.assertEqual(fast.status_code, status.HTTP_200_OK)
+            self.assertEqual(fast.content, slow.content)
+
+    def test_performance_list_renders_same_json(self):
+        for params in (
+            None,
+            {"date": "2024-06-01"},
+            {"pagination": "cursor"},
+        ):
+            slow, fast = self.get_both(
+                PerformanceViewSet, PERFORMANCE_URL, params
+            )
+
+            self.assertEqual(fast.status_code, status.HTTP_200_OK)
+            self.assertEqual(fast.content, slow.content)
+
+    def test_cursor_pages_follow_rows(self):
+        cache.clear()
+        res = self.client.get(PERFORMANCE_URL, {"pagination": "cursor"})
+        following = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            len(res.data["results"]) + len(following.data["results"]), 6
+        )
+        self.assertIsNone(following.data["next"])
+
+    def test_row_format_compiled_once(self):
+        rows = row_format(PerformanceListSerializer)
+
+        self.assertIs(row_format(PerformanceListSerializer), rows)
+        self.assertEqual(
+            [name for name, _ in rows.conversions], ["show_time"]
+        )
+
+
+class BenchmarkListSerializersCommandTest(TestCase):
+    def test_reports_both_paths(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_list_serializers",
+            "--rows",
+            "20",
+            "--repeat",
+            "1",
+            stdout=out,
+        )
+
+        output = out.getvalue()
+        self.assertIn("PlayListSerializer, 20 rows (identical JSON)", output)
+        self.assertIn(
+            "PerformanceListSerializer, 20 rows (identical JSON)", output
+        )
+        self.assertEqual(Play.objects.count(), 0)
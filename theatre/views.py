@@ -1,13 +1,15 @@
-from datetime import datetime
-from django.db.models import F, Count
+from datetime import datetime, time, timedelta
+from django.db.models import Exists, OuterRef, Q
+from django.http import Http404, StreamingHttpResponse
 from drf_spectacular import openapi
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ReadOnlyModelViewSet, GenericViewSet
 from theatre.models import (
     Play,
@@ -17,7 +19,38 @@ from theatre.models import (
     Actor,
     Genre,
 )
+from theatre.aggregates import with_related_names
+from theatre.allocation import find_best_block
+from theatre.availability import daily_availability, tickets_available
+from theatre.exceptions import NoAdjacentSeats
+from theatre.holds import (
+    hold_seats,
+    prefetch_active_holds,
+    release_holds,
+    with_held_seats,
+)
+from theatre.pagination import (
+    PerformancePagination,
+    PlayPagination,
+    ReservationPagination,
+)
 from theatre.permissions import IsAdminOrIfAuthenticatedReadOnly
+from theatre.cache import cached_response, detail_cache_key, list_cache_key
+from theatre.mixins import (
+    BatchRetrieveMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    SparseFieldsMixin,
+    ValuesListMixin,
+)
+from theatre.exports import iter_reservations, stream_csv, stream_ndjson
+from theatre.search import search_plays
+from theatre.renderers import (
+    CSVRenderer,
+    NDJSONRenderer,
+    SeatMapBinaryRenderer,
+)
+from theatre.seat_map import get_seat_map_by_performance_id
 
 from theatre.serializers import (
     PlaySerializer,
@@ -30,28 +63,73 @@ from theatre.serializers import (
     PlayDetailSerializer,
     PerformanceListSerializer,
     PerformanceDetailSerializer,
+    PerformanceCalendarQuerySerializer,
+    PerformanceCalendarDaySerializer,
     ReservationListSerializer,
     PlayImageSerializer,
+    SeatMapSerializer,
+    SeatHoldSerializer,
+    SeatHoldListSerializer,
+    SeatAllocationSerializer,
+    SeatBlockSerializer,
 )
 
 
 class PlayViewSet(
-    ReadOnlyModelViewSet, mixins.CreateModelMixin, GenericViewSet
+    ReplicaReadMixin,
+    SparseFieldsMixin,
+    BatchRetrieveMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    ReadOnlyModelViewSet,
+    mixins.CreateModelMixin,
+    GenericViewSet,
 ):
-    queryset = Play.objects.prefetch_related("actors", "genres")
+    queryset = Play.objects.all()
     serializer_class = PlaySerializer
+    pagination_class = PlayPagination
+    conditional_tables = ("play", "actor", "genre")
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    # writes reindex the play for search and touch the change watermarks
+    query_budgets = {
+        "list": 3,
+        "retrieve": 4,
+        "batch": 4,
+        "create": 30,
+        "upload_image": 20,
+    }
 
     @staticmethod
     def _params_to_ints(qs):
         """Converts a list of string IDs to a list of integers"""
         return [int(str_id) for str_id in qs.split(",")]
 
+    def _match_mode(self, param):
+        """``any`` (OR, the default) or ``all`` (AND) for a relation filter"""
+        mode = self.request.query_params.get(f"{param}_match", "any")
+        if mode not in ("any", "all"):
+            raise ValidationError(
+                {f"{param}_match": "Must be either 'any' or 'all'."}
+            )
+        return mode
+
+    @staticmethod
+    def _related_filter(through, field, ids, mode):
+        """Correlated EXISTS over the M2M table instead of a join, so no
+        DISTINCT is needed and each probe hits the (play, related) index"""
+        links = through.objects.filter(play=OuterRef("pk"))
+        if mode == "any":
+            return Exists(links.filter(**{f"{field}__in": ids}))
+        return Q(
+            *(Exists(links.filter(**{field: id_})) for id_ in set(ids)),
+            _connector=Q.AND,
+        )
+
     def get_serializer_class(self):
         if self.action == "list":
             return PlayListSerializer
 
-        elif self.action == "retrieve":
+        elif self.action in ("retrieve", "batch"):
             return PlayDetailSerializer
 
         elif self.action == "upload_image":
@@ -62,23 +140,52 @@ class PlayViewSet(
     def get_queryset(self):
         """Retrieve the movies with filters"""
         title = self.request.query_params.get("title")
+        q = self.request.query_params.get("q")
         genres = self.request.query_params.get("genres")
         actors = self.request.query_params.get("actors")
 
         queryset = self.queryset
 
+        if self.action == "list":
+            queryset = with_related_names(
+                queryset,
+                actors=self.wants("actors"),
+                genres=self.wants("genres"),
+            )
+        else:
+            queryset = queryset.prefetch_related(
+                *(name for name in ("actors", "genres") if self.wants(name))
+            )
+
         if title:
             queryset = queryset.filter(title__icontains=title)
 
         if genres:
             genres_ids = self._params_to_ints(genres)
-            queryset = queryset.filter(genres__id__in=genres_ids)
+            queryset = queryset.filter(
+                self._related_filter(
+                    Play.genres.through,
+                    "genre_id",
+                    genres_ids,
+                    self._match_mode("genres"),
+                )
+            )
 
         if actors:
             actors_ids = self._params_to_ints(actors)
-            queryset = queryset.filter(actors__ids__in=actors_ids)
+            queryset = queryset.filter(
+                self._related_filter(
+                    Play.actors.through,
+                    "actor_id",
+                    actors_ids,
+                    self._match_mode("actors"),
+                )
+            )
 
-        return queryset.distinct()
+        if q:
+            queryset = search_plays(queryset, q)
+
+        return queryset
 
     @action(methods=["POST"], detail=True, url_path="upload-image")
     def upload_image(self, request, pk=None):
@@ -95,16 +202,36 @@ class PlayViewSet(
                 type=openapi.OpenApiTypes.STR,
                 description="Filter by play title",
             ),
+            OpenApiParameter(
+                "q",
+                type=openapi.OpenApiTypes.STR,
+                description=(
+                    "Full-text search over title, description, actor and "
+                    "genre names; words match as prefixes, best first"
+                ),
+            ),
             OpenApiParameter(
                 "genres",
                 type=openapi.OpenApiTypes.INT,
                 description="Filter by movie genres",
             ),
+            OpenApiParameter(
+                "genres_match",
+                type=openapi.OpenApiTypes.STR,
+                enum=["any", "all"],
+                description="Plays with any (default) or all listed genres",
+            ),
             OpenApiParameter(
                 name="actors",
                 type=openapi.OpenApiTypes.INT,
                 description="Filter by movie actors",
             ),
+            OpenApiParameter(
+                "actors_match",
+                type=openapi.OpenApiTypes.STR,
+                enum=["any", "all"],
+                description="Plays with any (default) or all listed actors",
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -113,6 +240,10 @@ class PlayViewSet(
 
 
 class TheatreHallViewSet(
+    ReplicaReadMixin,
+    SparseFieldsMixin,
+    BatchRetrieveMixin,
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -120,23 +251,41 @@ class TheatreHallViewSet(
 ):
     queryset = TheatreHall.objects.all()
     serializer_class = TheatreHallSerializer
+    conditional_tables = ("theatre_hall",)
+    field_sources = {"capacity": ("rows", "seats_in_row")}
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {"list": 3, "retrieve": 3, "batch": 3, "create": 4}
 
 
-class PerformanceViewSet(viewsets.ModelViewSet):
+class PerformanceViewSet(
+    ReplicaReadMixin,
+    SparseFieldsMixin,
+    BatchRetrieveMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     queryset = (
         Performance.objects.all()
         .select_related("play", "theatre_hall")
-        .annotate(
-            tickets_available=(
-                F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
-                - Count("ticket")
-            )
-        )
         .order_by("id")
     )
     serializer_class = PerformanceListSerializer
+    pagination_class = PerformancePagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    field_sources = {"taken_seats": ("theatre_hall", "seat_map")}
+    # seat maps, holds and bookings cost a few queries per performance
+    query_budgets = {
+        "list": 3,
+        "retrieve": 6,
+        "batch": 6,
+        "create": 8,
+        "update": 8,
+        "partial_update": 8,
+        "seat_map": 8,
+        "calendar": 2,
+        "hold": 10,
+        "best_available": 20,
+    }
 
     def get_queryset(self):
         date = self.request.query_params.get("date")
@@ -144,6 +293,22 @@ class PerformanceViewSet(viewsets.ModelViewSet):
 
         queryset = self.queryset
 
+        if self.wants("tickets_available"):
+            queryset = queryset.annotate(
+                tickets_available=tickets_available()
+            )
+
+        if self.wants("taken_seats"):
+            queryset = queryset.select_related("seat_map").prefetch_related(
+                prefetch_active_holds()
+            )
+
+        if self.action in ("retrieve", "batch") and self.wants("play"):
+            # names of the nested plays, loaded for all rows at once
+            queryset = queryset.prefetch_related(
+                "play__actors", "play__genres"
+            )
+
         if date:
             date = datetime.strptime(date, "%Y-%m-%d").date()
             queryset = queryset.filter(show_time__date=date)
@@ -156,8 +321,16 @@ class PerformanceViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == "list":
             return PerformanceListSerializer
-        elif self.action == "retrieve":
+        elif self.action in ("retrieve", "batch"):
             return PerformanceDetailSerializer
+        elif self.action == "seat_map":
+            return SeatMapSerializer
+        elif self.action == "hold":
+            return SeatHoldSerializer
+        elif self.action == "best_available":
+            return SeatAllocationSerializer
+        elif self.action == "calendar":
+            return PerformanceCalendarDaySerializer
 
         return PerformanceSerializer
 
@@ -177,32 +350,235 @@ class PerformanceViewSet(viewsets.ModelViewSet):
     )
     def list(self, request, *args, **kwargs):
         """Get list of performance."""
-        return super().list(request, *args, **kwargs)
+        return cached_response(
+            list_cache_key(request),
+            lambda: super(PerformanceViewSet, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            detail_cache_key(request, kwargs["pk"]),
+            lambda: super(PerformanceViewSet, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "start",
+                type=openapi.OpenApiTypes.DATE,
+                required=True,
+                description="First day of the range",
+            ),
+            OpenApiParameter(
+                "end",
+                type=openapi.OpenApiTypes.DATE,
+                required=True,
+                description="Last day of the range, inclusive",
+            ),
+            OpenApiParameter(
+                "play",
+                type=openapi.OpenApiTypes.INT,
+                description="Filter by play",
+            ),
+        ],
+        responses=PerformanceCalendarDaySerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def calendar(self, request):
+        """Get performances and available seats per day of a date range."""
+        query = PerformanceCalendarQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        def build():
+            performances = Performance.objects.filter(
+                show_time__gte=datetime.combine(params["start"], time.min),
+                show_time__lt=datetime.combine(
+                    params["end"] + timedelta(days=1), time.min
+                ),
+            )
+            if "play" in params:
+                performances = performances.filter(play_id=params["play"])
+            serializer = self.get_serializer(
+                daily_availability(performances), many=True
+            )
+            return Response(serializer.data)
+
+        return cached_response(
+            list_cache_key(request, "performance-calendar"), build
+        )
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="seat-map",
+        renderer_classes=[
+            *api_settings.DEFAULT_RENDERER_CLASSES,
+            SeatMapBinaryRenderer,
+        ],
+    )
+    def seat_map(self, request, pk=None):
+        """Get sold and held seats bitmap (JSON or ?format=bin)."""
+        try:
+            seat_map = get_seat_map_by_performance_id(int(pk))
+        except ValueError:
+            raise Http404
+        if seat_map is None:
+            raise Http404
+
+        seat_map = with_held_seats(seat_map)
+        if request.accepted_renderer.format == SeatMapBinaryRenderer.format:
+            return Response(
+                bytes(seat_map.bitmap),
+                headers={
+                    "X-Seat-Map-Rows": str(seat_map.rows),
+                    "X-Seat-Map-Seats-In-Row": str(seat_map.seats_in_row),
+                },
+            )
+
+        serializer = self.get_serializer(seat_map)
+        return Response(serializer.data)
+
+    @action(
+        methods=["POST", "DELETE"],
+        detail=True,
+        permission_classes=(IsAuthenticated,),
+    )
+    def hold(self, request, pk=None):
+        """Hold seats for a few minutes before booking, or release them."""
+        performance = self.get_object()
+
+        if request.method == "DELETE":
+            release_holds(request.user, performance.id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        holds = hold_seats(
+            request.user,
+            performance,
+            [
+                (seat["row"], seat["seat"])
+                for seat in serializer.validated_data["seats"]
+            ],
+            serializer.validated_data["minutes"],
+        )
+        return Response(
+            SeatHoldListSerializer(holds, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "count",
+                type=openapi.OpenApiTypes.INT,
+                description="Number of adjacent seats (GET only)",
+            ),
+            OpenApiParameter(
+                "preference",
+                type=openapi.OpenApiTypes.STR,
+                enum=["centre", "front", "back"],
+                description="Preferred part of the hall (GET only)",
+            ),
+        ]
+    )
+    @action(
+        methods=["GET", "POST"],
+        detail=True,
+        url_path="best-available",
+        permission_classes=(IsAuthenticated,),
+    )
+    def best_available(self, request, pk=None):
+        """Find the best block of adjacent seats; POST also books it."""
+        serializer = self.get_serializer(
+            data=(
+                request.query_params
+                if request.method == "GET"
+                else request.data
+            )
+        )
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            seat_map = get_seat_map_by_performance_id(int(pk))
+        except ValueError:
+            raise Http404
+        if seat_map is None:
+            raise Http404
+
+        block = find_best_block(
+            with_held_seats(seat_map),
+            serializer.validated_data["count"],
+            serializer.validated_data["preference"],
+        )
+        if block is None:
+            raise NoAdjacentSeats()
+        row, seats = block
+
+        if request.method == "GET":
+            return Response(
+                SeatBlockSerializer(
+                    {
+                        "performance": seat_map.performance_id,
+                        "row": row,
+                        "seats": seats,
+                    }
+                ).data
+            )
+
+        reservation = ReservationSerializer(
+            data={
+                "tickets": [
+                    {
+                        "row": row,
+                        "seat": seat,
+                        "performance": seat_map.performance_id,
+                    }
+                    for seat in seats
+                ]
+            },
+            context=self.get_serializer_context(),
+        )
+        reservation.is_valid(raise_exception=True)
+        reservation.save(user=request.user)
+        return Response(reservation.data, status=status.HTTP_201_CREATED)
 
     def destroy(self, request, *args, **kwargs):
         """Disallow deletion of performances."""
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class ReservationPagination(PageNumberPagination):
-    page_size = 3
-    max_page_size = 4
-
-
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(
+    ReplicaReadMixin, SparseFieldsMixin, viewsets.ModelViewSet
+):
     queryset = Reservation.objects.prefetch_related(
         "tickets__performance__play", "tickets__performance__theatre_hall"
     )
     serializer_class = ReservationSerializer
     pagination_class = ReservationPagination
     permission_classes = (IsAuthenticated,)
+    # create runs a few queries per performance booked, not per ticket
+    query_budgets = {
+        "list": 7,
+        "retrieve": 5,
+        "create": 32,
+        "destroy": 6,
+        "export": 2,
+    }
 
     def get_queryset(self):
-        return Reservation.objects.filter(
-            user=self.request.user
-        ).prefetch_related(
-            "tickets__performance__play", "tickets__performance__theatre_hall"
-        )
+        queryset = Reservation.objects.filter(user=self.request.user)
+        if self.wants("tickets"):
+            queryset = queryset.prefetch_related(
+                "tickets__performance__play",
+                "tickets__performance__theatre_hall",
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -212,8 +588,32 @@ class ReservationViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(
+        methods=["GET"],
+        detail=False,
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request):
+        """Stream the whole reservation history (?format=ndjson or csv)."""
+        renderer = request.accepted_renderer
+        stream = stream_csv if renderer.format == "csv" else stream_ndjson
+        reservations = iter_reservations(
+            self.get_queryset().order_by("-created_at", "-id")
+        )
+        response = StreamingHttpResponse(
+            stream(reservations),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="reservations.{renderer.format}"'
+        )
+        return response
+
 
 class ActorViewSet(
+    ReplicaReadMixin,
+    SparseFieldsMixin,
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -221,10 +621,16 @@ class ActorViewSet(
 ):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
+    conditional_tables = ("actor",)
+    field_sources = {"full_name": ("first_name", "last_name")}
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {"list": 3, "retrieve": 3, "create": 4}
 
 
 class GenreViewSet(
+    ReplicaReadMixin,
+    SparseFieldsMixin,
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -232,4 +638,6 @@ class GenreViewSet(
 ):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    conditional_tables = ("genre",)
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {"list": 3, "retrieve": 3, "create": 4}
@@ -0,0 +1,85 @@
+"""``DATABASES`` built from the environment.
+
+``DB_ENGINE`` picks ``sqlite`` (the default) or ``postgresql``.
+PostgreSQL connections persist for ``DB_CONN_MAX_AGE`` seconds and are
+health-checked before reuse. ``DB_POOLER=pgbouncer`` marks ``POSTGRES_HOST``
+as a PgBouncer in transaction pooling mode, which cannot keep server-side
+cursors across transactions.
+"""
+from pathlib import Path
+
+SQLITE_ENGINE = "django.db.backends.sqlite3"
+POSTGRESQL_ENGINE = "django.db.backends.postgresql"
+POOLERS = ("", "pgbouncer")
+
+
+def _flag(env, name: str, default: bool) -> bool:
+    return env.get(name, str(default)) == "True"
+
+
+def conn_max_age(env) -> int | None:
+    """Seconds to keep a connection; ``none`` keeps it for good."""
+    value = env.get("DB_CONN_MAX_AGE", "60")
+    return None if value.lower() == "none" else int(value)
+
+
+def sqlite_database(name, **extra) -> dict:
+    return {"ENGINE": SQLITE_ENGINE, "NAME": name, **extra}
+
+
+def postgresql_database(env, host: str | None = None) -> dict:
+    host, _, port = (host or env.get("POSTGRES_HOST", "")).partition(":")
+    pooler = env.get("DB_POOLER", "")
+    if pooler not in POOLERS:
+        raise ValueError(f"DB_POOLER must be one of {POOLERS}, not {pooler}")
+    return {
+        "ENGINE": POSTGRESQL_ENGINE,
+        "NAME": env.get("POSTGRES_DB"),
+        "USER": env.get("POSTGRES_USER"),
+        "PASSWORD": env.get("POSTGRES_PASSWORD"),
+        "HOST": host,
+        "PORT": port or env.get("POSTGRES_PORT", ""),
+        "CONN_MAX_AGE": conn_max_age(env),
+        "CONN_HEALTH_CHECKS": _flag(env, "DB_CONN_HEALTH_CHECKS", True),
+        "DISABLE_SERVER_SIDE_CURSORS": pooler == "pgbouncer",
+        "OPTIONS": {
+            "connect_timeout": int(env.get("DB_CONNECT_TIMEOUT", 5)),
+            "application_name": env.get("DB_APPLICATION_NAME", "theatre"),
+        },
+    }
+
+
+def databases(env, base_dir: Path) -> tuple[dict, list[str]]:
+    """``DATABASES`` and the aliases of its read replicas.
+
+    Replicas are ``SQLITE_REPLICAS`` files or ``POSTGRES_REPLICA_HOSTS``
+    (``host[:port]``) sharing the primary's credentials.
+    """
+    engine = env.get("DB_ENGINE", "sqlite")
+    if engine == "sqlite":
+        default = sqlite_database(
+            env.get("SQLITE_NAME") or base_dir / "db.sqlite3",
+            # a file based test database lets multi-process tests share it
+            TEST={"NAME": env.get("SQLITE_TEST_NAME")},
+        )
+        replicas = [
+            sqlite_database(path, TEST={"MIRROR": "default"})
+            for path in env.get("SQLITE_REPLICAS", "").split(",")
+            if path
+        ]
+    elif engine == "postgresql":
+        default = postgresql_database(env)
+        replicas = [
+            {**postgresql_database(env, host), "TEST": {"MIRROR": "default"}}
+            for host in env.get("POSTGRES_REPLICA_HOSTS", "").split(",")
+            if host
+        ]
+    else:
+        raise ValueError(
+            f"DB_ENGINE must be 'sqlite' or 'postgresql', not {engine!r}"
+        )
+
+    config = {"default": default}
+    for index, replica in enumerate(replicas, start=1):
+        config[f"replica{index}"] = replica
+    return config, [alias for alias in config if alias != "default"]
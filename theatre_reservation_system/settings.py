@@ -13,6 +13,8 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from theatre_reservation_system.database import databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -52,6 +54,8 @@ AUTH_USER_MODEL = "user.User"
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # outermost body writer, so it compresses what the others produce
+    "theatre.middleware.CompressionMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -59,6 +63,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "theatre.middleware.QueryBudgetMiddleware",
 ]
 
 ROOT_URLCONF = "theatre_reservation_system.urls"
@@ -85,26 +90,68 @@ WSGI_APPLICATION = "theatre_reservation_system.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+# Backend, persistent connections and pooling come from the environment,
+# see theatre_reservation_system/database.py. With a SHARED_CACHE for
+# read-your-writes pins, read replicas serve safe requests of the theatre
+# API, except ETag-validated catalogue reads; local SQLite replicas are
+# refreshed by ``manage.py sync_replicas``.
+DATABASES, DATABASE_REPLICAS = databases(os.environ, BASE_DIR)
+
+DATABASE_ROUTERS = ["theatre.routers.ReplicaRouter"]
+
+# Seconds a user's reads stay on the primary after they wrote something,
+# longer than the replicas may lag behind.
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 10))
+
+
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+        if os.environ.get("REDIS_URL")
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
 }
-
-
-"""for docker"""
-#
-# DATABASES = {
-#     "default": {
-#         "ENGINE": "django.db.backends.postgresql",
-#         "NAME": os.environ.get("POSTGRES_DB"),
-#         "USER": os.environ.get("POSTGRES_USER"),
-#         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
-#         "HOST": os.environ.get("POSTGRES_HOST"),
-#         "PORT": os.environ.get("POSTGRES_PORT"),
-#     }
-# }
+# whether every worker and the sweeper see the same default cache
+SHARED_CACHE = bool(os.environ.get("REDIS_URL"))
+
+# ETag/Last-Modified on catalogue reads. Validators come from change
+# watermarks in the default cache, which every worker must share: off
+# with the process-local LocMemCache unless explicitly enabled.
+CONDITIONAL_GET_ENABLED = (
+    os.environ.get("CONDITIONAL_GET_ENABLED", str(SHARED_CACHE)) == "True"
+)
+
+# Cached performance list/detail/calendar responses. Writes invalidate
+# them by bumping versions in the default cache, so like conditional GET
+# they are off with the process-local LocMemCache unless enabled.
+PERFORMANCE_CACHE_ENABLED = (
+    os.environ.get("PERFORMANCE_CACHE_ENABLED", str(SHARED_CACHE)) == "True"
+)
+
+# Seconds a cached performance list/detail response may live; versions
+# bumped on writes invalidate it earlier, the timeout bounds staleness of
+# seat holds that expire without a write.
+PERFORMANCE_CACHE_TIMEOUT = int(
+    os.environ.get("PERFORMANCE_CACHE_TIMEOUT", 60)
+)
+
+# Views whose SQL per action is recorded and checked against the
+# ``query_budgets`` of their class; over-budget requests are logged, or
+# fail when enforced (always under the test runner).
+QUERY_STATS_VIEW_MODULES = ("theatre.views", "user.views")
+QUERY_BUDGETS_ENFORCED = (
+    os.environ.get("QUERY_BUDGETS_ENFORCED", "False") == "True"
+)
+# Share of those requests added to the stats, each costing a few cache
+# round trips; budgets are checked on every request.
+QUERY_STATS_SAMPLE_RATE = float(
+    os.environ.get("QUERY_STATS_SAMPLE_RATE", 0.1)
+)
+
+TEST_RUNNER = "theatre.testing.QueryBudgetRunner"
 
 
 # Password validation
@@ -147,6 +194,19 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "/media/"
 
+# responses CompressionMiddleware encodes; media and static files never,
+# their images are compressed already
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/vnd.oai.openapi",
+    "application/vnd.oai.openapi+json",
+    "text/csv",
+    "text/html",
+    "text/plain",
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -163,8 +223,18 @@ REST_FRAMEWORK = {
         "rest_framework.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "100/day"},
+    # orjson when installed, DRF's stdlib JSONRenderer/JSONParser otherwise
+    "DEFAULT_RENDERER_CLASSES": (
+        "theatre.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "theatre.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "theatre.pagination.OptInCursorPagination",
     "PAGE_SIZE": 5
 }
 